@@ -1,19 +1,16 @@
 import atexit
+import functools
+import hashlib
 import logging
 import os
 import re
-import subprocess
 import time
 
 from appium import webdriver
 from appium.options.android import UiAutomator2Options
 from appium.options.ios import XCUITestOptions
 from appium.webdriver.common.appiumby import AppiumBy
-from selenium.common.exceptions import (
-	NoSuchElementException,
-	StaleElementReferenceException,
-	TimeoutException,
-)
+from selenium.common.exceptions import NoSuchElementException
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.actions.action_builder import ActionBuilder
 from selenium.webdriver.common.actions.pointer_input import PointerInput
@@ -22,11 +19,71 @@ from selenium.webdriver.support.ui import WebDriverWait
 
 from app_use.app.gestures import GestureService
 from app_use.nodes.app_node import AppElementNode, AppState
-from app_use.nodes.appium_tree_builder import AppiumElementTreeBuilder
 from app_use.utils import time_execution_sync
+from utilities.activity_cache import LaunchActivityCache
+from utilities.adb_client import AdbClient
+from utilities.appium_profiles import AppiumProfile
+from utilities.device_metrics import DeviceMetricsCache
+from utilities.driver_commands import DriverCommandCounter
+from utilities.element_tree import IncrementalElementTreeBuilder
+from utilities.gesture_sequence import GestureSequence
+from utilities.locator_index import Locator, quote_selector_value
+from utilities.locator_stats import LocatorStatsStore
+from utilities.mjpeg_stream import MjpegFrameReader
 
 logger = logging.getLogger(__name__)
 
+# Text entry: how long to poll for the focused field after the tap
+FOCUS_TIMEOUT = 1.0
+FOCUS_POLL_INTERVAL = 0.1
+
+# Content scroll direction -> finger direction
+SCROLL_FINGER_DIRECTIONS = {'down': 'up', 'up': 'down', 'right': 'left', 'left': 'right'}
+# Swipes per direction tried by the generic scroll-into-view fallback
+MAX_SCROLL_SWIPES = 3
+# MJPEG screen stream: how long to wait for the first frame before giving up
+STREAM_START_TIMEOUT = 5.0
+
+
+def invalidates_state(func):
+	"""
+	Mark an App action as mutating: the cached app state is stale once it has run.
+	"""
+
+	@functools.wraps(func)
+	def wrapper(self, *args, **kwargs):
+		try:
+			return func(self, *args, **kwargs)
+		finally:
+			self.invalidate_state()
+
+	return wrapper
+
+
+def probes_locators(func):
+	"""
+	Run an App action in fast-probe locator mode: fallback strategies use a zero
+	implicit wait and only the final attempt may wait, within a shared budget.
+	"""
+
+	@functools.wraps(func)
+	def wrapper(self, *args, **kwargs):
+		if self._probe is not None or self.driver is None:
+			# Nested action (e.g. ensure_element_visible inside a click): reuse the outer budget
+			return func(self, *args, **kwargs)
+		self._probe = {'action': func.__name__, 'deadline': time.perf_counter() + self.locator_budget}
+		self.driver.implicitly_wait(0)
+		try:
+			return func(self, *args, **kwargs)
+		finally:
+			self._probe = None
+			try:
+				self.driver.implicitly_wait(self.timeout)
+			except Exception as e:
+				logger.debug(f'Could not restore implicit wait: {e}')
+
+	return wrapper
+
 
 class App:
 	"""
@@ -44,6 +101,12 @@ class App:
 		udid=None,
 		appium_server_url='http://localhost:4723/wd/hub',
 		timeout=30,
+		vision_settings=None,
+		stability_timeout=None,
+		stability_interval=None,
+		locator_budget=None,
+		locator_stats=None,
+		performance_profile=None,
 		**capabilities,
 	):
 		self.platform_name = platform_name
@@ -55,12 +118,50 @@ class App:
 		self.udid = udid
 		self.appium_server_url = appium_server_url
 		self.timeout = timeout
+		# Optional VisionSettings: downscales the screenshot sent to the LLM only
+		self.vision_settings = vision_settings
+		# Adaptive UI-stability wait: ceiling and polling interval in seconds
+		self.stability_timeout = float(
+			stability_timeout if stability_timeout is not None else os.getenv('APP_STABILITY_TIMEOUT', '2.0')
+		)
+		self.stability_interval = float(
+			stability_interval if stability_interval is not None else os.getenv('APP_STABILITY_INTERVAL', '0.3')
+		)
+		# Fast-probe locators: time budget (seconds) shared by the fallback strategies of one action
+		self.locator_budget = float(
+			locator_budget if locator_budget is not None else os.getenv('APP_LOCATOR_BUDGET', '5.0')
+		)
+		self._probe = None
+		# Adaptive strategy ordering: LocatorStatsStore shared by all sessions, None disables it
+		self.locator_stats = locator_stats
+		# Per-test metrics, cleared by reset_metrics()
+		self.stability_waits = []
+		self.locator_timings = []
+		self.text_entry_round_trips = []
+		self.screenshot_ages = []
+		self.state_build_times = []
+		# Performance profile (appium_profiles.json): session capabilities + runtime settings
+		self.performance_profile = AppiumProfile.resolve(performance_profile, platform_name)
 		self.additional_capabilities = capabilities
+		# Set by AppiumSessionPool: close() keeps the session alive for the next test
+		self.pooled = False
 
 		self.driver = None
 		self.element_tree_builder = None
 		self.gesture_service = None
+		self.device_metrics = None
+		self.command_counter = None
+		# MjpegFrameReader started by start_screen_stream(), None in screenshot mode
+		self.frame_reader = None
+		# Set when the stream delivered no frames: later tests on this session skip the attempt
+		self.stream_failed = False
 		self._cached_state = None
+		# Versioned state cache: bumped on every rebuild, marked dirty by mutating actions
+		self.state_version = 0
+		self._state_dirty = True
+		self._last_page_source = None
+		# State captured ahead of time by AsyncApp, served to the next get_app_state() call
+		self._prefetched_state = None
 
 		if platform_name.lower() == 'android':
 			if not device_name and not udid:
@@ -68,10 +169,12 @@ class App:
 			if not app:
 				if not app_package:
 					raise ValueError('app_package is required for Android when not using app')
-				# Auto-detect app_activity if not provided
+				# Auto-detect app_activity if not provided (cached per device, package and versionCode)
 				if not app_activity:
 					logger.info(f'Auto-detecting main activity for package: {app_package}')
-					detected_activity = self.detect_android_app_activity(app_package, device_name)
+					detected_activity = LaunchActivityCache.default().resolve(
+						app_package, udid or device_name, self.detect_android_app_activity
+					)
 					if detected_activity:
 						self.app_activity = detected_activity
 						logger.info(f'Using detected activity: {detected_activity}')
@@ -88,14 +191,12 @@ class App:
 			raise ValueError("platform_name must be 'Android' or 'iOS'")
 
 		self._initialize_driver()
-		atexit.register(self.close)
+		atexit.register(self.close, force=True)
 
 	def _initialize_driver(self):
 		try:
 			desired_caps = {
 				'platformName': self.platform_name,
-				'customSnapshotTimeout': 12000,
-				'snapshotMaxDepth': 100,
 			}
 
 			if self.device_name:
@@ -119,11 +220,8 @@ class App:
 				desired_caps['automationName'] = 'XCUITest'
 				desired_caps['autoAcceptAlerts'] = True
 
-				# Add iOS specific capabilities for better simulator handling
-				desired_caps['newCommandTimeout'] = 60
-				desired_caps['wdaLaunchTimeout'] = 60000
-				desired_caps['wdaConnectionTimeout'] = 60000
-
+			# Snapshot depth/timeouts, idle waits and WDA timeouts come from the performance profile
+			desired_caps.update(self.performance_profile.capabilities)
 			desired_caps.update(self.additional_capabilities)
 
 			logger.info(f'Initializing Appium driver with capabilities: {desired_caps}')
@@ -136,8 +234,21 @@ class App:
 			logger.info('Connecting to Appium server...')
 			self.driver = webdriver.Remote(self.appium_server_url, options=options)
 			self.driver.implicitly_wait(self.timeout)
+			self._update_driver_settings(self.performance_profile.settings)
 
-			self.element_tree_builder = AppiumElementTreeBuilder(self.driver)
+			# Every Appium round-trip is counted (metrics and text-entry measurements)
+			self.command_counter = DriverCommandCounter(self.driver)
+			self.command_counter.install()
+
+			# Window size cached for the whole session, see window_size()
+			self.device_metrics = DeviceMetricsCache(self.driver)
+
+			self.element_tree_builder = IncrementalElementTreeBuilder(
+				self.driver,
+				device_metrics=self.device_metrics,
+				prune=os.getenv('APP_TREE_PRUNING', 'true').lower() == 'true',
+			)
+			self.element_tree_builder.frame_source = self.frame_reader
 			self.gesture_service = GestureService(self.driver)
 
 			logger.info('Appium driver initialized successfully')
@@ -155,22 +266,169 @@ class App:
 			logger.error(error_msg)
 			raise
 
-	def _wait_for_page_and_frames_load(self, wait_time: float = 2.0) -> bool:
+	def _page_fingerprint(self) -> str | None:
+		"""
+		Cheap fingerprint of the current UI: hash of the page source.
+		"""
+		try:
+			self._last_page_source = self.driver.page_source
+			return hashlib.md5(self._last_page_source.encode('utf-8')).hexdigest()
+		except Exception as e:
+			logger.debug(f'Could not read page source for stability check: {e}')
+			self._last_page_source = None
+			return None
+
+	def _wait_for_page_and_frames_load(self, wait_time: float | None = None) -> bool:
 		"""
 		Wait for the app UI to stabilize after potential page transitions.
 
-		Simple approach: just wait a few seconds to allow transitions to complete.
+		Polls a page-source fingerprint and returns as soon as two consecutive samples
+		match, or when the ceiling is reached. The elapsed time is recorded in
+		stability_waits.
 
 		Args:
-		    wait_time: Time to wait in seconds (default: 2.0)
+		    wait_time: Maximum time to wait in seconds (default: stability_timeout)
 
 		Returns:
-		    bool: Always returns True after waiting
+		    bool: True if the UI was stable before the ceiling, False otherwise
 		"""
-		logger.debug(f'Waiting {wait_time}s for UI transitions to complete')
-		time.sleep(wait_time)
-		logger.debug('Wait completed')
-		return True
+		ceiling = self.stability_timeout if wait_time is None else wait_time
+		self._last_page_source = None
+		if ceiling <= 0:
+			return True
+		start = time.perf_counter()
+		stable = False
+
+		previous = self._page_fingerprint()
+		while time.perf_counter() - start < ceiling:
+			time.sleep(min(self.stability_interval, max(0.0, ceiling - (time.perf_counter() - start))))
+			current = self._page_fingerprint()
+			if current is not None and current == previous:
+				stable = True
+				break
+			previous = current
+
+		elapsed = time.perf_counter() - start
+		self.stability_waits.append(elapsed)
+		logger.debug(f'UI {"stable" if stable else "still changing"} after {elapsed:.2f}s (ceiling {ceiling}s)')
+		return stable
+
+	def window_size(self) -> dict:
+		"""
+		Screen size of the session, cached by DeviceMetricsCache and re-read after a rotation.
+
+		Returns:
+		    dict: {'width': ..., 'height': ...}
+		"""
+		if self.device_metrics is not None:
+			return self.device_metrics.get_window_size()
+		return self.driver.get_window_size()
+
+	def _update_driver_settings(self, settings: dict) -> None:
+		if not settings or self.driver is None:
+			return
+		try:
+			self.driver.update_settings(settings)
+			logger.info(f'Appium settings applied: {settings}')
+		except Exception as e:
+			logger.warning(f'Could not apply Appium settings {settings}: {str(e)}')
+
+	def reset_metrics(self) -> None:
+		"""
+		Clear the per-test metrics (pooled sessions are shared by several tests).
+		"""
+		self.stability_waits = []
+		self.locator_timings = []
+		self.text_entry_round_trips = []
+		self.screenshot_ages = []
+		self.state_build_times = []
+		if self.device_metrics is not None:
+			self.device_metrics.reset_counters()
+		if self.command_counter is not None:
+			self.command_counter.reset_counters()
+
+	def _find_element(self, strategy: str, by: str, value: str, final: bool = False):
+		"""
+		Find an element for a locator strategy, recording how long it took.
+
+		In fast-probe mode (see probes_locators) non-final strategies make a single
+		attempt, while the final one waits up to the remaining budget of the action.
+
+		Args:
+		    strategy: Strategy name used in the timing report (e.g. 'key', 'text')
+		    by: AppiumBy locator type
+		    value: Locator value
+		    final: Whether this is the last locator strategy of the action
+
+		Returns:
+		    The found WebElement (raises like find_element otherwise)
+		"""
+		start = time.perf_counter()
+		found = False
+		try:
+			if self._probe is not None and final:
+				remaining = max(0.0, self._probe['deadline'] - time.perf_counter())
+				element = WebDriverWait(self.driver, remaining).until(EC.presence_of_element_located((by, value)))
+			else:
+				element = self.driver.find_element(by, value)
+			found = True
+			return element
+		finally:
+			self.locator_timings.append(
+				{
+					'action': self._probe['action'] if self._probe else None,
+					'strategy': strategy,
+					'seconds': time.perf_counter() - start,
+					'found': found,
+				}
+			)
+
+	@property
+	def app_identifier(self) -> str:
+		"""
+		Package name (Android), bundle ID (iOS) or app path used to key locator statistics.
+		"""
+		return self.app_package or self.bundle_id or self.app or 'unknown'
+
+	def _run_strategies(self, action: str, node: AppElementNode, strategies: dict) -> bool:
+		"""
+		Try the applicable locator strategies of an action until one succeeds.
+
+		With locator_stats the expected-best strategy for this app and element is tried
+		first and strategies that always fail are demoted. Only the last element lookup
+		is marked final, so it is the only one allowed to wait (see probes_locators).
+
+		Args:
+		    action: Action name ('click', 'enter_text', 'scroll_into_view', 'ensure_visible')
+		    node: Target element
+		    strategies: Mapping name -> (applicable, callable(final) -> bool), in default order
+
+		Returns:
+		    bool: True as soon as a strategy succeeds
+		"""
+		names = [name for name, (applicable, _) in strategies.items() if applicable]
+		signature = LocatorStatsStore.element_signature(action, node)
+		if self.locator_stats is not None:
+			ordered = self.locator_stats.order(self.app_identifier, action, signature, names)
+			if ordered != names:
+				logger.info(f'Strategy order for {action} learned from previous runs: {", ".join(ordered)}')
+			names = ordered
+
+		lookups = [name for name in names if name != 'coordinates']
+		for name in names:
+			start = time.perf_counter()
+			try:
+				success = bool(strategies[name][1](final=bool(lookups) and name == lookups[-1]))
+			except Exception as e:
+				logger.error(f'Error in {action} strategy {name}: {str(e)}')
+				success = False
+			if self.locator_stats is not None:
+				self.locator_stats.record(
+					self.app_identifier, action, signature, name, success, time.perf_counter() - start
+				)
+			if success:
+				return True
+		return False
 
 	@time_execution_sync('--get_state_summary')
 	def get_app_state(
@@ -178,38 +436,170 @@ class App:
 		viewport_expansion: int = 0,
 		debug_mode: bool = False,
 		include_highlights: bool = True,
+		wait_for_stability: bool = True,
+		prefetch: bool = False,
 	) -> AppState:
 		"""
 		Get the current app state, optionally waiting for UI stability first.
 
+		A state prefetched by AsyncApp is returned as-is if no mutating action ran since,
+		so the agent's synchronous call does not hit the device.
+
 		Args:
 		    viewport_expansion: Expand viewport bounds by this many pixels
 		    debug_mode: Enable debug mode for tree building
 		    include_highlights: Whether to include highlight indices
 		    wait_for_stability: Whether to wait for UI stability before capturing state
+		        (False when the caller already waited, leaving the page source in _last_page_source)
+		    prefetch: Keep the state for the next get_app_state() call
 
 		Returns:
 		    AppState: Current application state
 		"""
-		self._wait_for_page_and_frames_load()
+		prefetched, self._prefetched_state = self._prefetched_state, None
+		if prefetched is not None and not self._state_dirty and not prefetch:
+			logger.debug(f'Using prefetched app state (version {self.state_version})')
+			return prefetched
+
+		app_state = self._build_state(
+			viewport_expansion, debug_mode, include_highlights, take_screenshot=True, wait_for_stability=wait_for_stability
+		)
+		# Screenshot is now handled by the tree builder
+		if self.vision_settings is not None and app_state.screenshot:
+			app_state.screenshot = self.vision_settings.downscale_base64(app_state.screenshot)
+		screenshot_age = getattr(self.element_tree_builder, 'last_screenshot_age', None)
+		if screenshot_age is not None:
+			self.screenshot_ages.append(screenshot_age)
+		self._cached_state = app_state
+		if prefetch:
+			self._prefetched_state = app_state
+		return app_state
+
+	def _build_state(
+		self,
+		viewport_expansion: int,
+		debug_mode: bool,
+		include_highlights: bool,
+		take_screenshot: bool,
+		wait_for_stability: bool = True,
+	) -> AppState:
+		"""
+		Wait for UI stability and (incrementally) rebuild the element tree.
+
+		The page source sampled by the stability check is handed to the tree builder,
+		saving one Appium round-trip per rebuild.
+		"""
+		start = time.perf_counter()
+		if wait_for_stability:
+			stable = self._wait_for_page_and_frames_load()
+			page_source = self._last_page_source if stable else None
+		else:
+			page_source = self._last_page_source
 
 		app_state = self.element_tree_builder.build_element_tree(
 			self.platform_name.lower(),
 			viewport_expansion=viewport_expansion,
 			debug_mode=debug_mode,
 			include_highlights=include_highlights,
+			page_source=page_source,
+			take_screenshot=take_screenshot,
 		)
-		# Screenshot is now handled by the tree builder
-		self._cached_state = app_state
+		self.state_version += 1
+		self._state_dirty = False
+		self.state_build_times.append(time.perf_counter() - start)
 		return app_state
 
+	@property
+	def last_screenshot(self) -> str | None:
+		"""
+		Full-resolution screenshot (base64, without highlights) captured by the last state build.
+		"""
+		return getattr(self.element_tree_builder, 'last_screenshot', None)
+
+	@property
+	def last_screenshot_age(self) -> float | None:
+		"""
+		Age in seconds of the MJPEG frame used by the last state build, None for WebDriver screenshots.
+		"""
+		return getattr(self.element_tree_builder, 'last_screenshot_age', None)
+
+	def start_screen_stream(self, url: str) -> bool:
+		"""
+		Start reading the Appium MJPEG screen stream: state builds take their screenshot
+		from the most recent frame instead of a WebDriver round-trip.
+
+		The stream is started once per session; calling it again is a no-op, and after a
+		failed start it returns False at once instead of waiting STREAM_START_TIMEOUT again.
+
+		Args:
+		    url: Stream URL, e.g. http://127.0.0.1:7810 (mjpegServerPort capability)
+
+		Returns:
+		    bool: True if the stream delivers frames
+		"""
+		if self.frame_reader is not None:
+			return True
+		if self.stream_failed:
+			return False
+		reader = MjpegFrameReader(url).start()
+		if reader.wait_for_frame(newer_than=0.0, timeout=STREAM_START_TIMEOUT) is None:
+			reader.stop()
+			self.stream_failed = True
+			logger.warning(f'No frames from MJPEG stream {url}, using WebDriver screenshots')
+			return False
+		self.frame_reader = reader
+		if self.element_tree_builder is not None:
+			self.element_tree_builder.frame_source = reader
+		logger.info(f'MJPEG screen stream active: {url}')
+		return True
+
+	def stop_screen_stream(self) -> None:
+		"""
+		Stop the MJPEG reader; state builds go back to WebDriver screenshots.
+		"""
+		if self.frame_reader is None:
+			return
+		self.frame_reader.stop()
+		self.frame_reader = None
+		if self.element_tree_builder is not None:
+			self.element_tree_builder.frame_source = None
+
+	def locator_for(self, node: AppElementNode) -> Locator | None:
+		"""
+		Cheapest unique locator of an element, precomputed when its snapshot was built.
+
+		Returns:
+		    Locator (id / accessibility id, UiSelector or iOS predicate), or None if the
+		    element has no unique locator or belongs to an older snapshot
+		"""
+		if self.element_tree_builder is None:
+			return None
+		return self.element_tree_builder.last_locator_index.get(node)
+
+	def invalidate_state(self) -> None:
+		"""
+		Mark the cached app state as stale. Called after every mutating action.
+		"""
+		self._state_dirty = True
+		self._prefetched_state = None
+
 	def get_selector_map(self, viewport_expansion: int = 0, debug_mode: bool = False):
-		if self._cached_state:
-			logger.debug('Using cached app state')
+		"""
+		Get the selector map of the current state.
+
+		The cached map is returned while no mutating action has run since the last
+		build; otherwise the tree is rebuilt (without screenshot). Highlight indices
+		stay stable across rebuilds for elements that are still on screen.
+		"""
+		if self._cached_state and not self._state_dirty:
+			logger.debug(f'Using cached app state (version {self.state_version})')
 			return self._cached_state.selector_map
-		state = self.get_app_state(viewport_expansion=viewport_expansion, debug_mode=debug_mode)
+		state = self._build_state(viewport_expansion, debug_mode, include_highlights=False, take_screenshot=False)
+		self._cached_state = state
 		return state.selector_map
 
+	@invalidates_state
+	@probes_locators
 	def enter_text_with_highlight_index(self, highlight_index: int, text: str) -> bool:
 		selector_map = self.get_selector_map()
 		target_node = selector_map.get(highlight_index)
@@ -224,98 +614,114 @@ class App:
 		# Note: All text input methods below include clearing existing text before entering new text
 		# Coordinate-based method uses triple-tap + delete, element-based methods use .clear()
 
-		# Priority 1: Try coordinate-based text input if viewport coordinates are available
-		if target_node.viewport_coordinates:
-			try:
-				logger.info(
-					f'Trying coordinate-based text input for element at ({target_node.viewport_coordinates.x}, {target_node.viewport_coordinates.y})'
-				)
-				center_x, center_y = self.get_element_center_coordinates(target_node)
-				if self.input_text_at_coordinates(center_x, center_y, text):
-					logger.info('Successfully entered text using coordinates')
-					return True
-				else:
-					logger.warning('Coordinate-based text input failed, continuing with other methods')
-			except Exception as e:
-				logger.error(f'Error with coordinate-based text input: {str(e)}')
-
-		# Priority 2: Try by key/semantics first (most reliable)
-		if target_node.key:
-			try:
-				logger.info(f'Trying to enter text by key: {target_node.key}')
-				if self.platform_name.lower() == 'android':
-					element = self.driver.find_element(AppiumBy.ID, target_node.key)
-				else:
-					# For iOS, try multiple selectors for the key
-					try:
-						element = self.driver.find_element(AppiumBy.ACCESSIBILITY_ID, target_node.key)
-					except NoSuchElementException:
-						# Try by name attribute
-						element = self.driver.find_element(AppiumBy.NAME, target_node.key)
-				element.clear()
-				element.send_keys(text)
-				logger.info('Successfully entered text using key')
+		def by_coordinates(final):
+			logger.info(
+				f'Trying coordinate-based text input for element at ({target_node.viewport_coordinates.x}, {target_node.viewport_coordinates.y})'
+			)
+			center_x, center_y = self.get_element_center_coordinates(target_node)
+			if self.input_text_at_coordinates(center_x, center_y, text):
+				logger.info('Successfully entered text using coordinates')
 				return True
-			except Exception as e:
-				logger.error(f'Error entering text by key: {str(e)}')
-
-		# Priority 3: Try by element type and other attributes for iOS text fields
-		if self.platform_name.lower() == 'ios' and target_node.tag_name in [
-			'XCUIElementTypeSearchField',
-			'XCUIElementTypeTextField',
-			'XCUIElementTypeSecureTextField',
-		]:
-			try:
-				logger.info(f'Trying to find iOS text field by type: {target_node.tag_name}')
-				# Try to find by element type and any available attribute
-				xpath_parts = [f'name()="{target_node.tag_name}"']
-
-				if target_node.key:
-					xpath_parts.append(f'(@name="{target_node.key}" or @accessibilityIdentifier="{target_node.key}")')
-
-				if target_node.text:
-					xpath_parts.append(f'(@value="{target_node.text}" or @label="{target_node.text}")')
-
-				# If we have coordinates, try to find elements near them
-				if target_node.viewport_coordinates:
-					# Build a more flexible xpath
-					xpath = f'//{target_node.tag_name}'
-					if len(xpath_parts) > 1:
-						xpath += f'[{" and ".join(xpath_parts[1:])}]'
-				else:
-					xpath = f'//*[{" and ".join(xpath_parts)}]'
+			logger.warning('Coordinate-based text input failed, continuing with other methods')
+			return False
 
-				logger.info(f'Using xpath: {xpath}')
-				element = self.driver.find_element(AppiumBy.XPATH, xpath)
-				element.clear()
-				element.send_keys(text)
-				logger.info('Successfully entered text using iOS text field type')
-				return True
-			except Exception as e:
-				logger.error(f'Error entering text by iOS text field type: {str(e)}')
+		def by_key(final):
+			logger.info(f'Trying to enter text by key: {target_node.key}')
+			if self.platform_name.lower() == 'android':
+				element = self._find_element('key', AppiumBy.ID, target_node.key, final=final)
+			else:
+				# For iOS, try multiple selectors for the key
+				try:
+					element = self._find_element('key', AppiumBy.ACCESSIBILITY_ID, target_node.key)
+				except NoSuchElementException:
+					# Try by name attribute
+					element = self._find_element('key_name', AppiumBy.NAME, target_node.key, final=final)
+			element.clear()
+			element.send_keys(text)
+			logger.info('Successfully entered text using key')
+			return True
 
-		# Priority 4: Try by text content
-		if target_node.text:
-			try:
-				logger.info(f"Trying to enter text by text: '{target_node.text}'")
-				if self.platform_name.lower() == 'android':
-					element = self.driver.find_element(
-						AppiumBy.ANDROID_UIAUTOMATOR,
-						f'new UiSelector().text("{target_node.text}")',
-					)
-				else:
-					element = self.driver.find_element(
-						AppiumBy.XPATH,
-						f'//*[@name="{target_node.text}" or @label="{target_node.text}" or @value="{target_node.text}"]',
-					)
-				element.clear()
-				element.send_keys(text)
-				logger.info('Successfully entered text using text content')
-				return True
-			except Exception as e:
-				logger.error(f'Error entering text by text: {str(e)}')
+		def by_type_xpath(final):
+			logger.info(f'Trying to find iOS text field by type: {target_node.tag_name}')
+			# Try to find by element type and any available attribute
+			xpath_parts = [f'name()="{target_node.tag_name}"']
+
+			if target_node.key:
+				xpath_parts.append(f'(@name="{target_node.key}" or @accessibilityIdentifier="{target_node.key}")')
+
+			if target_node.text:
+				xpath_parts.append(f'(@value="{target_node.text}" or @label="{target_node.text}")')
+
+			# If we have coordinates, try to find elements near them
+			if target_node.viewport_coordinates:
+				# Build a more flexible xpath
+				xpath = f'//{target_node.tag_name}'
+				if len(xpath_parts) > 1:
+					xpath += f'[{" and ".join(xpath_parts[1:])}]'
+			else:
+				xpath = f'//*[{" and ".join(xpath_parts)}]'
+
+			logger.info(f'Using xpath: {xpath}')
+			element = self._find_element('type_xpath', AppiumBy.XPATH, xpath, final=final)
+			element.clear()
+			element.send_keys(text)
+			logger.info('Successfully entered text using iOS text field type')
+			return True
 
-		# Priority 5: Final fallback - click coordinates and use focused element
+		locator = self.locator_for(target_node)
+
+		def by_locator(final):
+			logger.info(f'Trying to enter text by {locator.strategy}: {locator.value}')
+			element = self._find_element('locator', locator.by, locator.value, final=final)
+			element.clear()
+			element.send_keys(text)
+			logger.info('Successfully entered text using precomputed locator')
+			return True
+
+		def by_text(final):
+			logger.info(f"Trying to enter text by text: '{target_node.text}'")
+			if self.platform_name.lower() == 'android':
+				element = self._find_element(
+					'text',
+					AppiumBy.ANDROID_UIAUTOMATOR,
+					f'new UiSelector().text("{target_node.text}")',
+					final=final,
+				)
+			else:
+				element = self._find_element(
+					'text',
+					AppiumBy.XPATH,
+					f'//*[@name="{target_node.text}" or @label="{target_node.text}" or @value="{target_node.text}"]',
+					final=final,
+				)
+			element.clear()
+			element.send_keys(text)
+			logger.info('Successfully entered text using text content')
+			return True
+
+		# Default order: coordinates, precomputed locator (or key, iOS text-field type, text);
+		# reordered by locator_stats
+		strategies = {
+			'coordinates': (target_node.viewport_coordinates is not None, by_coordinates),
+			'locator': (locator is not None, by_locator),
+			'key': (locator is None and bool(target_node.key), by_key),
+			'type_xpath': (
+				locator is None
+				and self.platform_name.lower() == 'ios'
+				and target_node.tag_name
+				in [
+					'XCUIElementTypeSearchField',
+					'XCUIElementTypeTextField',
+					'XCUIElementTypeSecureTextField',
+				],
+				by_type_xpath,
+			),
+			'text': (locator is None and bool(target_node.text), by_text),
+		}
+		if self._run_strategies('enter_text', target_node, strategies):
+			return True
+
+		# Final fallback - click coordinates and use focused element
 		if target_node.viewport_coordinates:
 			try:
 				logger.info('Trying final fallback: click coordinates and send to focused element')
@@ -349,14 +755,12 @@ class App:
 		logger.error(f'Failed to enter text in element with highlight_index: {highlight_index}')
 		return False
 
+	@invalidates_state
+	@probes_locators
 	def click_element_by_highlight_index(self, highlight_index: int) -> bool:
 		selector_map = self.get_selector_map()
 		target_node = selector_map.get(highlight_index)
 
-		if not target_node:
-			logger.error(f'No element found with highlight_index: {highlight_index}')
-			return False
-
 		if not target_node:
 			logger.error(f'No element found with highlight_index: {highlight_index}')
 			return False
@@ -364,62 +768,74 @@ class App:
 		self.ensure_element_visible_by_highlight_index(highlight_index)
 		logger.info(f'Attempting to click on {target_node.tag_name}')
 
-		# Priority 1: Try coordinate-based click if viewport coordinates are available
-		if target_node.viewport_coordinates:
-			try:
-				logger.info(
-					f'Trying coordinate-based click for element at ({target_node.viewport_coordinates.x}, {target_node.viewport_coordinates.y})'
+		def by_coordinates(final):
+			logger.info(
+				f'Trying coordinate-based click for element at ({target_node.viewport_coordinates.x}, {target_node.viewport_coordinates.y})'
+			)
+			if self.click_element_by_coordinates(target_node):
+				logger.info('Successfully clicked using coordinates')
+				return True
+			logger.warning('Coordinate-based click failed, continuing with other methods')
+			return False
+
+		def by_key(final):
+			logger.info(f'Trying to click by key: {target_node.key}')
+			if self.platform_name.lower() == 'android':
+				element = self._find_element('key', AppiumBy.ID, target_node.key, final=final)
+			else:
+				element = self._find_element('key', AppiumBy.ACCESSIBILITY_ID, target_node.key, final=final)
+			element.click()
+			logger.info('Successfully clicked using key')
+			return True
+
+		def by_text(final):
+			logger.info(f"Trying to click by text: '{target_node.text}'")
+			if self.platform_name.lower() == 'android':
+				element = self._find_element(
+					'text',
+					AppiumBy.ANDROID_UIAUTOMATOR,
+					f'new UiSelector().text("{target_node.text}")',
+					final=final,
 				)
-				if self.click_element_by_coordinates(target_node):
-					logger.info('Successfully clicked using coordinates')
-					return True
+			else:
+				if target_node.tag_name == 'XCUIElementTypeCell':
+					cell_xpath = f'//XCUIElementTypeCell[@label="{target_node.text}" or @name="{target_node.text}" or @value="{target_node.text}"]'
+					logger.info(f'Trying to click iOS cell with XPath: {cell_xpath}')
+					element = self._find_element('text', AppiumBy.XPATH, cell_xpath, final=final)
 				else:
-					logger.warning('Coordinate-based click failed, continuing with other methods')
-			except Exception as e:
-				logger.error(f'Error with coordinate-based click: {str(e)}')
+					element = self._find_element(
+						'text',
+						AppiumBy.XPATH,
+						f'//*[@name="{target_node.text}" or @label="{target_node.text}" or @value="{target_node.text}"]',
+						final=final,
+					)
+			element.click()
+			logger.info('Successfully clicked using text content')
+			return True
 
-		# Priority 2: Try by key/semantics first
-		if target_node.key:
-			try:
-				logger.info(f'Trying to click by key: {target_node.key}')
-				if self.platform_name.lower() == 'android':
-					element = self.driver.find_element(AppiumBy.ID, target_node.key)
-				else:
-					element = self.driver.find_element(AppiumBy.ACCESSIBILITY_ID, target_node.key)
-				element.click()
-				logger.info('Successfully clicked using key')
-				return True
-			except Exception as e:
-				logger.error(f'Error clicking by key: {str(e)}')
+		locator = self.locator_for(target_node)
 
-		# Priority 3: Try by text content
-		if target_node.text:
-			try:
-				logger.info(f"Trying to click by text: '{target_node.text}'")
-				if self.platform_name.lower() == 'android':
-					element = self.driver.find_element(
-						AppiumBy.ANDROID_UIAUTOMATOR,
-						f'new UiSelector().text("{target_node.text}")',
-					)
-				else:
-					if target_node.tag_name == 'XCUIElementTypeCell':
-						cell_xpath = f'//XCUIElementTypeCell[@label="{target_node.text}" or @name="{target_node.text}" or @value="{target_node.text}"]'
-						logger.info(f'Trying to click iOS cell with XPath: {cell_xpath}')
-						element = self.driver.find_element(AppiumBy.XPATH, cell_xpath)
-					else:
-						element = self.driver.find_element(
-							AppiumBy.XPATH,
-							f'//*[@name="{target_node.text}" or @label="{target_node.text}" or @value="{target_node.text}"]',
-						)
-				element.click()
-				logger.info('Successfully clicked using text content')
-				return True
-			except Exception as e:
-				logger.error(f'Error clicking by text: {str(e)}')
+		def by_locator(final):
+			logger.info(f'Trying to click by {locator.strategy}: {locator.value}')
+			self._find_element('locator', locator.by, locator.value, final=final).click()
+			logger.info('Successfully clicked using precomputed locator')
+			return True
+
+		# Default order: coordinates, precomputed locator (or key, text); reordered by locator_stats
+		strategies = {
+			'coordinates': (target_node.viewport_coordinates is not None, by_coordinates),
+			'locator': (locator is not None, by_locator),
+			'key': (locator is None and bool(target_node.key), by_key),
+			'text': (locator is None and bool(target_node.text), by_text),
+		}
+		if self._run_strategies('click', target_node, strategies):
+			return True
 
 		logger.error(f'Failed to click on element with highlight_index: {highlight_index}')
 		return False
 
+	@invalidates_state
+	@probes_locators
 	def scroll_into_view_by_highlight_index(self, highlight_index: int) -> bool:
 		selector_map = self.get_selector_map()
 		target_node = selector_map.get(highlight_index)
@@ -430,79 +846,63 @@ class App:
 
 		logger.info(f'Attempting to scroll into view: {target_node.tag_name}')
 
-		# Priority 1: Try by key/semantics first (most reliable)
-		if target_node.key:
-			try:
-				logger.info(f'Trying to scroll by key: {target_node.key}')
-				if self.platform_name.lower() == 'android':
-					self.driver.find_element(
-						AppiumBy.ANDROID_UIAUTOMATOR,
-						f'new UiScrollable(new UiSelector().scrollable(true)).scrollIntoView(new UiSelector().resourceId("{target_node.key}"))',
-					)
-					logger.info('Successfully scrolled using key')
-					return True
-				else:
-					# For iOS, use accessibility identifier in the predicate
-					self.driver.execute_script(
-						'mobile: scroll',
-						{
-							'direction': 'down',
-							'predicateString': f'identifier == "{target_node.key}"',
-						},
-					)
-					logger.info('Successfully scrolled using key')
-					return True
-			except Exception as e:
-				logger.error(f'Error scrolling by key: {str(e)}')
-
-		# Priority 2: Try coordinate-based scrolling if viewport coordinates are available
-		if target_node.viewport_coordinates:
-			try:
-				logger.info(
-					f'Trying coordinate-based scroll into view for element at ({target_node.viewport_coordinates.x}, {target_node.viewport_coordinates.y})'
+		def by_key(final):
+			logger.info(f'Trying to scroll by key: {target_node.key}')
+			if self.platform_name.lower() == 'android':
+				self._find_element(
+					'scroll_key',
+					AppiumBy.ANDROID_UIAUTOMATOR,
+					f'new UiScrollable(new UiSelector().scrollable(true)).scrollIntoView(new UiSelector().resourceId("{target_node.key}"))',
 				)
-				if self.scroll_element_into_view_by_coordinates(target_node):
-					logger.info('Successfully scrolled using coordinates')
-					return True
-				else:
-					logger.warning('Coordinate-based scroll failed, continuing with other methods')
-			except Exception as e:
-				logger.error(f'Error with coordinate-based scroll: {str(e)}')
+			else:
+				# For iOS, use accessibility identifier in the predicate
+				self.driver.execute_script(
+					'mobile: scroll',
+					{
+						'direction': 'down',
+						'predicateString': f'identifier == "{target_node.key}"',
+					},
+				)
+			logger.info('Successfully scrolled using key')
+			return True
 
-		# Priority 3: Try by text content
-		if target_node.text:
-			try:
-				logger.info(f"Trying to scroll by text: '{target_node.text}'")
-				if self.platform_name.lower() == 'android':
-					self.driver.find_element(
-						AppiumBy.ANDROID_UIAUTOMATOR,
-						f'new UiScrollable(new UiSelector().scrollable(true)).scrollIntoView(new UiSelector().text("{target_node.text}"))',
-					)
-					logger.info('Successfully scrolled using text content')
-					return True
-				else:
-					self.driver.execute_script(
-						'mobile: scroll',
-						{
-							'direction': 'down',
-							'predicateString': f'label == "{target_node.text}" OR name == "{target_node.text}" OR value == "{target_node.text}"',
-						},
-					)
-					logger.info('Successfully scrolled using text content')
-					return True
-			except Exception as e:
-				logger.error(f'Error scrolling by text: {str(e)}')
+		def by_coordinates(final):
+			logger.info(
+				f'Trying coordinate-based scroll into view for element at ({target_node.viewport_coordinates.x}, {target_node.viewport_coordinates.y})'
+			)
+			if self.scroll_element_into_view_by_coordinates(target_node):
+				logger.info('Successfully scrolled using coordinates')
+				return True
+			logger.warning('Coordinate-based scroll failed, continuing with other methods')
+			return False
 
-		# Priority 4: Try by element type
-		try:
+		def by_text(final):
+			logger.info(f"Trying to scroll by text: '{target_node.text}'")
+			if self.platform_name.lower() == 'android':
+				self._find_element(
+					'scroll_text',
+					AppiumBy.ANDROID_UIAUTOMATOR,
+					f'new UiScrollable(new UiSelector().scrollable(true)).scrollIntoView(new UiSelector().text("{target_node.text}"))',
+				)
+			else:
+				self.driver.execute_script(
+					'mobile: scroll',
+					{
+						'direction': 'down',
+						'predicateString': f'label == "{target_node.text}" OR name == "{target_node.text}" OR value == "{target_node.text}"',
+					},
+				)
+			logger.info('Successfully scrolled using text content')
+			return True
+
+		def by_type(final):
 			logger.info(f'Trying to scroll by type: {target_node.tag_name}')
 			if self.platform_name.lower() == 'android':
-				self.driver.find_element(
+				self._find_element(
+					'scroll_type',
 					AppiumBy.ANDROID_UIAUTOMATOR,
 					f'new UiScrollable(new UiSelector().scrollable(true)).scrollIntoView(new UiSelector().className("{target_node.tag_name}"))',
 				)
-				logger.info('Successfully scrolled using type')
-				return True
 			else:
 				self.driver.execute_script(
 					'mobile: scroll',
@@ -511,15 +911,52 @@ class App:
 						'predicateString': f'type == "{target_node.tag_name}"',
 					},
 				)
-				logger.info('Successfully scrolled using type')
+			logger.info('Successfully scrolled using type')
+			return True
+
+		locator = self.locator_for(target_node)
+
+		def by_locator(final):
+			logger.info(f'Trying to scroll by {locator.strategy}: {locator.scroll_selector}')
+			if self.platform_name.lower() == 'android':
+				self._find_element(
+					'scroll_locator',
+					AppiumBy.ANDROID_UIAUTOMATOR,
+					f'new UiScrollable(new UiSelector().scrollable(true)).scrollIntoView({locator.scroll_selector})',
+				)
+			else:
+				self.driver.execute_script(
+					'mobile: scroll', {'direction': 'down', 'predicateString': locator.scroll_selector}
+				)
+			logger.info('Successfully scrolled using precomputed locator')
+			return True
+
+		# Default order: precomputed locator (or key), coordinates, text, type; reordered by locator_stats.
+		# Scroll lookups never wait: the generic scroll below is the final attempt.
+		strategies = {
+			'locator': (locator is not None, by_locator),
+			'key': (locator is None and bool(target_node.key), by_key),
+			'coordinates': (target_node.viewport_coordinates is not None, by_coordinates),
+			'text': (locator is None and bool(target_node.text), by_text),
+			'type': (True, by_type),
+		}
+		if self._run_strategies('scroll_into_view', target_node, strategies):
+			return True
+
+		# Element with a locator: swipe and check with a lightweight query, no state rebuild
+		if target_node.key or target_node.text:
+			logger.info('Trying generic scroll until visible')
+			if self.scroll_until_visible(target_node.key, target_node.text, 'down', MAX_SCROLL_SWIPES):
 				return True
-		except Exception as e:
-			logger.error(f'Error scrolling by type: {str(e)}')
+			if self.scroll_until_visible(target_node.key, target_node.text, 'up', 2 * MAX_SCROLL_SWIPES):
+				return True
+			logger.error(f'Failed to scroll element with highlight_index: {highlight_index} into view')
+			return False
 
-		# Priority 5: Generic scroll fallback
+		# Generic scroll fallback
 		try:
 			logger.info('Trying generic scroll down')
-			size = self.driver.get_window_size()
+			size = self.window_size()
 			start_x = size['width'] // 2
 			start_y = size['height'] * 3 // 4
 			end_x = size['width'] // 2
@@ -544,6 +981,8 @@ class App:
 		logger.error(f'Failed to scroll element with highlight_index: {highlight_index} into view')
 		return False
 
+	@invalidates_state
+	@probes_locators
 	def ensure_element_visible_by_highlight_index(self, highlight_index: int, timeout: int = 5) -> bool:
 		selector_map = self.get_selector_map()
 		target_node = selector_map.get(highlight_index)
@@ -560,59 +999,29 @@ class App:
 				logger.info('Element is already visible based on coordinates')
 				return True
 
-		# Try to find element with shorter timeout to avoid long waits
+		def by_key(final):
+			by = AppiumBy.ID if self.platform_name.lower() == 'android' else AppiumBy.ACCESSIBILITY_ID
+			return self._find_element('key', by, target_node.key, final=final) is not None
+
+		def by_text(final):
+			if self.platform_name.lower() == 'android':
+				by, value = AppiumBy.ANDROID_UIAUTOMATOR, f'new UiSelector().text("{target_node.text}")'
+			else:
+				by = AppiumBy.XPATH
+				value = f'//*[@name="{target_node.text}" or @label="{target_node.text}" or @value="{target_node.text}"]'
+			return self._find_element('text', by, value, final=final) is not None
+
+		# Lookups run in fast-probe mode: only the last one waits, within the action budget
+		strategies = {
+			'key': (bool(target_node.key), by_key),
+			'text': (bool(target_node.text), by_text),
+		}
 		max_attempts = 3
 		attempt = 0
 
 		while attempt < max_attempts:
 			try:
-				element_found = False
-
-				# Try key-based lookup first (most reliable)
-				if target_node.key and not element_found:
-					try:
-						wait = WebDriverWait(self.driver, timeout=2)
-						if self.platform_name.lower() == 'android':
-							element = wait.until(EC.presence_of_element_located((AppiumBy.ID, target_node.key)))
-						else:
-							element = wait.until(EC.presence_of_element_located((AppiumBy.ACCESSIBILITY_ID, target_node.key)))
-						element_found = True
-					except (
-						TimeoutException,
-						StaleElementReferenceException,
-						NoSuchElementException,
-					):
-						pass
-
-				# Try text-based lookup if key didn't work
-				if target_node.text and not element_found:
-					try:
-						wait = WebDriverWait(self.driver, timeout=2)
-						if self.platform_name.lower() == 'android':
-							element = wait.until(
-								EC.presence_of_element_located(
-									(
-										AppiumBy.ANDROID_UIAUTOMATOR,
-										f'new UiSelector().text("{target_node.text}")',
-									)
-								)
-							)
-						else:
-							element = wait.until(
-								EC.presence_of_element_located(
-									(
-										AppiumBy.XPATH,
-										f'//*[@name="{target_node.text}" or @label="{target_node.text}" or @value="{target_node.text}"]',
-									)
-								)
-							)
-						element_found = True
-					except (
-						TimeoutException,
-						StaleElementReferenceException,
-						NoSuchElementException,
-					):
-						pass
+				element_found = self._run_strategies('ensure_visible', target_node, strategies)
 
 				# If element was found but not visible, try scrolling
 				if element_found:
@@ -623,7 +1032,7 @@ class App:
 				# If no element found at all, it might be off-screen, try generic scroll
 				if not element_found:
 					logger.info('Element not found, attempting generic scroll to bring it into view')
-					size = self.driver.get_window_size()
+					size = self.window_size()
 					start_x = size['width'] // 2
 					start_y = size['height'] * 3 // 4
 					end_x = size['width'] // 2
@@ -681,7 +1090,19 @@ class App:
 		xpath_condition = ' and '.join(xpath_parts)
 		return f'//*[{xpath_condition}]'
 
-	def close(self) -> None:
+	def close(self, force: bool = False) -> None:
+		"""
+		Quit the Appium session.
+
+		Args:
+		    force: Also close pooled sessions (used by AppiumSessionPool)
+		"""
+		if self.locator_stats is not None:
+			self.locator_stats.save()
+		if self.pooled and not force:
+			logger.debug('Pooled Appium session kept alive')
+			return
+		self.stop_screen_stream()
 		if self.driver:
 			try:
 				self.driver.quit()
@@ -691,6 +1112,7 @@ class App:
 			finally:
 				self.driver = None
 
+	@invalidates_state
 	def click_coordinates(self, x: int, y: int) -> bool:
 		"""
 		Click at specific coordinates
@@ -719,6 +1141,7 @@ class App:
 			logger.error(f'Error clicking at coordinates ({x}, {y}): {str(e)}')
 			return False
 
+	@invalidates_state
 	def click_element_by_coordinates(self, node: AppElementNode) -> bool:
 		"""
 		Click an element using its viewport coordinates
@@ -733,12 +1156,10 @@ class App:
 			logger.error(f'Node {node.highlight_index} has no viewport coordinates')
 			return False
 
-		# Click at the center of the element
-		center_x = int(node.viewport_coordinates.x + node.viewport_coordinates.width / 2)
-		center_y = int(node.viewport_coordinates.y + node.viewport_coordinates.height / 2)
-
-		return self.click_coordinates(center_x, center_y)
+		x, y = self.get_element_center_coordinates(node)
+		return self.click_coordinates(x, y)
 
+	@invalidates_state
 	def scroll_to_coordinates(self, x: int, y: int, direction: str = 'down', distance: int = 300) -> bool:
 		"""
 		Scroll at specific coordinates
@@ -774,6 +1195,7 @@ class App:
 			logger.error(f'Error scrolling at coordinates ({x}, {y}): {str(e)}')
 			return False
 
+	@invalidates_state
 	def long_press_coordinates(self, x: int, y: int, duration: int = 1000) -> bool:
 		"""
 		Long press at specific coordinates
@@ -793,9 +1215,16 @@ class App:
 			logger.error(f'Error long pressing at coordinates ({x}, {y}): {str(e)}')
 			return False
 
+	@invalidates_state
 	def input_text_at_coordinates(self, x: int, y: int, text: str) -> bool:
 		"""
-		Click at coordinates and input text
+		Click at coordinates and input text, replacing the current content.
+
+		After the tap the focused field is polled for (no fixed sleep) and must contain
+		the tapped point; otherwise False is returned so callers fall back to locating the
+		element. The text is replaced in one command on Android (mobile: replaceElementValue);
+		iOS clears and types on the focused element. The legacy clear-then-type sequence is
+		the fallback. The Appium round-trips of each entry are recorded in text_entry_round_trips.
 
 		Args:
 		    x: X coordinate
@@ -805,6 +1234,14 @@ class App:
 		Returns:
 		    bool: True if text input was successful
 		"""
+		if self.command_counter is None:
+			return self._input_text_at_coordinates(x, y, text)
+		with self.command_counter.measure() as measured:
+			result = self._input_text_at_coordinates(x, y, text)
+		self.text_entry_round_trips.append(measured['commands'])
+		return result
+
+	def _input_text_at_coordinates(self, x: int, y: int, text: str) -> bool:
 		try:
 			logger.info(f'Inputting text at coordinates ({x}, {y}): {text}')
 
@@ -812,9 +1249,65 @@ class App:
 			if not self.click_coordinates(x, y):
 				return False
 
-			# Wait a moment for the field to focus
-			time.sleep(0.5)
+			element = self._wait_for_focused_element(x, y)
+			if element is None:
+				logger.warning(f'Focus did not move to the field at ({x}, {y})')
+				return False
+			if self._replace_text(element, text):
+				logger.info('Successfully input text')
+				return True
+			return self._input_text_into_focused_field(text)
+		except Exception as e:
+			logger.error(f'Error inputting text at coordinates ({x}, {y}): {str(e)}')
+			return False
+
+	def _wait_for_focused_element(self, x: int, y: int, timeout: float = FOCUS_TIMEOUT):
+		"""
+		Poll for the focused element after a tap at (x, y).
+
+		A previously focused field keeps focus when the tap misses, so the focused
+		element only counts once its bounds contain the tapped point.
+
+		Returns:
+		    The focused WebElement, or None if the tapped field did not get focus within the timeout
+		"""
+		deadline = time.perf_counter() + timeout
+		while True:
+			try:
+				element = self.driver.switch_to.active_element
+				if element:
+					rect = element.rect
+					if rect['x'] <= x <= rect['x'] + rect['width'] and rect['y'] <= y <= rect['y'] + rect['height']:
+						return element
+					logger.debug(f'Focused element {rect} does not contain ({x}, {y}) yet')
+			except Exception as e:
+				logger.debug(f'No focused element yet: {e}')
+			if time.perf_counter() >= deadline:
+				logger.debug(f'Tapped field not focused after {timeout}s')
+				return None
+			time.sleep(FOCUS_POLL_INTERVAL)
+
+	def _replace_text(self, element, text: str) -> bool:
+		"""
+		Replace the content of a focused field with as few round-trips as possible.
+		"""
+		try:
+			if self.platform_name.lower() == 'android':
+				# Clear and type in a single UiAutomator2 command
+				self.driver.execute_script('mobile: replaceElementValue', {'elementId': element.id, 'text': text})
+			else:
+				element.clear()
+				element.send_keys(text)
+			return True
+		except Exception as e:
+			logger.debug(f'Batched text input failed, using the legacy sequence: {e}')
+			return False
 
+	def _input_text_into_focused_field(self, text: str) -> bool:
+		"""
+		Legacy clear-then-type sequence on the focused field, tried method by method.
+		"""
+		try:
 			# Clear any existing text - use more efficient methods
 			try:
 				logger.debug('Attempting to clear existing text')
@@ -861,10 +1354,8 @@ class App:
 					if not cleared:
 						try:
 							logger.debug('Using multiple delete fallback')
-							# Send fewer deletes to be more efficient
-							for _ in range(20):  # Reduced from 50 to 20
-								self.driver.execute_script('mobile: keys', {'keys': [{'key': 'delete'}]})
-								time.sleep(0.01)
+							# All the deletes in a single mobile: keys payload
+							self.driver.execute_script('mobile: keys', {'keys': [{'key': 'delete'}] * 20})
 							logger.debug('Completed multiple delete fallback')
 						except Exception as delete_error:
 							logger.debug(f'Multiple delete method failed: {delete_error}')
@@ -921,9 +1412,10 @@ class App:
 			logger.info('Successfully input text')
 			return True
 		except Exception as e:
-			logger.error(f'Error inputting text at coordinates ({x}, {y}): {str(e)}')
+			logger.error(f'Error inputting text into the focused field: {str(e)}')
 			return False
 
+	@invalidates_state
 	def swipe_coordinates(self, start_x: int, start_y: int, end_x: int, end_y: int, duration: int = 300) -> bool:
 		"""
 		Swipe from start coordinates to end coordinates
@@ -945,6 +1437,7 @@ class App:
 			logger.error(f'Error swiping from ({start_x}, {start_y}) to ({end_x}, {end_y}): {str(e)}')
 			return False
 
+	@invalidates_state
 	def drag_and_drop_coordinates(self, start_x: int, start_y: int, end_x: int, end_y: int, duration: int = 1000) -> bool:
 		"""
 		Drag and drop from start coordinates to end coordinates
@@ -966,6 +1459,95 @@ class App:
 			logger.error(f'Error dragging from ({start_x}, {start_y}) to ({end_x}, {end_y}): {str(e)}')
 			return False
 
+	def gestures(self) -> GestureSequence:
+		"""
+		Start a composite gesture sequence sized to the current screen.
+
+		Example:
+		    app.perform_gestures(app.gestures().swipe_direction('up', times=3).tap(540, 1200))
+
+		Returns:
+		    GestureSequence: Empty sequence to chain gestures on
+		"""
+		return GestureSequence(screen_size=self.window_size())
+
+	@invalidates_state
+	def perform_gestures(self, sequence: GestureSequence) -> bool:
+		"""
+		Perform several gestures (swipes, taps, long presses, drags, pinches) with a
+		single W3C actions request.
+
+		Args:
+		    sequence: Gestures built with gestures()
+
+		Returns:
+		    bool: True if the sequence was performed
+		"""
+		try:
+			return sequence.perform(self.driver)
+		except Exception as e:
+			logger.error(f'Error performing gesture sequence ({", ".join(sequence.gestures)}): {str(e)}')
+			return False
+
+	def _find_visible_element(self, key: str | None, text: str | None):
+		"""
+		Lightweight visibility check: one find_elements query per locator, no tree rebuild.
+
+		Returns:
+		    The first displayed matching WebElement, or None
+		"""
+		android = self.platform_name.lower() == 'android'
+		locators = []
+		if key:
+			locators.append((AppiumBy.ID, key) if android else (AppiumBy.ACCESSIBILITY_ID, key))
+		if text:
+			quoted = quote_selector_value(text)
+			if android:
+				locators.append((AppiumBy.ANDROID_UIAUTOMATOR, f'new UiSelector().text("{quoted}")'))
+			else:
+				locators.append((AppiumBy.IOS_PREDICATE, f'label == "{quoted}" OR name == "{quoted}" OR value == "{quoted}"'))
+		for by, value in locators:
+			for element in self.driver.find_elements(by, value):
+				if element.is_displayed():
+					return element
+		return None
+
+	@invalidates_state
+	@probes_locators
+	def scroll_until_visible(self, key: str = None, text: str = None, direction: str = 'down', max_swipes: int = 5) -> bool:
+		"""
+		Scroll until the element identified by key and/or text is displayed.
+
+		After each swipe visibility is checked with a zero-wait find_elements query
+		instead of a full get_app_state rebuild.
+
+		Args:
+		    key: Resource id (Android) or accessibility id (iOS)
+		    text: Visible text of the element
+		    direction: Direction to scroll the content ('down', 'up', 'left', 'right')
+		    max_swipes: Maximum number of swipes
+
+		Returns:
+		    bool: True if the element is displayed
+		"""
+		if not key and not text:
+			logger.error('scroll_until_visible needs a key or a text')
+			return False
+		if direction not in SCROLL_FINGER_DIRECTIONS:
+			logger.error(f"Invalid scroll direction: {direction}. Must be one of {', '.join(SCROLL_FINGER_DIRECTIONS)}.")
+			return False
+		try:
+			if self._find_visible_element(key, text) is not None:
+				return True
+			for swipe in range(1, max_swipes + 1):
+				self.gestures().swipe_direction(SCROLL_FINGER_DIRECTIONS[direction]).perform(self.driver)
+				if self._find_visible_element(key, text) is not None:
+					logger.info(f'Element visible after {swipe} swipe(s) {direction}')
+					return True
+		except Exception as e:
+			logger.error(f'Error scrolling {direction} until visible: {str(e)}')
+		return False
+
 	def is_element_in_viewport(self, node: AppElementNode, viewport_expansion: int = 0) -> bool:
 		"""
 		Check if an element is in the viewport
@@ -1016,6 +1598,7 @@ class App:
 
 		return (center_x, center_y)
 
+	@invalidates_state
 	def scroll_element_into_view_by_coordinates(self, node: AppElementNode, viewport_expansion: int = 0) -> bool:
 		"""
 		Scroll an element into view using coordinate-based scrolling
@@ -1064,6 +1647,7 @@ class App:
 		logger.warning(f'Could not determine scroll direction for element {node.highlight_index}')
 		return False
 
+	@invalidates_state
 	def pinch_gesture(self, center_x: int = None, center_y: int = None, percent: int = 50) -> bool:
 		"""
 		Perform a pinch gesture (pinch in/out)
@@ -1081,7 +1665,7 @@ class App:
 
 			# If no coordinates provided, use screen center
 			if center_x is None or center_y is None:
-				size = self.driver.get_window_size()
+				size = self.window_size()
 				center_x = size['width'] // 2
 				center_y = size['height'] // 2
 
@@ -1103,19 +1687,32 @@ class App:
 		    The main activity of the app, or an empty string if not found.
 		"""
 		try:
-			# Build the adb command with device specification if provided
-			device_flag = f'-s {device_name}' if device_name else ''
+			# One adb server connection per command, no shell/adb process spawn
+			adb = AdbClient.for_device(device_name)
 
 			logger.info(f'Detecting main activity for package: {package_name}')
 
+			# Methods 1 and 2 are read-only queries: run them in a single round-trip,
+			# each with its own 20s timeout
+			try:
+				dump_result, resolve_result = adb.shell_batch(
+					[
+						f'pm dump {package_name}',
+						f'cmd package resolve-activity -a android.intent.action.MAIN -c android.intent.category.LAUNCHER {package_name}',
+					],
+					timeout=20,
+				)
+			except Exception as e:
+				logger.warning(f'pm dump / resolve-activity query failed: {str(e)}')
+				dump_result = resolve_result = None
+
 			# Method 1: Use pm dump to get the launcher activity (most reliable)
 			try:
 				logger.info('Method 1: Using pm dump to find launcher activity')
-				dump_command = f'adb {device_flag} shell pm dump {package_name}'
-				result = subprocess.run(dump_command, shell=True, capture_output=True, text=True, timeout=20)
+				result = dump_result
 
-				if result.returncode == 0:
-					output = result.stdout
+				if result is not None and result.ok:
+					output = result.output
 					# Look for Activity sections with MAIN action and LAUNCHER category
 					lines = output.split('\n')
 					current_activity = None
@@ -1165,11 +1762,10 @@ class App:
 			# Method 2: Use cmd package resolve-activity (Android 7+)
 			try:
 				logger.info('Method 2: Using cmd package resolve-activity')
-				resolve_command = f'adb {device_flag} shell cmd package resolve-activity -a android.intent.action.MAIN -c android.intent.category.LAUNCHER {package_name}'
-				result = subprocess.run(resolve_command, shell=True, capture_output=True, text=True, timeout=10)
+				result = resolve_result
 
-				if result.returncode == 0 and result.stdout.strip():
-					output = result.stdout.strip()
+				if result is not None and result.ok and result.output.strip():
+					output = result.output.strip()
 					# Look for "name=" in the output which indicates the activity
 					name_match = re.search(r'name=([^\s]+)', output)
 					if name_match:
@@ -1185,12 +1781,11 @@ class App:
 			# Method 3: Use monkey to actually launch and see what starts
 			try:
 				logger.info('Method 3: Using monkey to detect launcher activity')
-				monkey_command = f'adb {device_flag} shell monkey -p {package_name} -c android.intent.category.LAUNCHER 1'
-				result = subprocess.run(monkey_command, shell=True, capture_output=True, text=True, timeout=10)
+				result = adb.shell(f'monkey -p {package_name} -c android.intent.category.LAUNCHER 1', timeout=10)
 
-				if result.returncode == 0:
-					# Look in both stdout and stderr for the activity information
-					full_output = result.stdout + '\n' + result.stderr
+				if result.ok:
+					# The adb shell merges stdout and stderr
+					full_output = result.output
 
 					# Look for "Starting: Intent" pattern
 					intent_match = re.search(r'Starting: Intent \{[^}]*cmp=([^/]+)/([^}\s]+)', full_output)
@@ -1210,19 +1805,20 @@ class App:
 				logger.info('Method 4: Launch with intent and check running activity')
 
 				# Launch the app using intent
-				intent_command = f'adb {device_flag} shell am start -a android.intent.action.MAIN -c android.intent.category.LAUNCHER -n {package_name}/'
-				subprocess.run(intent_command, shell=True, capture_output=True, timeout=5)
+				adb.shell(f'am start -a android.intent.action.MAIN -c android.intent.category.LAUNCHER -n {package_name}/', timeout=5)
 
 				# Wait a moment for the app to start
 				time.sleep(2)
 
-				# Check what activity is currently running
-				check_command = f"adb {device_flag} shell dumpsys activity activities | grep -E 'mResumedActivity.*{package_name}|mFocusedActivity.*{package_name}'"
-				result = subprocess.run(check_command, shell=True, capture_output=True, text=True, timeout=5)
+				# Check what activity is currently running (grep runs on the device)
+				result = adb.shell(
+					f"dumpsys activity activities | grep -E 'mResumedActivity.*{package_name}|mFocusedActivity.*{package_name}'",
+					timeout=5,
+				)
 
-				if result.returncode == 0 and result.stdout.strip():
+				if result.ok and result.output.strip():
 					# Parse the activity from the dumpsys output
-					activity_match = re.search(r'([^/\s]+)/([^/\s}]+)', result.stdout)
+					activity_match = re.search(r'([^/\s]+)/([^/\s}]+)', result.output)
 					if activity_match:
 						package, activity = activity_match.groups()
 						if package == package_name:
@@ -1274,6 +1870,7 @@ class App:
 		logger.error(f'Could not detect main activity for package: {package_name}')
 		return ''
 
+	@invalidates_state
 	def scroll_by_amount(self, amount: int, direction: str = 'down') -> bool:
 		"""
 		Scroll the page by a specific pixel amount in the given direction
@@ -1293,7 +1890,7 @@ class App:
 				return False
 
 			# Get screen dimensions
-			size = self.driver.get_window_size()
+			size = self.window_size()
 			center_x = size['width'] // 2
 			center_y = size['height'] // 2
 
@@ -1327,6 +1924,7 @@ class App:
 			logger.error(f'Error scrolling {direction} by {amount} pixels: {str(e)}')
 			return False
 
+	@invalidates_state
 	def send_keys(self, keys: str) -> bool:
 		"""
 		Send keyboard keys like Enter, Back, Home, etc. for mobile navigation and text input completion
@@ -0,0 +1,120 @@
+"""
+ADB Client Benchmark - Verifica del protocollo smart socket e costo dei round-trip
+Contro benchmarks/fake_adb_server.py controlla che AdbClient separi output ed exit code
+dei comandi di un batch, riporti gli errori del server (device non trovato), applichi il
+timeout a ciascun comando del batch e ripieghi sul binario adb senza server. Poi confronta
+N comandi eseguiti uno per connessione con lo stesso batch in un solo round-trip.
+
+Uso:
+    python benchmarks/adb_client_benchmark.py
+    python benchmarks/adb_client_benchmark.py --commands 8 --transport-delay 0.05 --repeat 5
+"""
+import argparse
+import json
+import socket
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from benchmarks.fake_adb_server import FakeAdbServer
+from utilities.adb_client import AdbClient, AdbError, AdbTimeoutError
+
+SERIAL = 'emulator-5554'
+
+
+def check(name: str, condition: bool, results: list):
+    results.append({'check': name, 'ok': bool(condition)})
+    print(f"{'✅' if condition else '❌'} {name}")
+
+
+def run_checks(port: int) -> list:
+    results = []
+    client = AdbClient(SERIAL, port=port, timeout=5)
+
+    outputs = client.shell_batch(['echo uno', 'echo due >&2; false', "printf 'a\\nb'"])
+    check('batch: output separati', [r.output for r in outputs] == ['uno\n', 'due\n', 'a\nb'], results)
+    check('batch: exit code per comando', [r.returncode for r in outputs] == [0, 1, 0], results)
+    check('batch: un solo round-trip', client.round_trips == 1 and client.commands == 3, results)
+
+    large = client.shell('seq 1 200000')
+    check('output di più chunk', large.ok and large.output.count('\n') == 200000, results)
+
+    try:
+        AdbClient('missing-device', port=port).shell('echo x')
+        check('FAIL del server -> AdbError', False, results)
+    except AdbError as e:
+        check('FAIL del server -> AdbError', 'not found' in str(e), results)
+
+    # Timeout per comando: il batch dura più del timeout, nessun comando lo supera
+    start = time.perf_counter()
+    try:
+        slow = AdbClient(SERIAL, port=port).shell_batch(['sleep 0.6; echo a', 'sleep 0.6; echo b'], timeout=1.0)
+        check('timeout per comando (batch 1.2s, timeout 1s)', [r.output for r in slow] == ['a\n', 'b\n'], results)
+    except AdbTimeoutError:
+        check('timeout per comando (batch 1.2s, timeout 1s)', False, results)
+    try:
+        AdbClient(SERIAL, port=port).shell('sleep 3', timeout=0.5)
+        check('comando oltre il timeout -> AdbTimeoutError', False, results)
+    except AdbTimeoutError:
+        check('comando oltre il timeout -> AdbTimeoutError', time.perf_counter() - start < 3.0, results)
+
+    # Nessun server sulla porta: fallback sul binario adb (assente qui -> AdbError)
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        free_port = probe.getsockname()[1]
+    offline = AdbClient(SERIAL, port=free_port, timeout=1)
+    try:
+        offline.shell('echo x')
+        check('fallback sul binario adb', offline.subprocess_fallbacks == 1, results)
+    except AdbError:
+        check('fallback sul binario adb', offline.subprocess_fallbacks == 1, results)
+    return results
+
+
+def measure(port: int, commands: int, repeat: int) -> dict:
+    """Tempo medio di N comandi uno per connessione e in un unico batch."""
+    client = AdbClient(SERIAL, port=port)
+    batch = [f'echo {i}' for i in range(commands)]
+    timings = {'separati': [], 'batch': []}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for command in batch:
+            client.shell(command)
+        timings['separati'].append(time.perf_counter() - start)
+        start = time.perf_counter()
+        client.shell_batch(batch)
+        timings['batch'].append(time.perf_counter() - start)
+    return {mode: round(sum(values) / len(values) * 1000, 1) for mode, values in timings.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Verifica e benchmark di AdbClient su un fake adb server')
+    parser.add_argument('--commands', type=int, default=5, help='Comandi per batch')
+    parser.add_argument('--transport-delay', type=float, default=0.02, help='Costo della connessione al device (s)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--json', help='Salva i risultati in un file JSON')
+    args = parser.parse_args()
+
+    server = FakeAdbServer([SERIAL], transport_delay=args.transport_delay).start()
+    try:
+        checks = run_checks(server.port)
+        timings = measure(server.port, args.commands, args.repeat)
+    finally:
+        server.stop()
+
+    print(f"\n{args.commands} comandi, connessione {args.transport_delay * 1000:.0f}ms")
+    print(f"{'separati':<12}{timings['separati']:>10.1f}ms")
+    print(f"{'batch':<12}{timings['batch']:>10.1f}ms")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({'checks': checks, 'timings_ms': timings}, indent=2), encoding='utf-8')
+        print(f"\n💾 Risultati salvati in {args.json}")
+    if not all(result['ok'] for result in checks):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
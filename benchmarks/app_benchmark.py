@@ -0,0 +1,182 @@
+"""
+App Benchmark - Overhead della classe App misurato contro il fake Appium server
+Esegue get_app_state, click_element_by_highlight_index, enter_text_with_highlight_index
+e scroll_into_view_by_highlight_index su page source predefinite e riporta, per
+operazione, tempo (medio e p95), round-trip Appium e tempo speso dal server: la
+differenza è l'overhead di App (tree building, cascate di fallback, attese).
+Non richiede device né emulatori: gira su una normale macchina Linux di CI.
+
+Uso:
+    python benchmarks/app_benchmark.py --iterations 20
+    python benchmarks/app_benchmark.py --fixture settings_list.xml settings_list_page2.xml
+    python benchmarks/app_benchmark.py --json risultati.json
+    python benchmarks/app_benchmark.py --baseline risultati.json --tolerance 0.25
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from app_class import App
+from benchmarks.fake_appium_server import FakeAppiumServer, load_fixture
+
+TEXT_FIELD_TYPES = ('EditText', 'TextField', 'SearchField')
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def pick_targets(app: App) -> dict:
+    """
+    Sceglie gli elementi su cui misurare le operazioni: primo campo di testo,
+    primo pulsante, elemento interattivo più in basso (per lo scroll).
+    """
+    nodes = sorted(app.get_app_state().selector_map.items())
+    if not nodes:
+        raise RuntimeError('La page source non contiene elementi interattivi')
+
+    def original_type(node):
+        return node.attributes.get('_original_type') or node.tag_name or ''
+
+    text_field = next((index for index, node in nodes if any(t in original_type(node) for t in TEXT_FIELD_TYPES)), None)
+    button = next((index for index, node in nodes if 'Button' in original_type(node)), nodes[0][0])
+    lowest = max(
+        nodes,
+        key=lambda item: item[1].viewport_coordinates.y if item[1].viewport_coordinates else -1,
+    )[0]
+    return {'text_field': text_field, 'button': button, 'scroll_target': lowest}
+
+
+def build_operations(app: App, targets: dict) -> dict:
+    def get_app_state():
+        app.invalidate_state()
+        app.get_app_state()
+
+    operations = {
+        'get_app_state': get_app_state,
+        'click_element_by_highlight_index': lambda: app.click_element_by_highlight_index(targets['button']),
+        'scroll_into_view_by_highlight_index': lambda: app.scroll_into_view_by_highlight_index(targets['scroll_target']),
+    }
+    if targets['text_field'] is not None:
+        operations['enter_text_with_highlight_index'] = lambda: app.enter_text_with_highlight_index(
+            targets['text_field'], 'benchmark'
+        )
+    return operations
+
+
+def run_benchmark(server: FakeAppiumServer, iterations: int, stability_timeout: float, stability_interval: float) -> dict:
+    """
+    Esegue ogni operazione iterations volte (più un warm-up non misurato).
+
+    Returns:
+        {operazione: {'mean_ms', 'p95_ms', 'round_trips', 'server_ms', 'overhead_ms'}}
+    """
+    app = App(
+        platform_name='Android',
+        device_name='fake-device',
+        app_package='com.example.fake',
+        app_activity='.MainActivity',
+        appium_server_url=server.url,
+        stability_timeout=stability_timeout,
+        stability_interval=stability_interval,
+    )
+    try:
+        targets = pick_targets(app)
+        results = {}
+        for name, operation in build_operations(app, targets).items():
+            operation()  # warm-up: cache del tree builder e delle dimensioni dello schermo
+            walls, round_trips, server_seconds = [], [], []
+            for _ in range(iterations):
+                server.reset_stats()
+                commands_before = app.command_counter.total
+                start = time.perf_counter()
+                operation()
+                walls.append(time.perf_counter() - start)
+                round_trips.append(app.command_counter.total - commands_before)
+                server_seconds.append(sum(stats['seconds'] for stats in server.command_stats.values()))
+            mean = sum(walls) / len(walls)
+            server_mean = sum(server_seconds) / len(server_seconds)
+            results[name] = {
+                'mean_ms': round(mean * 1000, 2),
+                'p95_ms': round(percentile(walls, 0.95) * 1000, 2),
+                'round_trips': round(sum(round_trips) / len(round_trips), 2),
+                'server_ms': round(server_mean * 1000, 2),
+                'overhead_ms': round((mean - server_mean) * 1000, 2),
+            }
+        return results
+    finally:
+        app.close(force=True)
+
+
+def print_results(results: dict):
+    print(f"\n{'Operazione':<40}{'media':>10}{'p95':>10}{'round-trip':>12}{'server':>10}{'overhead':>10}")
+    for name, stats in results.items():
+        print(
+            f"{name:<40}{stats['mean_ms']:>8.1f}ms{stats['p95_ms']:>8.1f}ms{stats['round_trips']:>12.1f}"
+            f"{stats['server_ms']:>8.1f}ms{stats['overhead_ms']:>8.1f}ms"
+        )
+
+
+def compare_with_baseline(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Regressioni rispetto a un file di risultati precedente: più round-trip del baseline
+    o tempo medio oltre la tolleranza (es. 0.25 = +25%).
+    """
+    regressions = []
+    for name, stats in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        if stats['round_trips'] > reference['round_trips']:
+            regressions.append(f"{name}: round-trip {reference['round_trips']} -> {stats['round_trips']}")
+        if stats['mean_ms'] > reference['mean_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: tempo medio {reference['mean_ms']}ms -> {stats['mean_ms']}ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark della classe App contro un fake Appium server')
+    parser.add_argument('--fixture', nargs='+', default=['login_screen.xml'], help='Page source (una pagina per swipe)')
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0.0, help='Latenza simulata per comando (ms)')
+    parser.add_argument('--stability-timeout', type=float, default=None, help='Limite attesa UI (s), default da .env')
+    parser.add_argument('--stability-interval', type=float, default=None, help='Intervallo attesa UI (s), default da .env')
+    parser.add_argument('--json', help='Salva i risultati in un file JSON')
+    parser.add_argument('--baseline', help='File JSON di riferimento: exit code 1 in caso di regressione')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Tolleranza sul tempo medio rispetto al baseline')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    server = FakeAppiumServer([load_fixture(name) for name in args.fixture], latency=args.latency / 1000).start()
+    print(f"📱 Fake Appium server su {server.url} ({', '.join(args.fixture)}, latenza {args.latency:g}ms)")
+    try:
+        results = run_benchmark(server, args.iterations, args.stability_timeout, args.stability_interval)
+    finally:
+        server.stop()
+
+    print_results(results)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding='utf-8')
+        print(f"\n💾 Risultati salvati in {args.json}")
+
+    if args.baseline:
+        regressions = compare_with_baseline(results, json.loads(Path(args.baseline).read_text(encoding='utf-8')), args.tolerance)
+        if regressions:
+            print('\n❌ Regressioni rispetto al baseline:')
+            for regression in regressions:
+                print(f'   {regression}')
+            sys.exit(1)
+        print('\n✅ Nessuna regressione rispetto al baseline')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Cloud Prefetch Benchmark - Tempo totale di una sequenza di righe cloud con e senza pre-riscaldamento
+Il fake Appium server fa da hub cloud: ogni creazione di sessione dura --session-delay
+secondi (allocazione del device). Ogni riga crea (o prende dal CloudSessionPrefetcher)
+la propria sessione, avvia la creazione di quelle successive ed esegue un test simulato
+di --test-seconds secondi, come MobileTestExecutor con Execution=cloud.
+
+Uso:
+    python benchmarks/cloud_prefetch_benchmark.py
+    python benchmarks/cloud_prefetch_benchmark.py --rows 6 --session-delay 5 --test-seconds 8 --lookahead 2
+    python benchmarks/cloud_prefetch_benchmark.py --idle-timeout 12 --test-seconds 8 --lookahead 2
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from app_class import App
+from benchmarks.fake_appium_server import FakeAppiumServer, load_fixture
+from utilities.cloud_sessions import CloudSessionPrefetcher, lambdatest_hub_url
+
+
+def cloud_caps(row: int) -> dict:
+    """Capabilities cloud distinte per riga (build/name per test, come set_mobile_cloud_caps)."""
+    return {
+        'platform_name': 'Android',
+        'device_name': f'Cloud Device {row}',
+        'app': 'lt://APP_FAKE',
+        'isRealMobile': True,
+        'build': 'cloud-prefetch-benchmark',
+        'name': f'row {row}',
+    }
+
+
+def run_rows(hub_url: str, rows: int, test_seconds: float, prefetcher: CloudSessionPrefetcher) -> dict:
+    """
+    Esegue le righe in sequenza e restituisce tempo totale e attese di setup per riga.
+    """
+    def create(row):
+        return App(appium_server_url=hub_url, **cloud_caps(row))
+
+    setups = []
+    start = time.perf_counter()
+    for row in range(rows):
+        setup_start = time.perf_counter()
+        app = prefetcher.take(row) or create(row)
+        setups.append(time.perf_counter() - setup_start)
+        # Sessione corrente aperta: il prefetch delle righe successive rispetta la concorrenza
+        for upcoming in range(row + 1, min(rows, row + 1 + prefetcher.lookahead)):
+            if not prefetcher.has(upcoming):
+                prefetcher.prefetch(upcoming, lambda upcoming=upcoming: create(upcoming), open_sessions=1)
+        time.sleep(test_seconds)
+        app.close()
+    total = time.perf_counter() - start
+    stats = prefetcher.get_stats()
+    prefetcher.close_all()
+    return {
+        'total_s': round(total, 2),
+        'setup_s': [round(seconds, 2) for seconds in setups],
+        'mean_setup_s': round(sum(setups) / len(setups), 2) if setups else 0.0,
+        **{key: stats[key] for key in ('requested', 'hits', 'expired', 'failed')},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark del pre-riscaldamento delle sessioni cloud su un hub locale')
+    parser.add_argument('--rows', type=int, default=4)
+    parser.add_argument('--session-delay', type=float, default=3.0, help='Durata della creazione di una sessione (s)')
+    parser.add_argument('--test-seconds', type=float, default=4.0, help='Durata simulata di ogni test (s)')
+    parser.add_argument('--lookahead', type=int, default=1)
+    parser.add_argument('--max-concurrency', type=int, default=2)
+    parser.add_argument('--idle-timeout', type=int, default=300, help='Idle timeout del hub (s)')
+    parser.add_argument('--json', help='Salva i risultati in un file JSON')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    server = FakeAppiumServer([load_fixture('login_screen.xml')], session_delay=args.session_delay).start()
+    hub_url = lambdatest_hub_url('benchmark', 'fake-key', f'{server.url}/wd/hub')
+    try:
+        results = {}
+        for mode, lookahead in (('sequenziale', 0), ('prefetch', args.lookahead)):
+            prefetcher = CloudSessionPrefetcher(lookahead, args.max_concurrency, args.idle_timeout)
+            results[mode] = run_rows(hub_url, args.rows, args.test_seconds, prefetcher)
+    finally:
+        server.stop()
+
+    print(f"\n{'Modalità':<14}{'totale':>10}{'setup medio':>14}{'usate':>8}{'scadute':>9}  setup per riga")
+    for mode, stats in results.items():
+        print(
+            f"{mode:<14}{stats['total_s']:>9.1f}s{stats['mean_setup_s']:>13.1f}s{stats['hits']:>8}{stats['expired']:>9}  "
+            + ", ".join(f"{seconds:.1f}s" for seconds in stats['setup_s'])
+        )
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding='utf-8')
+        print(f"\n💾 Risultati salvati in {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Fake ADB Server - Server adb locale (protocollo smart socket) per verificare AdbClient
+Risponde alle richieste host:transport:<serial> / host:transport-any e esegue gli script
+shell:<comando> con la shell locale (sh), come farebbe quella del device, inviando
+stdout e stderr uniti. Non richiede device, emulatori né il binario adb.
+
+Uso da riga di comando:
+    python benchmarks/fake_adb_server.py --port 5037 --serial emulator-5554
+"""
+import argparse
+import socketserver
+import subprocess
+import threading
+import time
+
+
+class FakeAdbServer:
+    """
+    Server TCP in un thread di background. transport_delay simula il costo della
+    connessione al device (secondi); connections e shell_requests contano le richieste.
+    """
+
+    def __init__(self, serials=('emulator-5554',), host: str = '127.0.0.1', port: int = 0, transport_delay: float = 0.0):
+        self.serials = set(serials)
+        self.transport_delay = transport_delay
+        self.connections = 0
+        self.shell_requests = 0
+        self._lock = threading.Lock()
+        self.server = socketserver.ThreadingTCPServer((host, port), self._make_handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def port(self) -> int:
+        return self.server.server_address[1]
+
+    def start(self) -> 'FakeAdbServer':
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def _read_request(self) -> str | None:
+                header = self._recv_exact(4)
+                if header is None:
+                    return None
+                return (self._recv_exact(int(header, 16)) or b'').decode('utf-8')
+
+            def _recv_exact(self, size: int) -> bytes | None:
+                data = b''
+                while len(data) < size:
+                    chunk = self.request.recv(size - len(data))
+                    if not chunk:
+                        return None
+                    data += chunk
+                return data
+
+            def _fail(self, message: str):
+                data = message.encode('utf-8')
+                self.request.sendall(b'FAIL' + b'%04x' % len(data) + data)
+
+            def handle(self):
+                with server._lock:
+                    server.connections += 1
+                while True:
+                    payload = self._read_request()
+                    if payload is None:
+                        return
+                    if payload == 'host:transport-any' or payload.startswith('host:transport:'):
+                        serial = payload[len('host:transport:'):] if payload.startswith('host:transport:') else None
+                        if serial is not None and serial not in server.serials:
+                            self._fail(f"device '{serial}' not found")
+                            return
+                        time.sleep(server.transport_delay)
+                        self.request.sendall(b'OKAY')
+                    elif payload.startswith('shell:'):
+                        with server._lock:
+                            server.shell_requests += 1
+                        self.request.sendall(b'OKAY')
+                        self._run_shell(payload[len('shell:'):])
+                        return
+                    else:
+                        self._fail(f'unknown host service: {payload}')
+                        return
+
+            def _run_shell(self, script: str):
+                process = subprocess.Popen(['sh', '-c', script], stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+                try:
+                    # Output inviato man mano, come lo stream della shell adb
+                    for chunk in iter(lambda: process.stdout.read1(65536), b''):
+                        self.request.sendall(chunk)
+                except OSError:
+                    # Il client ha chiuso la connessione (es. timeout)
+                    pass
+                finally:
+                    process.kill()
+                    process.wait()
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fake adb server per AdbClient')
+    parser.add_argument('--port', type=int, default=5037)
+    parser.add_argument('--serial', action='append', default=None, help='Seriale dei device simulati')
+    parser.add_argument('--transport-delay', type=float, default=0.0)
+    args = parser.parse_args()
+    server = FakeAdbServer(args.serial or ['emulator-5554'], port=args.port, transport_delay=args.transport_delay).start()
+    print(f'Fake adb server in ascolto su 127.0.0.1:{server.port} (Ctrl+C per terminare)')
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,382 @@
+"""
+Fake Appium Server - Endpoint WebDriver/Appium locale per i benchmark di App
+Serve page source XML e screenshot predefiniti, risponde ai comandi W3C usati da App
+(sessione, ricerca elementi, azioni, mobile: ...) e registra numero e latenza di ogni
+comando. Non richiede device, emulatori né un server Appium.
+
+Uso da riga di comando:
+    python benchmarks/fake_appium_server.py --port 4723 --fixture login_screen.xml
+"""
+import argparse
+import base64
+import json
+import re
+import threading
+import time
+import uuid
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from pathlib import Path
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+
+# PNG 1x1 usato quando Pillow non è disponibile
+FALLBACK_PNG = base64.b64decode(
+    'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8z8BQDwAEhQGAhKmMIQAAAABJRU5ErkJggg=='
+)
+
+BOUNDS_PATTERN = re.compile(r'\[(-?\d+),(-?\d+)\]\[(-?\d+),(-?\d+)\]')
+UIAUTOMATOR_PATTERN = re.compile(r'\.(resourceId|text|className|description)\("([^"]*)"\)')
+UIAUTOMATOR_ATTRIBUTES = {'resourceId': 'resource-id', 'text': 'text', 'className': 'class', 'description': 'content-desc'}
+
+
+def load_fixture(name: str) -> str:
+    """Legge una page source dalla cartella fixtures (nome file o percorso)."""
+    path = Path(name)
+    if not path.exists():
+        path = FIXTURES_DIR / name
+    return path.read_text(encoding='utf-8')
+
+
+def make_screenshot(width: int, height: int) -> bytes:
+    """Screenshot PNG delle dimensioni dello schermo (tinta unita)."""
+    try:
+        from PIL import Image
+
+        buffer = BytesIO()
+        Image.new('RGB', (width, height), (235, 238, 242)).save(buffer, format='PNG')
+        return buffer.getvalue()
+    except Exception:
+        return FALLBACK_PNG
+
+
+class FakeDevice:
+    """
+    Stato del device simulato: pagine (page source) e elementi restituiti ad App.
+    Ogni swipe (azione W3C con un pointerMove di durata > 0) passa alla pagina successiva.
+    """
+
+    def __init__(self, pages: list, width: int = 1080, height: int = 2400):
+        self.pages = pages
+        self.page_index = 0
+        self.width = width
+        self.height = height
+        self.screenshot = base64.b64encode(make_screenshot(width, height)).decode('ascii')
+        self._elements = {}
+        self._element_ids = {}
+        self._load_page()
+
+    @property
+    def page_source(self) -> str:
+        return self.pages[self.page_index]
+
+    def _load_page(self):
+        self.root = ET.fromstring(self.page_source)
+        self._elements = {}
+        self._element_ids = {}
+
+    def next_page(self):
+        if len(self.pages) > 1:
+            self.page_index = (self.page_index + 1) % len(self.pages)
+            self._load_page()
+
+    def element_id(self, element) -> str:
+        key = id(element)
+        if key not in self._element_ids:
+            element_id = uuid.uuid4().hex
+            self._element_ids[key] = element_id
+            self._elements[element_id] = element
+        return self._element_ids[key]
+
+    def get_element(self, element_id: str):
+        return self._elements.get(element_id)
+
+    def find(self, using: str, value: str) -> list:
+        """Ricerca semplificata: id, accessibility id, class name, xpath (ElementTree), uiautomator."""
+        nodes = list(self.root.iter())
+        if using == 'id':
+            return [node for node in nodes if node.get('resource-id') == value]
+        if using == 'accessibility id':
+            return [node for node in nodes if node.get('content-desc') == value or node.get('name') == value]
+        if using == 'class name':
+            return [node for node in nodes if node.get('class', node.tag) == value]
+        if using == '-android uiautomator':
+            # Per UiScrollable(...).scrollIntoView(selector) conta l'ultimo selettore
+            matches = UIAUTOMATOR_PATTERN.findall(value.rsplit('scrollIntoView', 1)[-1])
+            return [
+                node for node in nodes
+                if matches and all(node.get(UIAUTOMATOR_ATTRIBUTES[attr]) == expected for attr, expected in matches)
+            ]
+        if using == 'xpath':
+            try:
+                return self.root.findall('.' + value if value.startswith('//') else value)
+            except (SyntaxError, KeyError):
+                return []
+        return []
+
+    def rect(self, element) -> dict:
+        match = BOUNDS_PATTERN.match(element.get('bounds', ''))
+        if not match:
+            return {'x': 0, 'y': 0, 'width': 0, 'height': 0}
+        x1, y1, x2, y2 = map(int, match.groups())
+        return {'x': x1, 'y': y1, 'width': x2 - x1, 'height': y2 - y1}
+
+    def active_element(self):
+        for node in self.root.iter():
+            if node.get('focused') == 'true':
+                return node
+        for node in self.root.iter():
+            if 'EditText' in node.get('class', node.tag):
+                return node
+        return None
+
+
+class FakeAppiumServer:
+    """
+    Server HTTP in un thread di background. Le statistiche per comando sono in
+    command_stats: {comando: {'count', 'seconds'}}; latency simula la rete (secondi) e
+    session_delay l'allocazione del device di un hub cloud alla creazione della sessione;
+    oltre max_sessions sessioni aperte la creazione fallisce con "coda piena" come sul cloud.
+    """
+
+    def __init__(
+        self,
+        pages: list,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        latency: float = 0.0,
+        session_delay: float = 0.0,
+        max_sessions: int = 0,
+    ):
+        """
+        Args:
+            pages: Page source XML servite in sequenza (una pagina per swipe)
+            host: Indirizzo di ascolto
+            port: Porta (0 = porta libera)
+            latency: Latenza aggiunta a ogni comando, in secondi
+            session_delay: Durata della creazione di una sessione, in secondi
+            max_sessions: Sessioni aperte contemporaneamente (0 = nessun limite)
+        """
+        self.device = FakeDevice(pages)
+        self.latency = latency
+        self.session_delay = session_delay
+        self.max_sessions = max_sessions
+        self.open_sessions = set()
+        self.command_stats = defaultdict(lambda: {'count': 0, 'seconds': 0.0})
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'FakeAppiumServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reset_stats(self):
+        with self._lock:
+            self.command_stats.clear()
+
+    @property
+    def total_commands(self) -> int:
+        return sum(stats['count'] for stats in self.command_stats.values())
+
+    def _record(self, command: str, seconds: float):
+        with self._lock:
+            self.command_stats[command]['count'] += 1
+            self.command_stats[command]['seconds'] += seconds
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _body(self) -> dict:
+                length = int(self.headers.get('Content-Length') or 0)
+                if not length:
+                    return {}
+                try:
+                    return json.loads(self.rfile.read(length))
+                except ValueError:
+                    return {}
+
+            def _send(self, value, status: int = 200):
+                payload = json.dumps({'value': value}).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _handle(self, method: str):
+                start = time.perf_counter()
+                if server.latency:
+                    time.sleep(server.latency)
+                parts = [part for part in self.path.split('?')[0].split('/') if part]
+                if parts[:2] == ['wd', 'hub']:
+                    parts = parts[2:]
+                command, value, status = server.dispatch(method, parts, self._body())
+                server._record(command, time.perf_counter() - start)
+                self._send(value, status)
+
+            def do_GET(self):
+                self._handle('GET')
+
+            def do_POST(self):
+                self._handle('POST')
+
+            def do_DELETE(self):
+                self._handle('DELETE')
+
+        return Handler
+
+    def dispatch(self, method: str, parts: list, body: dict) -> tuple:
+        """
+        Restituisce (nome comando, value, status HTTP) per la richiesta.
+        I comandi non gestiti rispondono con value null.
+        """
+        device = self.device
+        if parts == ['status']:
+            return 'status', {'ready': True, 'message': 'fake appium'}, 200
+        if parts == ['session'] and method == 'POST':
+            with self._lock:
+                if self.max_sessions and len(self.open_sessions) >= self.max_sessions:
+                    return 'newSession', self._error(
+                        'session not created', f'Queue is full: {self.max_sessions} parallel sessions already running'
+                    ), 500
+                session_id = uuid.uuid4().hex
+                self.open_sessions.add(session_id)
+            if self.session_delay:
+                time.sleep(self.session_delay)
+            capabilities = body.get('capabilities', {}).get('alwaysMatch', {})
+            return 'newSession', {'sessionId': session_id, 'capabilities': capabilities}, 200
+        if len(parts) < 2 or parts[0] != 'session':
+            return 'unknown', None, 200
+
+        route = parts[2:]
+        if not route:
+            if method == 'DELETE':
+                with self._lock:
+                    self.open_sessions.discard(parts[1])
+                return 'deleteSession', None, 200
+            return 'getSession', None, 200
+        name = route[0]
+
+        if name == 'source':
+            return 'getPageSource', device.page_source, 200
+        if name == 'screenshot':
+            return 'screenshot', device.screenshot, 200
+        if name == 'window' and route[-1] in ('rect', 'size'):
+            return 'getWindowRect', {'x': 0, 'y': 0, 'width': device.width, 'height': device.height}, 200
+        if name == 'orientation':
+            return 'getOrientation', 'PORTRAIT', 200
+        if name == 'timeouts':
+            return 'timeouts', {'implicit': 0, 'pageLoad': 300000, 'script': 30000}, 200
+        if name == 'actions':
+            if method == 'POST' and self._is_swipe(body):
+                device.next_page()
+            return ('performActions' if method == 'POST' else 'releaseActions'), None, 200
+        if name == 'execute':
+            script = body.get('script', '')
+            if script.startswith('mobile:') and ('swipe' in script.lower() or 'scroll' in script.lower()):
+                device.next_page()
+            return f'execute ({script})', None, 200
+        if name in ('element', 'elements'):
+            return self._dispatch_element(method, route, body)
+        if name == 'appium':
+            return 'appium/' + '/'.join(route[1:]), None, 200
+        return '/'.join(route), None, 200
+
+    def _dispatch_element(self, method: str, route: list, body: dict) -> tuple:
+        device = self.device
+        name = route[0]
+        if len(route) == 1 and method == 'POST':
+            found = device.find(body.get('using', ''), body.get('value', ''))
+            references = [{'element-6066-11e4-a52e-4f735466cecf': device.element_id(node)} for node in found]
+            if name == 'elements':
+                return 'findElements', references, 200
+            if not references:
+                return 'findElement', self._error('no such element', body.get('value', '')), 404
+            return 'findElement', references[0], 200
+
+        if route[1] == 'active':
+            node = device.active_element()
+            if node is None:
+                return 'getActiveElement', self._error('no such element', 'no focused element'), 404
+            return 'getActiveElement', {'element-6066-11e4-a52e-4f735466cecf': device.element_id(node)}, 200
+
+        node = device.get_element(route[1])
+        command = route[2] if len(route) > 2 else 'element'
+        if node is None:
+            return command, self._error('stale element reference', route[1]), 404
+        if command == 'rect':
+            return 'getElementRect', device.rect(node), 200
+        if command == 'displayed':
+            return 'isElementDisplayed', node.get('displayed', 'true') != 'false', 200
+        if command == 'enabled':
+            return 'isElementEnabled', node.get('enabled', 'true') != 'false', 200
+        if command == 'text':
+            return 'getElementText', node.get('text', ''), 200
+        if command == 'attribute':
+            attribute = route[3] if len(route) > 3 else ''
+            return 'getElementAttribute', node.get(attribute), 200
+        if command == 'value':
+            node.set('text', ''.join(body.get('text', '')))
+            return 'sendKeysToElement', None, 200
+        if command == 'clear':
+            node.set('text', '')
+            return 'clearElement', None, 200
+        return command, None, 200
+
+    @staticmethod
+    def _is_swipe(body: dict) -> bool:
+        for source in body.get('actions', []):
+            for action in source.get('actions', []):
+                if action.get('type') == 'pointerMove' and action.get('duration', 0) > 0:
+                    return True
+        return False
+
+    @staticmethod
+    def _error(error: str, message: str) -> dict:
+        return {'error': error, 'message': message, 'stacktrace': ''}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fake Appium server con page source predefinite')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=4723)
+    parser.add_argument('--fixture', nargs='+', default=['login_screen.xml'], help='Page source servite (una per swipe)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Latenza simulata per comando (ms)')
+    parser.add_argument('--session-delay', type=float, default=0.0, help='Durata simulata della creazione di una sessione (s)')
+    parser.add_argument('--max-sessions', type=int, default=0, help="Sessioni contemporanee prima di rispondere 'coda piena' (0 = nessun limite)")
+    args = parser.parse_args()
+
+    server = FakeAppiumServer(
+        [load_fixture(name) for name in args.fixture], args.host, args.port,
+        latency=args.latency / 1000, session_delay=args.session_delay, max_sessions=args.max_sessions,
+    )
+    print(f'📱 Fake Appium server in ascolto su {server.url}')
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for command, stats in sorted(server.command_stats.items()):
+            print(f"   {command}: {stats['count']} ({stats['seconds'] * 1000:.1f} ms)")
+
+
+if __name__ == '__main__':
+    main()
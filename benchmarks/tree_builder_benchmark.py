@@ -0,0 +1,131 @@
+"""
+Tree Builder Benchmark - Tempo di parsing e picco di memoria del tree builder mobile
+Confronta, sulle page source registrate in benchmarks/fixtures, il build completo
+(IncrementalElementTreeBuilder senza pruning) con il parsing in streaming e pruning
+dei sottoalberi non evidenziabili. --inflate replica le righe della lista scrollabile
+più lunga fuori dal viewport per simulare page source da diversi megabyte.
+
+Uso:
+    python benchmarks/tree_builder_benchmark.py
+    python benchmarks/tree_builder_benchmark.py --fixture settings_list.xml --inflate 200
+    python benchmarks/tree_builder_benchmark.py --json risultati_tree.json
+"""
+import argparse
+import copy
+import json
+import logging
+import re
+import sys
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from benchmarks.fake_appium_server import load_fixture
+from utilities.element_tree import IncrementalElementTreeBuilder
+
+BOUNDS_PATTERN = re.compile(r'\[(-?\d+),(-?\d+)\]\[(-?\d+),(-?\d+)\]')
+
+
+class FixtureDriver:
+    """Driver minimo per il tree builder: dimensioni dello schermo lette dalla radice."""
+
+    def __init__(self, page_source: str):
+        root = ET.fromstring(page_source)
+        self.window_size = {
+            'width': int(root.get('width') or 1080),
+            'height': int(root.get('height') or 2400),
+        }
+
+    def get_window_size(self) -> dict:
+        return dict(self.window_size)
+
+
+def shift_bounds(element, offset: int):
+    for node in element.iter():
+        bounds = node.get('bounds')
+        match = BOUNDS_PATTERN.match(bounds or '')
+        if match:
+            x1, y1, x2, y2 = map(int, match.groups())
+            node.set('bounds', f'[{x1},{y1 + offset}][{x2},{y2 + offset}]')
+
+
+def inflate_page_source(page_source: str, copies: int) -> str:
+    """
+    Aggiunge copies ripetizioni delle righe della lista scrollabile più lunga,
+    spostate sotto lo schermo come in una lista lunga non ancora scrollata.
+    """
+    root = ET.fromstring(page_source)
+    lists = [element for element in root.iter() if element.get('scrollable') == 'true' and len(element)]
+    if not lists or copies <= 0:
+        return page_source
+    container = max(lists, key=len)
+    match = BOUNDS_PATTERN.match(container.get('bounds', ''))
+    height = int(match.group(4)) - int(match.group(2)) if match else 2400
+    rows = list(container)
+    for copy_index in range(1, copies + 1):
+        for row in rows:
+            duplicate = copy.deepcopy(row)
+            shift_bounds(duplicate, height * copy_index)
+            container.append(duplicate)
+    return ET.tostring(root, encoding='unicode')
+
+
+def measure(page_source: str, prune: bool, iterations: int) -> dict:
+    """Build completi (builder nuovo a ogni iterazione, nessuna cache) senza screenshot."""
+    driver = FixtureDriver(page_source)
+    times = []
+    for _ in range(iterations):
+        builder = IncrementalElementTreeBuilder(driver, prune=prune)
+        start = time.perf_counter()
+        builder.build_element_tree('android', page_source=page_source, take_screenshot=False)
+        times.append(time.perf_counter() - start)
+
+    builder = IncrementalElementTreeBuilder(driver, prune=prune)
+    tracemalloc.start()
+    state = builder.build_element_tree('android', page_source=page_source, take_screenshot=False)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'mean_ms': round(sum(times) / len(times) * 1000, 2),
+        'peak_kb': round(peak / 1024, 1),
+        'nodes': builder._perf_metrics['node_count'],
+        'pruned_nodes': builder.last_build_stats.get('pruned_nodes', 0),
+        'highlighted': len(state.selector_map),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark del tree builder mobile sulle page source registrate')
+    parser.add_argument('--fixture', nargs='+', default=['login_screen.xml', 'settings_list.xml'])
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--inflate', type=int, default=50, help='Copie delle righe della lista scrollabile (0 = fixture originale)')
+    parser.add_argument('--json', help='Salva i risultati in un file JSON')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    results = {}
+    print(f"\n{'Fixture':<28}{'modalità':>10}{'dimensione':>12}{'media':>10}{'picco mem':>12}{'nodi':>8}{'potati':>8}{'indici':>8}")
+    for name in args.fixture:
+        page_source = inflate_page_source(load_fixture(name), args.inflate)
+        size_kb = len(page_source.encode('utf-8')) / 1024
+        results[name] = {'size_kb': round(size_kb, 1)}
+        for mode, prune in (('completo', False), ('pruning', True)):
+            stats = measure(page_source, prune, args.iterations)
+            results[name][mode] = stats
+            print(
+                f"{name:<28}{mode:>10}{size_kb:>10.0f}KB{stats['mean_ms']:>8.1f}ms{stats['peak_kb']:>10.0f}KB"
+                f"{stats['nodes']:>8}{stats['pruned_nodes']:>8}{stats['highlighted']:>8}"
+            )
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding='utf-8')
+        print(f"\n💾 Risultati salvati in {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -11,6 +11,8 @@ import webbrowser
 import argparse
 import io
 import os
+import csv
+import time
 
 # Setup project root
 project_root = Path(__file__).parent
@@ -20,6 +22,7 @@ from utilities import excel_utils
 from utilities.report_utils import HTMLReportGenerator
 from tests.mobile_test_executor import MobileTestExecutor
 from tests.web_test_executor import WebTestExecutor
+from utilities.vision_settings import VisionSettings
 from config_manager import get_config, validate_environment, setup_logging
 
 # Tenta di riconfigurare stdout con UTF-8 se siamo su Windows
@@ -44,16 +47,22 @@ class UnifiedTestRunner:
     Supporta sia test mobile che web attraverso un'interfaccia unificata.
     """
     
-    def __init__(self, excel_file: str, sheet_name: str = 'Foglio1'):
+    def __init__(self, excel_file, sheet_name: str = 'Foglio1', cloud_parallel: bool | None = None):
         """
         Inizializza il test runner.
         
         Args:
-            excel_file: Path al file Excel con i dati di test
+            excel_file: Path al file Excel con i dati di test (o lista di file/workbook)
             sheet_name: Nome del foglio Excel da leggere
+            cloud_parallel: Esegue in parallelo i test mobile cloud (default: CLOUD_PARALLEL)
         """
-        self.excel_file = Path(excel_file)
+        excel_files = excel_file if isinstance(excel_file, (list, tuple)) else [excel_file]
+        self.excel_files = [Path(path) for path in excel_files]
+        self.excel_file = self.excel_files[0]
         self.sheet_name = sheet_name
+        if cloud_parallel is None:
+            cloud_parallel = os.getenv("CLOUD_PARALLEL", "false").lower() == "true"
+        self.cloud_parallel = cloud_parallel
         self.project_root = project_root
         
         # Setup report directory
@@ -71,14 +80,20 @@ class UnifiedTestRunner:
         """
         Legge i dati di test dal file Excel.
         
+        Con più file ogni riga è marcata con il proprio workbook (coda cloud equa tra i file).
+        
         Returns:
             Lista di dizionari con i dati di test
         """
-        print(f"📖 Lettura dati da: {self.excel_file}")
-        test_data = excel_utils.excel_read_data(self.excel_file, self.sheet_name)
-        
-        if not test_data:
-            raise ValueError(f"❌ Nessun dato trovato nel file {self.excel_file}")
+        test_data = []
+        for excel_file in self.excel_files:
+            print(f"📖 Lettura dati da: {excel_file}")
+            rows = excel_utils.excel_read_data(excel_file, self.sheet_name)
+            if not rows:
+                raise ValueError(f"❌ Nessun dato trovato nel file {excel_file}")
+            for data in rows:
+                data.setdefault('Workbook', excel_file.stem)
+            test_data.extend(rows)
             
         print(f"✅ Letti {len(test_data)} test case dal file Excel")
         return test_data
@@ -112,12 +127,15 @@ class UnifiedTestRunner:
         
         Args:
             data: Dizionario con i dati del test case
+            
+        Returns:
+            TestCase con l'esito, o None se il test non è stato eseguito
         """
         # Validate test data
         is_valid, error_msg = self.validate_test_data(data)
         if not is_valid:
             print(f"⚠️  Test {data.get('TestID', 'UNKNOWN')} - Validazione fallita: {error_msg}")
-            return
+            return None
         
         device_type = str(data['Device']).lower()
         test_id = data['TestID']
@@ -129,9 +147,9 @@ class UnifiedTestRunner:
         
         try:
             if device_type == 'mobile':
-                await self.mobile_executor.execute(data)
+                return await self.mobile_executor.execute(data)
             elif device_type == 'web':
-                await self.web_executor.execute(data)
+                return await self.web_executor.execute(data)
             else:
                 print(f"❌ Device type non supportato: {device_type}")
                 
@@ -139,6 +157,40 @@ class UnifiedTestRunner:
             print(f"❌ Errore durante l'esecuzione del test {test_id}: {e}")
             import traceback
             traceback.print_exc()
+        return None
+    
+    async def cleanup_executors(self):
+        """
+        Rilascia le risorse condivise tra i test (browser, sessioni Appium).
+        """
+        # Cleanup indipendenti: un errore sulle sessioni Appium non deve lasciare aperto il browser
+        try:
+            self.mobile_executor.cleanup()
+        except Exception as e:
+            print(f"⚠️  Errore durante il cleanup dell'executor mobile: {e}")
+        try:
+            await self.web_executor.cleanup()
+        except Exception as e:
+            print(f"⚠️  Errore durante il cleanup dell'executor web: {e}")
+    
+    def get_executable_tests(self, test_data_list: list) -> list:
+        """
+        Filtra i test con Active = True/Yes/Si/1.
+        """
+        return [
+            data for data in test_data_list 
+            if str(data.get('Active', '')).lower() in ['true', 'yes', 'si', '1']
+        ]
+    
+    @staticmethod
+    def is_cloud_mobile_test(data: dict) -> bool:
+        return str(data.get('Device', '')).lower() == 'mobile' and str(data.get('Execution', '')).lower() != 'local'
+    
+    async def run_sequential(self, tests: list):
+        """Esegue i test uno dopo l'altro."""
+        for idx, data in enumerate(tests, 1):
+            print(f"\n[{idx}/{len(tests)}] Processing test...")
+            await self.execute_test_case(data)
     
     async def run_all_tests(self):
         """
@@ -152,17 +204,26 @@ class UnifiedTestRunner:
         self.report.start_suite("Suite Test Automatici - Unified Runner")
         
         # Count tests to execute
-        executable_tests = [
-            data for data in test_data_list 
-            if str(data.get('Active', '')).lower() in ['true', 'yes', 'si', '1']
-        ]
+        executable_tests = self.get_executable_tests(test_data_list)
         
         print(f"\n📊 Test da eseguire: {len(executable_tests)} su {len(test_data_list)} totali\n")
         
-        # Execute each test
-        for idx, data in enumerate(executable_tests, 1):
-            print(f"\n[{idx}/{len(executable_tests)}] Processing test...")
-            await self.execute_test_case(data)
+        if self.cloud_parallel:
+            # Test mobile cloud in parallelo (lo scheduler rispetta LT_MAX_CONCURRENCY),
+            # gli altri in sequenza nello stesso tempo
+            cloud_tests = [data for data in executable_tests if self.is_cloud_mobile_test(data)]
+            other_tests = [data for data in executable_tests if not self.is_cloud_mobile_test(data)]
+            print(f"☁️  {len(cloud_tests)} test cloud in parallelo, {len(other_tests)} in sequenza")
+            await asyncio.gather(
+                self.run_sequential(other_tests),
+                *(self.execute_test_case(data) for data in cloud_tests),
+            )
+        else:
+            # Ordine delle righe noto in anticipo: le sessioni cloud successive si pre-riscaldano
+            self.mobile_executor.plan_tests(executable_tests)
+            await self.run_sequential(executable_tests)
+        
+        await self.cleanup_executors()
         
         # Finalize report
         print(f"\n{'='*80}")
@@ -176,6 +237,74 @@ class UnifiedTestRunner:
         webbrowser.open_new_tab(final_report_path.as_uri())
         
         return final_report_path
+    
+    async def run_vision_benchmark(self, vision_specs: list[str], repeat: int = 1):
+        """
+        Esegue gli stessi test attivi con diverse impostazioni di downscaling vision
+        e confronta tasso di successo e latenza, per scegliere il compromesso con i dati.
+        
+        Args:
+            vision_specs: Impostazioni nel formato lato massimo in pixel (es. ['full', '1024', '768'])
+            repeat: Numero di ripetizioni di ogni test per impostazione
+            
+        Returns:
+            Path del file CSV con i risultati
+        """
+        executable_tests = self.get_executable_tests(self.read_test_data())
+        settings = [VisionSettings.parse(spec) for spec in vision_specs]
+        
+        self.report.start_suite("Vision Benchmark - Unified Runner")
+        print(f"\n📊 Vision benchmark: {len(settings)} impostazioni x {len(executable_tests)} test x {repeat} ripetizioni\n")
+        
+        results = []
+        for vision in settings:
+            runs, passed, total_time, total_steps = 0, 0, 0.0, 0
+            for data in executable_tests:
+                for run_idx in range(1, repeat + 1):
+                    run_data = dict(data)
+                    run_data['VisionMaxSide'] = vision.max_side
+                    run_data['TestID'] = f"{data['TestID']} [{vision.label} #{run_idx}]"
+                    
+                    start = time.perf_counter()
+                    test_case = await self.execute_test_case(run_data)
+                    elapsed = time.perf_counter() - start
+                    if test_case is None:
+                        continue
+                    
+                    runs += 1
+                    total_time += elapsed
+                    total_steps += len([step for step in test_case.steps if str(step['action']).startswith('Step - ')])
+                    if test_case.status.lower() == "passato":
+                        passed += 1
+            
+            results.append({
+                'setting': vision.label,
+                'runs': runs,
+                'passed': passed,
+                'success_rate': round(passed / runs * 100, 1) if runs else 0.0,
+                'avg_test_seconds': round(total_time / runs, 2) if runs else 0.0,
+                'avg_step_seconds': round(total_time / total_steps, 2) if total_steps else 0.0,
+            })
+        
+        # Summary
+        print(f"\n{'='*80}")
+        print(f"{'Impostazione':<16}{'Run':>6}{'Successo %':>12}{'Sec/test':>12}{'Sec/step':>12}")
+        for row in results:
+            print(f"{row['setting']:<16}{row['runs']:>6}{row['success_rate']:>12}{row['avg_test_seconds']:>12}{row['avg_step_seconds']:>12}")
+        print(f"{'='*80}\n")
+        
+        await self.cleanup_executors()
+        
+        csv_path = self.output_dir / "vision_benchmark.csv"
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0].keys()) if results else ['setting'])
+            writer.writeheader()
+            writer.writerows(results)
+        print(f"✅ Risultati benchmark salvati in: {csv_path}")
+        
+        final_report_path = self.report.finalize_report()
+        print(f"✅ Report generato: {final_report_path}")
+        return csv_path
 
 
 def main():
@@ -199,15 +328,34 @@ def main():
     parser.add_argument(
         '--file',
         type=str,
-        default='dati_test.xlsx',
-        help='Nome del file Excel locale da cui caricare i test (es. dati_test.xlsx)'
+        nargs='+',
+        default=['dati_test.xlsx'],
+        help='Nome del file Excel locale da cui caricare i test (es. dati_test.xlsx); più file = più workbook'
+    )
+    parser.add_argument(
+        '--cloud-parallel',
+        action='store_true',
+        default=None,
+        help='Esegue in parallelo i test mobile cloud entro LT_MAX_CONCURRENCY sessioni (default: CLOUD_PARALLEL)'
+    )
+    parser.add_argument(
+        '--vision-benchmark',
+        type=str,
+        default=None,
+        help="Esegue i test attivi con più lati massimi vision separati da virgola (es. full,1024,768)"
+    )
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=1,
+        help='Ripetizioni di ogni test per impostazione in modalità --vision-benchmark'
     )
     args = parser.parse_args()
 
-    # Costruisce il percorso del file locale
-    excel_file = project_root / args.file
+    # Costruisce il percorso dei file locali
+    excel_files = [project_root / name for name in args.file]
 
-    print(f"📖 File di test locale selezionato: {excel_file.name}")
+    print(f"📖 File di test locale selezionato: {', '.join(path.name for path in excel_files)}")
 
     # Rimuoviamo la parte di download da Vercel Blob
     # print(f"☁️  Download del file di test '{excel_filename}' da Vercel Blob...")
@@ -215,19 +363,32 @@ def main():
     #     download(...)
     # except Exception as e: ...
 
-    # Controlla se il file locale esiste
-    if not excel_file.exists():
-        print(f"❌ File Excel locale non trovato: {excel_file}")
-        print(f"💡 Assicurati che il file esista nella directory del progetto.")
-        sys.exit(1)
+    # Controlla se i file locali esistono
+    for excel_file in excel_files:
+        if not excel_file.exists():
+            print(f"❌ File Excel locale non trovato: {excel_file}")
+            print(f"💡 Assicurati che il file esista nella directory del progetto.")
+            sys.exit(1)
 
     # --- RIPRISTINO FINISCE QUI ---
 
+    # Impostazioni del vision benchmark validate prima di avviare browser e device
+    vision_specs = [spec for spec in (args.vision_benchmark or '').split(',') if spec.strip()]
+    for spec in vision_specs:
+        try:
+            VisionSettings.parse(spec)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+
     # Il runner userà il percorso del file locale
-    runner = UnifiedTestRunner(excel_file=excel_file)
+    runner = UnifiedTestRunner(excel_file=excel_files, cloud_parallel=args.cloud_parallel)
 
     try:
-        asyncio.run(runner.run_all_tests())
+        if args.vision_benchmark:
+            asyncio.run(runner.run_vision_benchmark(vision_specs, max(1, args.repeat)))
+        else:
+            asyncio.run(runner.run_all_tests())
         print("\n✅ Esecuzione completata con successo!")
 
     except KeyboardInterrupt:
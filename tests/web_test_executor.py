@@ -14,9 +14,13 @@ project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
 from browser_use import Agent, Browser, ChatOllama, ChatOpenAI, ChatGoogle
-from browser_use.browser.events import ScreenshotEvent
+from browser_use.browser.events import LoadStorageStateEvent, SaveStorageStateEvent, ScreenshotEvent
 from utilities import utils
 from utilities.report_utils import TestCase
+from utilities.request_blocking import RequestBlocker
+from utilities import session_profiles
+from utilities.session_profiles import SessionProfileStore
+from utilities.vision_settings import VisionSettings
 from dotenv import load_dotenv
 
 
@@ -52,6 +56,11 @@ class WebTestExecutor:
         # Initialize browser instance (reused across tests)
         self.browser = None
         
+        # Snapshot delle sessioni autenticate (colonne SessionProfile / SessionRole)
+        self.session_store = SessionProfileStore.from_env(self.project_root)
+        # Origini con localStorage caricato o salvato dai profili, da svuotare tra un test e l'altro
+        self.session_origins = set()
+        
         logging.basicConfig(level=logging.INFO)
     
     def load_system_prompt(self) -> str:
@@ -79,7 +88,8 @@ class WebTestExecutor:
     def get_browser_instance(self) -> Browser:
         """
         Ottiene o crea l'istanza del browser.
-        Il browser viene riutilizzato tra i test per efficienza.
+        Il browser viene riutilizzato tra i test per efficienza; il blocco delle
+        richieste (BlockProfile) viene installato per ogni test da RequestBlocker.
         
         Returns:
             Istanza Browser configurata
@@ -95,6 +105,23 @@ class WebTestExecutor:
         
         return self.browser
     
+    def get_viewport_size(self, browser: Browser) -> tuple[int, int] | None:
+        """
+        Legge le dimensioni del viewport dal profilo del browser avviato,
+        usate per mantenere le proporzioni degli screenshot inviati all'LLM.
+        
+        Returns:
+            Tupla (width, height) o None se non disponibile
+        """
+        profile = getattr(browser, 'browser_profile', None)
+        for attr in ('viewport', 'window_size', 'screen'):
+            size = getattr(profile, attr, None)
+            if size:
+                width = size['width'] if isinstance(size, dict) else size.width
+                height = size['height'] if isinstance(size, dict) else size.height
+                return int(width), int(height)
+        return None
+    
     def create_llm_instance(self):
         """
         Crea l'istanza del modello LLM per l'agente.
@@ -126,6 +153,9 @@ class WebTestExecutor:
         
         Args:
             data: Dizionario con tutti i parametri del test
+            
+        Returns:
+            TestCase con l'esito del test
         """
         test_id = data['TestID']
         descrizione = data['Descrizione']
@@ -146,7 +176,46 @@ class WebTestExecutor:
         browser = self.get_browser_instance()
         llm = self.create_llm_instance()
         
+        # Request blocking: colonna BlockProfile della riga o BLOCK_PROFILE globale
+        block_profile = utils.get_row_value(data, 'BlockProfile', os.getenv("BLOCK_PROFILE", "none"))
+        request_blocker = RequestBlocker(browser, block_profile)
+        
+        # Downscaling degli screenshot inviati all'LLM (gli screenshot del report restano 1200x675)
+        vision_settings = VisionSettings.from_row(data)
+        agent_options = {}
+        
+        # Sessione autenticata condivisa: il producer la salva, i consumer partono da lì
+        session_profile = utils.get_row_value(data, 'SessionProfile')
+        session_role = session_profiles.resolve_session_role(utils.get_row_value(data, 'SessionRole'))
+        session_loaded = False
+        
         try:
+            if session_profile:
+                # Il browser è condiviso: il consumer parte solo dallo snapshot, il producer da un browser pulito
+                await self.clear_browser_storage(browser)
+            
+            if session_profile and session_role == session_profiles.CONSUMER:
+                session_loaded = await self.load_session_profile(browser, session_profile)
+                if session_loaded:
+                    task = (
+                        f"{task}\n\nNota: il browser è già autenticato con il profilo '{session_profile}'. "
+                        "Se l'utente risulta già loggato salta i passaggi di login."
+                    )
+            
+            if request_blocker.enabled:
+                # Avvia il browser prima dell'agente, così anche la prima navigazione viene filtrata
+                await browser.start()
+                await request_blocker.apply()
+                print(f"🚫 BlockProfile attivo: {request_blocker.profile}")
+            
+            if vision_settings.max_side:
+                # Il viewport è noto solo a browser avviato
+                await browser.start()
+                llm_screenshot_size = vision_settings.llm_screenshot_size(self.get_viewport_size(browser))
+                if llm_screenshot_size:
+                    agent_options['llm_screenshot_size'] = llm_screenshot_size
+                    print(f"🖼️  Vision LLM: {llm_screenshot_size[0]}x{llm_screenshot_size[1]}")
+            
             # Create Agent
             agent = Agent(
                 task,
@@ -156,12 +225,16 @@ class WebTestExecutor:
                 file_system_path=str(self.project_root),
                 generate_gif=True,
                 extend_system_message=self.optimization_prompt,
-                temperature=0.1
+                temperature=0.1,
+                **agent_options
             )
             
             # Define step hook for screenshots
             async def step_hook(agent: Agent):
                 try:
+                    # Copre anche i nuovi tab aperti dall'agente
+                    await request_blocker.apply()
+                    
                     # Take screenshot using Browser-Use event system
                     screenshot_event = agent.browser_session.event_bus.dispatch(
                         ScreenshotEvent(full_page=False)
@@ -202,16 +275,28 @@ class WebTestExecutor:
             # Check result
             if history.is_successful():
                 print(f'✅ Test {test_id} completato con successo')
+                if session_profile and session_role == session_profiles.PRODUCER:
+                    await self.save_session_profile(browser, session_profile)
             else:
                 print(f"⚠️  Test {test_id} non completato")
                 step_counter["i"] -= 1
                 screen_path = screen_dir / f"step_{step_counter['i']}.jpg"
                 current_test.add_step("Step - FAILED", screen_path, True)
+                if session_loaded and session_profiles.is_auth_error(history.errors() + [history.final_result()]):
+                    self.session_store.invalidate(session_profile)
+                    print(f"🔑 Snapshot del profilo '{session_profile}' invalidato (errore di autenticazione)")
             
             # Add execution GIF
             if self.execution_step_gif.exists():
                 current_test.add_step("Execution steps", self.execution_step_gif, False)
             
+            self.add_block_metrics(current_test, request_blocker)
+            if session_profile:
+                current_test.add_metric("SessionProfile", f"{session_profile} ({'caricato' if session_loaded else session_role})")
+            if 'llm_screenshot_size' in agent_options:
+                width, height = agent_options['llm_screenshot_size']
+                current_test.add_metric("Vision LLM", f"{width}x{height}")
+            
             # Add to report
             self.report.add_test_case_result(current_test)
             
@@ -223,7 +308,101 @@ class WebTestExecutor:
             
             # Add failure to report
             current_test.add_step("EXECUTION ERROR", None, True)
+            if session_loaded and session_profiles.is_auth_error([e]):
+                self.session_store.invalidate(session_profile)
+            self.add_block_metrics(current_test, request_blocker)
             self.report.add_test_case_result(current_test)
+        
+        finally:
+            # Il browser è condiviso: il test successivo installa il proprio profilo
+            await request_blocker.remove()
+            if session_profile:
+                # La sessione autenticata non deve passare alle righe senza SessionProfile
+                await self.clear_browser_storage(browser)
+        
+        return current_test
+    
+    async def load_session_profile(self, browser: Browser, profile: str) -> bool:
+        """
+        Carica nel browser lo snapshot (cookie, localStorage) del profilo, se valido.
+        
+        Args:
+            browser: Istanza Browser condivisa
+            profile: Nome del profilo (colonna SessionProfile)
+            
+        Returns:
+            True se lo snapshot è stato caricato
+        """
+        snapshot = self.session_store.get_valid(profile)
+        if snapshot is None:
+            print(f"🔑 Nessuno snapshot valido per il profilo '{profile}': il test esegue il login completo")
+            return False
+        self.session_origins |= self.session_store.origins(profile)
+        try:
+            await browser.start()
+            event = browser.event_bus.dispatch(LoadStorageStateEvent(path=str(snapshot)))
+            await event
+            await event.event_result(raise_if_any=True, raise_if_none=False)
+            print(f"🔑 Sessione '{profile}' caricata ({self.session_store.age_seconds(profile) / 60:.0f} min)")
+            return True
+        except Exception as e:
+            print(f"⚠️  Impossibile caricare la sessione '{profile}': {e}")
+            return False
+    
+    async def save_session_profile(self, browser: Browser, profile: str):
+        """
+        Salva su disco lo storage state del browser dopo un test producer riuscito.
+        
+        Args:
+            browser: Istanza Browser condivisa
+            profile: Nome del profilo (colonna SessionProfile)
+        """
+        try:
+            path = self.session_store.prepare_save(profile)
+            event = browser.event_bus.dispatch(SaveStorageStateEvent(path=str(path)))
+            await event
+            await event.event_result(raise_if_any=True, raise_if_none=False)
+            if path.exists():
+                self.session_origins |= self.session_store.origins(profile)
+                print(f"🔑 Sessione '{profile}' salvata in {path}")
+            else:
+                print(f"⚠️  Snapshot della sessione '{profile}' non creato")
+        except Exception as e:
+            print(f"⚠️  Impossibile salvare la sessione '{profile}': {e}")
+    
+    async def clear_browser_storage(self, browser: Browser):
+        """
+        Elimina i cookie del browser e lo storage (localStorage, IndexedDB, ...) delle origini
+        dei profili di sessione, così lo stato autenticato non passa da un test all'altro.
+        
+        Args:
+            browser: Istanza Browser condivisa
+        """
+        try:
+            await browser.start()
+            await browser.cdp_client.send.Storage.clearCookies()
+            for origin in self.session_origins:
+                await browser.cdp_client.send.Storage.clearDataForOrigin(
+                    params={'origin': origin, 'storageTypes': 'all'}
+                )
+        except Exception as e:
+            print(f"⚠️  Impossibile svuotare cookie e storage del browser: {e}")
+    
+    def add_block_metrics(self, current_test: TestCase, request_blocker: RequestBlocker):
+        """
+        Riporta nel report le richieste bloccate e i byte risparmiati (stimati).
+        
+        Args:
+            current_test: TestCase in costruzione
+            request_blocker: RequestBlocker usato dal test
+        """
+        if not request_blocker.enabled:
+            return
+        stats = request_blocker.get_stats()
+        current_test.add_metric("BlockProfile", stats['profile'])
+        current_test.add_metric("Richieste bloccate", stats['blocked_requests'])
+        current_test.add_metric("Byte risparmiati (stima)", f"{stats['estimated_bytes_saved'] / 1024:.0f} KB")
+        print(f"🚫 Richieste bloccate: {stats['blocked_requests']} (~{stats['estimated_bytes_saved'] / 1024:.0f} KB risparmiati)")
     
     async def cleanup(self):
         """
@@ -0,0 +1,135 @@
+"""
+Activity Cache - Cache su disco della launch activity delle app Android
+Il rilevamento della activity principale (pm dump, resolve-activity, monkey...) è lento:
+il risultato viene salvato per device, package e versionCode dell'app installata e
+rivalidato solo quando la versione cambia.
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+from utilities.adb_client import AdbClient
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_FILE = Path(__file__).parent.parent / 'activity_cache.json'
+
+
+def get_version_code(package_name: str, device_id: str = None, timeout: float = 10) -> str | None:
+    """
+    Legge il versionCode dell'app installata sul device (None se non disponibile).
+
+    Args:
+        package_name: Package dell'app
+        device_id: Seriale adb del device (opzionale)
+        timeout: Timeout del comando in secondi
+    """
+    adb = AdbClient.for_device(device_id)
+    commands = [
+        f'pm list packages --show-versioncode {package_name}',
+        f'dumpsys package {package_name}',
+    ]
+    for command in commands:
+        try:
+            result = adb.shell(command, timeout=timeout)
+        except Exception as e:
+            logger.debug(f'Lettura versionCode fallita ({command}): {e}')
+            continue
+        if not result.ok:
+            continue
+        for line in result.output.splitlines():
+            line = line.strip()
+            # pm list packages: "package:com.example versionCode:123"
+            if line.startswith(f'package:{package_name} '):
+                match = re.search(r'versionCode:(\d+)', line)
+                if match:
+                    return match.group(1)
+            # dumpsys package: "versionCode=123 minSdk=21 targetSdk=34"
+            match = re.match(r'versionCode=(\d+)', line)
+            if match:
+                return match.group(1)
+    return None
+
+
+class LaunchActivityCache:
+    """
+    Cache JSON {"device|package": {version_code, activity, detected_at}}.
+    Thread-safe: il rilevamento può girare in un worker thread (asyncio.to_thread).
+    """
+
+    _default = None
+
+    def __init__(self, path=DEFAULT_CACHE_FILE):
+        """
+        Args:
+            path: File JSON della cache
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries = {}
+        if self.path.exists():
+            try:
+                self._entries = json.loads(self.path.read_text(encoding='utf-8'))
+            except Exception as e:
+                logger.warning(f'Cache delle activity non leggibile ({self.path}), riparto da zero: {e}')
+
+    @classmethod
+    def default(cls) -> 'LaunchActivityCache':
+        """Istanza condivisa, file da .env (ACTIVITY_CACHE_FILE)."""
+        if cls._default is None:
+            cls._default = cls(os.getenv('ACTIVITY_CACHE_FILE') or DEFAULT_CACHE_FILE)
+        return cls._default
+
+    @staticmethod
+    def _key(device_id: str | None, package_name: str) -> str:
+        return f'{device_id or "default"}|{package_name}'
+
+    def resolve(self, package_name: str, device_id: str | None, detector) -> str:
+        """
+        Restituisce la launch activity dalla cache se il versionCode installato coincide,
+        altrimenti la rileva con detector(package_name, device_id) e aggiorna la cache.
+
+        Args:
+            package_name: Package dell'app
+            device_id: Seriale adb del device
+            detector: Funzione di rilevamento (es. App.detect_android_app_activity)
+
+        Returns:
+            Nome completo della activity, stringa vuota se non rilevata
+        """
+        key = self._key(device_id, package_name)
+        version_code = get_version_code(package_name, device_id)
+
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and entry.get('activity') and version_code is not None and entry.get('version_code') == version_code:
+            logger.info(f'Launch activity di {package_name} dalla cache (versionCode {version_code}): {entry["activity"]}')
+            return entry['activity']
+
+        if entry and version_code is not None:
+            logger.info(f'versionCode di {package_name} cambiato ({entry.get("version_code")} -> {version_code}), nuovo rilevamento')
+
+        activity = detector(package_name, device_id)
+        if activity and version_code is not None:
+            # Senza versionCode non è possibile rivalidare la cache: non si salva
+            with self._lock:
+                self._entries[key] = {
+                    'version_code': version_code,
+                    'activity': activity,
+                    'detected_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+                }
+                self._save()
+        return activity
+
+    def _save(self):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.json.tmp')
+            tmp_path.write_text(json.dumps(self._entries, indent=2), encoding='utf-8')
+            tmp_path.replace(self.path)
+        except Exception as e:
+            logger.warning(f'Impossibile salvare la cache delle activity: {e}')
@@ -0,0 +1,200 @@
+"""
+ADB Client - Comandi shell sul device tramite il server adb locale
+Ogni comando apre un socket verso il server adb (localhost:5037) e usa il protocollo
+"smart socket" (host:transport:<serial> + shell:<comando>) invece di avviare una shell
+e un processo adb per comando. Più comandi possono essere eseguiti in un solo round-trip;
+se il server adb non è raggiungibile si ripiega sul binario adb.
+"""
+import logging
+import os
+import socket
+import subprocess
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 5037
+DEFAULT_TIMEOUT = 10.0
+
+
+class AdbError(Exception):
+    """Errore restituito dal server adb (es. device non trovato)."""
+
+
+class AdbTimeoutError(AdbError, TimeoutError):
+    """Il comando non è terminato entro il timeout."""
+
+
+class AdbResult:
+    """Output (stdout e stderr uniti, come la shell adb legacy) e exit code di un comando."""
+
+    def __init__(self, output: str, returncode: int):
+        self.output = output
+        self.returncode = returncode
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
+
+    def __repr__(self):
+        return f'AdbResult(returncode={self.returncode}, output={self.output[:60]!r})'
+
+
+class AdbClient:
+    """
+    Client adb per un singolo device. Usare AdbClient.for_device() per condividere
+    l'istanza (e i contatori) tra i chiamanti.
+    """
+
+    _clients = {}
+    _clients_lock = threading.Lock()
+
+    def __init__(self, serial: str | None = None, host: str = None, port: int = None, timeout: float = DEFAULT_TIMEOUT):
+        """
+        Args:
+            serial: Seriale del device (None = unico device collegato)
+            host: Host del server adb
+            port: Porta del server adb (default: ANDROID_ADB_SERVER_PORT o 5037)
+            timeout: Timeout di default dei comandi in secondi
+        """
+        self.serial = serial or None
+        self.host = host or DEFAULT_HOST
+        self.port = int(port or os.getenv('ANDROID_ADB_SERVER_PORT') or DEFAULT_PORT)
+        self.timeout = timeout
+        self.round_trips = 0
+        self.commands = 0
+        self.subprocess_fallbacks = 0
+
+    @classmethod
+    def for_device(cls, serial: str | None = None) -> 'AdbClient':
+        """Istanza condivisa per seriale."""
+        with cls._clients_lock:
+            client = cls._clients.get(serial or None)
+            if client is None:
+                client = cls._clients[serial or None] = cls(serial)
+            return client
+
+    def shell(self, command: str, timeout: float = None) -> AdbResult:
+        """
+        Esegue un comando nella shell del device.
+
+        Args:
+            command: Comando shell (interpretato da sh sul device, pipe comprese)
+            timeout: Timeout in secondi (default: quello del client)
+        """
+        return self.shell_batch([command], timeout=timeout)[0]
+
+    def shell_batch(self, commands: list, timeout: float = None) -> list:
+        """
+        Esegue più comandi in una sola sessione shell (un round-trip), separando gli output
+        con dei marcatori. Un comando che fallisce non interrompe i successivi.
+
+        Args:
+            commands: Lista di comandi shell
+            timeout: Timeout di ciascun comando in secondi: riparte alla fine di ogni comando
+
+        Returns:
+            Lista di AdbResult, uno per comando
+        """
+        timeout = self.timeout if timeout is None else timeout
+        token = f'__ADB_{uuid.uuid4().hex[:8]}__'
+        script = '; '.join(
+            f'echo {token}B{i}; {command}; echo {token}E{i}:$?' for i, command in enumerate(commands)
+        )
+        output = self._run(script, timeout, f'{token}E'.encode('ascii'), len(commands))
+        self.round_trips += 1
+        self.commands += len(commands)
+        return self._split_output(output, token, len(commands))
+
+    @staticmethod
+    def _split_output(output: str, token: str, count: int) -> list:
+        output = output.replace('\r\n', '\n')
+        results = []
+        for i in range(count):
+            begin = output.find(f'{token}B{i}\n')
+            end = output.find(f'{token}E{i}:', begin)
+            if begin < 0 or end < 0:
+                raise AdbError(f'Output della shell adb incompleto: {output[-200:]!r}')
+            code = output[end + len(f'{token}E{i}:'):].split('\n', 1)[0].strip()
+            body = output[begin + len(f'{token}B{i}\n'):end]
+            results.append(AdbResult(body, int(code) if code.isdigit() else -1))
+        return results
+
+    def _run(self, script: str, timeout: float, end_marker: bytes, count: int) -> str:
+        try:
+            sock = socket.create_connection((self.host, self.port), timeout=timeout)
+        except OSError as e:
+            # Server adb non avviato: il binario adb lo avvia e serve le richieste successive
+            logger.info(f'Server adb non raggiungibile su {self.host}:{self.port} ({e}), uso il binario adb')
+            # Un solo processo per tutto il batch: il timeout copre la somma dei comandi
+            return self._run_subprocess(script, timeout * count)
+        with sock:
+            deadline = time.monotonic() + timeout
+            transport = f'host:transport:{self.serial}' if self.serial else 'host:transport-any'
+            self._request(sock, transport, deadline)
+            self._request(sock, f'shell:{script}', deadline)
+            return self._read_all(sock, timeout, end_marker).decode('utf-8', errors='replace')
+
+    def _run_subprocess(self, script: str, timeout: float) -> str:
+        self.subprocess_fallbacks += 1
+        command = ['adb'] + (['-s', self.serial] if self.serial else []) + ['shell', script]
+        try:
+            result = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired as e:
+            raise AdbTimeoutError(f'Comando adb scaduto dopo {timeout}s') from e
+        except OSError as e:
+            raise AdbError(f'Binario adb non disponibile: {e}') from e
+        if result.returncode != 0 and not result.stdout:
+            raise AdbError(result.stderr.strip() or f'adb terminato con codice {result.returncode}')
+        return result.stdout
+
+    def _request(self, sock, payload: str, deadline: float):
+        """Invia una richiesta smart socket (lunghezza esadecimale + payload) e ne verifica l'esito."""
+        data = payload.encode('utf-8')
+        sock.sendall(b'%04x' % len(data) + data)
+        status = self._recv_exact(sock, 4, deadline)
+        if status == b'OKAY':
+            return
+        if status == b'FAIL':
+            length = int(self._recv_exact(sock, 4, deadline), 16)
+            message = self._recv_exact(sock, length, deadline).decode('utf-8', errors='replace')
+            raise AdbError(message)
+        raise AdbError(f'Risposta inattesa dal server adb: {status!r}')
+
+    def _recv_exact(self, sock, size: int, deadline: float) -> bytes:
+        data = b''
+        while len(data) < size:
+            chunk = self._recv(sock, size - len(data), deadline)
+            if not chunk:
+                raise AdbError('Connessione chiusa dal server adb')
+            data += chunk
+        return data
+
+    def _read_all(self, sock, timeout: float, end_marker: bytes) -> bytes:
+        """Legge l'output fino alla chiusura; il timeout riparte a ogni marcatore di fine comando."""
+        chunks = []
+        tail = b''
+        deadline = time.monotonic() + timeout
+        while True:
+            chunk = self._recv(sock, 65536, deadline)
+            if not chunk:
+                return b''.join(chunks)
+            chunks.append(chunk)
+            # Il marcatore può essere diviso tra due chunk
+            if end_marker in tail + chunk:
+                deadline = time.monotonic() + timeout
+            tail = (tail + chunk)[-(len(end_marker) - 1):]
+
+    @staticmethod
+    def _recv(sock, size: int, deadline: float) -> bytes:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise AdbTimeoutError('Timeout del comando adb')
+        sock.settimeout(remaining)
+        try:
+            return sock.recv(size)
+        except socket.timeout as e:
+            raise AdbTimeoutError('Timeout del comando adb') from e
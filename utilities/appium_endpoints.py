@@ -0,0 +1,129 @@
+"""
+Appium Endpoints - Porte e server Appium per l'esecuzione parallela su più device
+Più sessioni UiAutomator2/XCUITest sullo stesso host collidono sulle porte locali
+(systemPort, chromedriverPort, mjpegServerPort, wdaLocalPort) se non vengono assegnate
+esplicitamente. PortAllocator assegna a ogni device un blocco di porte distinto e
+AppiumEndpointBalancer distribuisce i device su più server Appium.
+"""
+import logging
+import os
+import socket
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_APPIUM_SERVER_URL = 'http://localhost:4723'
+
+# Porta iniziale per capability, per piattaforma (default dei driver Appium)
+PORT_BASES = {
+    'android': {'systemPort': 8200, 'chromedriverPort': 9520, 'mjpegServerPort': 7810},
+    'ios': {'wdaLocalPort': 8100, 'mjpegServerPort': 9100},
+}
+# Porte provate per capability prima di rinunciare
+PORT_RANGE = 100
+
+
+def is_port_free(port: int, host: str = '127.0.0.1') -> bool:
+    """True se la porta locale non è occupata (es. da un adb forward di un'altra sessione)."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        try:
+            sock.bind((host, port))
+            return True
+        except OSError:
+            return False
+
+
+class PortAllocator:
+    """
+    Assegna porte locali non sovrapposte per device. L'assegnazione è stabile per tutta
+    l'esecuzione: le capabilities restano uguali e la sessione può essere riutilizzata dal pool.
+    """
+
+    def __init__(self, port_bases: dict = None):
+        """
+        Args:
+            port_bases: {piattaforma: {capability: porta iniziale}} (default: PORT_BASES)
+        """
+        self.port_bases = port_bases or PORT_BASES
+        self._lock = threading.Lock()
+        self._assigned = {}
+        self._used = set()
+
+    def allocate(self, device_key: str, platform: str) -> dict:
+        """
+        Porte del device, assegnate alla prima richiesta.
+
+        Args:
+            device_key: UDID o nome del device
+            platform: 'android' o 'ios'
+
+        Returns:
+            Dizionario {capability: porta}, vuoto per piattaforme sconosciute
+        """
+        platform = platform.lower()
+        with self._lock:
+            key = (platform, device_key)
+            if key in self._assigned:
+                return dict(self._assigned[key])
+            ports = {}
+            for capability, base in self.port_bases.get(platform, {}).items():
+                port = self._next_free_port(base)
+                if port is None:
+                    logger.warning(f'Nessuna porta libera per {capability} tra {base} e {base + PORT_RANGE - 1}')
+                    continue
+                ports[capability] = port
+                self._used.add(port)
+            self._assigned[key] = ports
+            logger.info(f'Porte assegnate a {device_key}: {ports}')
+            return dict(ports)
+
+    def _next_free_port(self, base: int) -> int | None:
+        for port in range(base, base + PORT_RANGE):
+            if port not in self._used and is_port_free(port):
+                return port
+        return None
+
+
+class AppiumEndpointBalancer:
+    """
+    Distribuisce i device su uno o più server Appium. Ogni device resta sullo stesso
+    server (necessario per riutilizzare la sessione); i nuovi device vanno sul server
+    con meno device assegnati.
+    """
+
+    def __init__(self, urls: list):
+        """
+        Args:
+            urls: URL dei server Appium (almeno uno)
+        """
+        self.urls = [url.strip() for url in urls if url and url.strip()] or [DEFAULT_APPIUM_SERVER_URL]
+        self._lock = threading.Lock()
+        self._assigned = {}
+
+    @classmethod
+    def from_env(cls) -> 'AppiumEndpointBalancer':
+        """Server da .env: APPIUM_SERVER_URLS (separati da virgola) o APPIUM_SERVER_URL."""
+        urls = os.getenv('APPIUM_SERVER_URLS', '')
+        if urls.strip():
+            return cls(urls.split(','))
+        return cls([os.getenv('APPIUM_SERVER_URL') or DEFAULT_APPIUM_SERVER_URL])
+
+    def select(self, device_key: str) -> str:
+        """URL del server Appium per il device."""
+        with self._lock:
+            url = self._assigned.get(device_key)
+            if url is None:
+                loads = {url: 0 for url in self.urls}
+                for assigned_url in self._assigned.values():
+                    loads[assigned_url] = loads.get(assigned_url, 0) + 1
+                url = min(self.urls, key=lambda candidate: loads[candidate])
+                self._assigned[device_key] = url
+            return url
+
+    def get_load(self) -> dict:
+        """Numero di device assegnati per server."""
+        with self._lock:
+            loads = {url: 0 for url in self.urls}
+            for url in self._assigned.values():
+                loads[url] += 1
+            return loads
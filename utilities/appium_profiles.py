@@ -0,0 +1,72 @@
+"""
+Appium Profiles - Profili di prestazioni dei driver UiAutomator2 / XCUITest
+Impostazioni come waitForIdleTimeout, ignoreUnimportantViews e snapshotMaxDepth
+cambiano di multipli il tempo della page source su app pesanti. I profili (fast,
+balanced, complete) sono definiti in appium_profiles.json: le capabilities valgono
+alla creazione della sessione, i settings vengono applicati subito dopo con
+update_settings. Nessuno dei due si può annullare del tutto su una sessione aperta,
+quindi il profilo fa parte della chiave del pool (make_session_key).
+pageSourceExcludedAttributes non va usato per 'visible': app_use considera visibili
+gli elementi senza l'attributo e non li scarterebbe più.
+"""
+import json
+import logging
+import os
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILES_FILE = Path(__file__).parent.parent / 'appium_profiles.json'
+DEFAULT_PROFILE = 'balanced'
+
+_profiles_cache = {}
+
+
+def load_appium_profiles(path=None) -> dict:
+    """
+    Profili da APPIUM_PROFILES_FILE (default appium_profiles.json), letti una volta per file.
+    """
+    path = Path(path or os.getenv('APPIUM_PROFILES_FILE') or DEFAULT_PROFILES_FILE)
+    if path not in _profiles_cache:
+        try:
+            _profiles_cache[path] = {
+                name.lower(): profile for name, profile in json.loads(path.read_text(encoding='utf-8')).items()
+            }
+        except Exception as e:
+            logger.warning(f'Impossibile leggere i profili Appium da {path}: {e}')
+            _profiles_cache[path] = {}
+    return _profiles_cache[path]
+
+
+class AppiumProfile:
+    """
+    Profilo di prestazioni per una piattaforma: capabilities di sessione e settings runtime.
+    """
+
+    def __init__(self, name: str, capabilities: dict | None = None, settings: dict | None = None):
+        self.name = name
+        self.capabilities = dict(capabilities or {})
+        self.settings = dict(settings or {})
+
+    @classmethod
+    def resolve(cls, name, platform: str) -> 'AppiumProfile':
+        """
+        Profilo per nome e piattaforma; valori sconosciuti ricadono su DEFAULT_PROFILE.
+
+        Args:
+            name: Nome del profilo (colonna AppiumProfile o APPIUM_PROFILE)
+            platform: 'android' o 'ios'
+        """
+        profiles = load_appium_profiles()
+        profile_name = str(name or os.getenv('APPIUM_PROFILE') or DEFAULT_PROFILE).strip().lower()
+        if profile_name not in profiles:
+            if profiles:
+                logger.warning(
+                    f"AppiumProfile sconosciuto '{name}', uso '{DEFAULT_PROFILE}'. Valori validi: {', '.join(profiles)}"
+                )
+            profile_name = DEFAULT_PROFILE
+        platform_profile = profiles.get(profile_name, {}).get(platform.lower(), {})
+        return cls(profile_name, platform_profile.get('capabilities'), platform_profile.get('settings'))
+
+    def __repr__(self):
+        return f'AppiumProfile({self.name!r}, capabilities={self.capabilities}, settings={self.settings})'
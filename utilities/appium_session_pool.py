@@ -0,0 +1,219 @@
+"""
+Appium Session Pool - Riutilizzo delle sessioni Appium tra test mobile
+Creare una sessione UiAutomator2/XCUITest richiede 10-40s: le sessioni vengono tenute
+aperte per (server, device, app, capabilities) e tra un test e l'altro l'app viene
+solo resettata (restart o cancellazione dati). Una sessione non più valida viene
+sostituita in modo trasparente.
+"""
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Modalità di reset dell'app quando una sessione viene riutilizzata
+RESET_NONE = 'none'
+RESET_RESTART = 'restart'
+RESET_CLEAR = 'clear'
+RESET_MODES = (RESET_NONE, RESET_RESTART, RESET_CLEAR)
+
+# Capabilities che identificano il singolo test e non la sessione
+# (MobileTestExecutor rinomina con lambda-name le sessioni cloud riutilizzate)
+PER_TEST_CAPABILITIES = ('build', 'name')
+
+
+def resolve_reset_mode(mode) -> str:
+    """
+    Normalizza il valore della colonna AppReset; valori sconosciuti ricadono su 'restart'.
+    """
+    value = str(mode or RESET_RESTART).strip().lower()
+    if value not in RESET_MODES:
+        logger.warning(f"AppReset sconosciuto '{mode}', uso '{RESET_RESTART}'. Valori validi: {', '.join(RESET_MODES)}")
+        return RESET_RESTART
+    return value
+
+
+def make_session_key(appium_server_url: str, capabilities: dict, profile: str | None = None) -> tuple:
+    """
+    Chiave del pool: server Appium + capabilities (device, app, ...) senza quelle del singolo test
+    + nome del profilo Appium, le cui capabilities e settings restano attivi per tutta la sessione.
+    """
+    caps = tuple(sorted(
+        (name, str(value)) for name, value in capabilities.items()
+        if name not in PER_TEST_CAPABILITIES
+    ))
+    return (appium_server_url, caps, profile)
+
+
+class AppiumSessionPool:
+    """
+    Pool di istanze App (una sessione Appium ciascuna) indicizzate per make_session_key.
+    Le App del pool hanno pooled=True, quindi App.close() (chiamato anche da Agent.close())
+    non chiude la sessione: la chiusura avviene solo con close_all().
+    Una sessione resta assegnata al suo test fino a release(): un test parallelo con la
+    stessa chiave riceve una sessione propria, fuori dal pool.
+    """
+
+    def __init__(self, enabled: bool = True):
+        """
+        Args:
+            enabled: Se False ogni test crea e chiude la propria sessione
+        """
+        self.enabled = enabled
+        self._sessions = {}
+        self._in_use = set()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.replaced = 0
+
+    def acquire(self, key: tuple, factory, reset_mode: str = RESET_RESTART) -> tuple:
+        """
+        Restituisce una App pronta per il test, riutilizzando la sessione se possibile.
+
+        Args:
+            key: Chiave della sessione (make_session_key)
+            factory: Callable senza argomenti che crea una nuova App
+            reset_mode: Reset da applicare all'app se la sessione viene riutilizzata
+
+        Returns:
+            Tupla (app, reused)
+        """
+        with self._lock:
+            shared = not self.enabled or key in self._in_use
+            app = None if shared else self._sessions.get(key)
+            if not shared:
+                self._in_use.add(key)
+        if app is not None:
+            if self.is_healthy(app) and self.reset_app(app, reset_mode):
+                self.reused += 1
+                app.invalidate_state()
+                return app, True
+            logger.warning('Sessione Appium non più valida, ne creo una nuova')
+            self.discard(key)
+            self.replaced += 1
+
+        try:
+            app = factory()
+        except Exception:
+            if not shared:
+                self.release(key)
+            raise
+        self.created += 1
+        if not shared:
+            app.pooled = True
+            with self._lock:
+                self._sessions[key] = app
+        return app, False
+
+    def release(self, key: tuple, app=None):
+        """
+        Fine del test: la sessione della chiave torna disponibile per il prossimo acquire().
+        Se app è indicata la chiave viene liberata solo se app è la sessione del pool.
+        """
+        with self._lock:
+            if app is None or self._sessions.get(key) is app:
+                self._in_use.discard(key)
+
+    @staticmethod
+    def is_healthy(app) -> bool:
+        """
+        Health probe leggero: GET /session/:id/timeouts non tocca l'interfaccia del device.
+        """
+        if app.driver is None or not app.driver.session_id:
+            return False
+        try:
+            app.driver.timeouts
+            return True
+        except Exception as e:
+            logger.info(f'Health probe della sessione Appium fallito: {e}')
+            return False
+
+    @staticmethod
+    def get_app_id(app) -> str | None:
+        """Package (Android) o bundle id (iOS) dell'app in test."""
+        app_id = app.app_package or app.bundle_id
+        if app_id:
+            return app_id
+        capabilities = app.driver.capabilities or {}
+        app_id = capabilities.get('appPackage') or capabilities.get('bundleId')
+        if not app_id and app.platform_name.lower() == 'android':
+            app_id = app.driver.current_package
+        return app_id
+
+    def reset_app(self, app, reset_mode: str) -> bool:
+        """
+        Riporta l'app allo stato iniziale tra un test e l'altro.
+
+        Returns:
+            True se il reset è riuscito (altrimenti la sessione viene sostituita)
+        """
+        if reset_mode == RESET_NONE:
+            return True
+        try:
+            app_id = self.get_app_id(app)
+            if not app_id:
+                logger.warning('App id non disponibile, impossibile resettare l\'app')
+                return False
+            start = time.perf_counter()
+            if reset_mode == RESET_CLEAR:
+                try:
+                    param = 'appId' if app.platform_name.lower() == 'android' else 'bundleId'
+                    app.driver.execute_script('mobile: clearApp', {param: app_id})
+                except Exception as e:
+                    # Es. iOS su device reale: si ripiega sul restart
+                    logger.warning(f'clearApp non supportato ({e}), eseguo il restart dell\'app')
+                    app.driver.terminate_app(app_id)
+            else:
+                app.driver.terminate_app(app_id)
+            app.driver.activate_app(app_id)
+            logger.info(f"App {app_id} resettata ({reset_mode}) in {time.perf_counter() - start:.1f}s")
+            return True
+        except Exception as e:
+            logger.warning(f'Reset dell\'app fallito: {e}')
+            return False
+
+    def has(self, key: tuple) -> bool:
+        """True se il prossimo acquire() della chiave può riutilizzare una sessione aperta."""
+        return self.enabled and key in self._sessions
+
+    def idle_keys(self, appium_server_url: str) -> list:
+        """Chiavi delle sessioni aperte sul server e non assegnate a un test."""
+        with self._lock:
+            return [
+                key for key in self._sessions
+                if key[0] == appium_server_url and key not in self._in_use
+            ]
+
+    def idle_count(self, appium_server_url: str) -> int:
+        """Sessioni inattive sul server (occupano comunque il limite di concorrenza del cloud)."""
+        return len(self.idle_keys(appium_server_url))
+
+    def evict_idle(self, appium_server_url: str, keep: int):
+        """
+        Chiude le sessioni inattive sul server più vecchie finché ne restano al massimo keep.
+        """
+        idle = self.idle_keys(appium_server_url)
+        for key in idle[:max(0, len(idle) - keep)]:
+            logger.info('Chiusura di una sessione cloud inattiva per rispettare il limite di concorrenza')
+            self.discard(key)
+
+    def discard(self, key: tuple):
+        """Chiude e rimuove dal pool la sessione associata alla chiave."""
+        with self._lock:
+            app = self._sessions.pop(key, None)
+        if app is not None:
+            app.close(force=True)
+
+    def close_all(self):
+        """Chiude tutte le sessioni del pool. Da chiamare alla fine dell'esecuzione."""
+        for key in list(self._sessions):
+            self.discard(key)
+
+    def get_stats(self) -> dict:
+        return {
+            'created': self.created,
+            'reused': self.reused,
+            'replaced': self.replaced,
+            'open': len(self._sessions),
+        }
@@ -0,0 +1,158 @@
+"""
+Async App - Facciata asincrona di App per pilotare più device dallo stesso event loop
+Le chiamate bloccanti a WebDriver girano su un worker thread dedicato al device (i comandi
+verso lo stesso device restano serializzati) e le attese di stabilità usano asyncio.sleep.
+L'App sincrona resta quella usata dall'agente di app_use.
+"""
+import asyncio
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app_use.controller.service import Controller
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEVICE_KEY = 'default'
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def device_executor(device_key: str | None) -> ThreadPoolExecutor:
+    """
+    Executor a thread singolo del device, condiviso da tutti i chiamanti.
+
+    Args:
+        device_key: Identificativo del device (UDID o nome)
+    """
+    key = device_key or DEFAULT_DEVICE_KEY
+    with _executors_lock:
+        executor = _executors.get(key)
+        if executor is None:
+            executor = _executors[key] = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'appium-{key}')
+        return executor
+
+
+def shutdown_device_executors():
+    """Termina i worker thread dei device. Da chiamare alla fine dell'esecuzione."""
+    with _executors_lock:
+        for executor in _executors.values():
+            executor.shutdown(wait=True)
+        _executors.clear()
+
+
+async def run_on_device(device_key: str | None, func, *args, **kwargs):
+    """Esegue una funzione bloccante sul worker thread del device."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(device_executor(device_key), functools.partial(func, *args, **kwargs))
+
+
+class AsyncApp:
+    """
+    Wrapper asincrono di App: ogni metodo di App è disponibile come coroutine
+    (await async_app.click_coordinates(10, 20)), gli attributi sono restituiti invariati.
+    """
+
+    def __init__(self, app, device_key: str | None = None):
+        """
+        Args:
+            app: Istanza App (sincrona) già inizializzata
+            device_key: Identificativo del device, seleziona il worker thread
+        """
+        self.app = app
+        self.device_key = device_key or DEFAULT_DEVICE_KEY
+        self.executor = device_executor(self.device_key)
+
+    async def run(self, func, *args, **kwargs):
+        """Esegue una funzione bloccante (App, driver) sul worker thread del device."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    def __getattr__(self, name):
+        attribute = getattr(self.app, name)
+        if not callable(attribute):
+            return attribute
+
+        @functools.wraps(attribute)
+        async def call(*args, **kwargs):
+            return await self.run(attribute, *args, **kwargs)
+
+        return call
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+    async def wait_for_stability(self, wait_time: float | None = None) -> bool:
+        """
+        Versione asincrona di App._wait_for_page_and_frames_load: i campioni della page source
+        sono letti sul worker thread, tra un campione e l'altro si cede l'event loop.
+
+        Returns:
+            True se la UI si è stabilizzata prima del limite
+        """
+        app = self.app
+        ceiling = app.stability_timeout if wait_time is None else wait_time
+        app._last_page_source = None
+        if ceiling <= 0:
+            return True
+        start = time.perf_counter()
+        stable = False
+
+        previous = await self.run(app._page_fingerprint)
+        while time.perf_counter() - start < ceiling:
+            await asyncio.sleep(min(app.stability_interval, max(0.0, ceiling - (time.perf_counter() - start))))
+            current = await self.run(app._page_fingerprint)
+            if current is not None and current == previous:
+                stable = True
+                break
+            previous = current
+
+        if not stable:
+            # Page source ancora in cambiamento: il tree builder la rilegge
+            app._last_page_source = None
+        elapsed = time.perf_counter() - start
+        app.stability_waits.append(elapsed)
+        logger.debug(f'UI {"stabile" if stable else "ancora in cambiamento"} dopo {elapsed:.2f}s (limite {ceiling}s)')
+        return stable
+
+    async def get_app_state(self, prefetch: bool = False, **kwargs):
+        """
+        Stato corrente dell'app senza bloccare l'event loop.
+
+        Args:
+            prefetch: Conserva lo stato per la prossima App.get_app_state() (quella dell'agente)
+            **kwargs: Parametri di App.get_app_state
+        """
+        await self.wait_for_stability()
+        return await self.run(self.app.get_app_state, wait_for_stability=False, prefetch=prefetch, **kwargs)
+
+    async def prefetch_app_state(self):
+        """Cattura lo stato prima dello step dell'agente, che lo riceve senza round-trip."""
+        return await self.get_app_state(prefetch=True)
+
+    async def close(self, force: bool = False):
+        await self.run(self.app.close, force=force)
+
+
+class DeviceController(Controller):
+    """
+    Controller di app_use che esegue le azioni sul worker thread del device.
+    Le azioni sono coroutine che chiamano App in modo sincrono: girano in un event loop
+    privato sul thread del device, lasciando libero quello principale.
+    """
+
+    def __init__(self, device_key: str | None = None, **kwargs):
+        """
+        Args:
+            device_key: Identificativo del device, seleziona il worker thread
+            **kwargs: Parametri di Controller (exclude_actions, output_model)
+        """
+        super().__init__(**kwargs)
+        self.executor = device_executor(device_key)
+
+    async def act(self, action, app, context=None):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, asyncio.run, super().act(action, app, context))
@@ -0,0 +1,200 @@
+"""
+Cloud Scheduler - Coda dei test mobile cloud entro il limite di sessioni del piano LambdaTest
+Ogni test cloud occupa uno slot (LT_MAX_CONCURRENCY slot in tutto) per tutta la sua durata;
+i test in attesa sono serviti a turno tra i workbook, così un file con molte righe non
+blocca gli altri. Se il hub risponde comunque "coda piena" la creazione della sessione
+viene ritentata con backoff esponenziale. Per ogni test si misurano il tempo in coda
+(attesa dello slot + backoff) e quello di esecuzione.
+"""
+import asyncio
+import logging
+import os
+import random
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKBOOK = 'default'
+
+# Frammenti dei messaggi del hub quando il limite di sessioni parallele è raggiunto
+QUEUE_FULL_PATTERNS = (
+    'queue is full',
+    'queue full',
+    'queue limit',
+    'queue size',
+    'concurrency limit',
+    'parallel limit',
+    'parallel sessions',
+    'maximum number of parallel',
+    'too many requests',
+)
+
+
+def is_queue_full(error: Exception) -> bool:
+    """True se l'errore di creazione della sessione indica la coda del hub piena."""
+    message = str(error).lower()
+    return any(pattern in message for pattern in QUEUE_FULL_PATTERNS)
+
+
+class CloudTicket:
+    """Slot assegnato a un test cloud, con i tempi di coda e di esecuzione."""
+
+    def __init__(self, workbook: str, slot: int, queued_seconds: float):
+        self.workbook = workbook
+        self.slot = slot
+        # Attesa dello slot nello scheduler
+        self.queued_seconds = queued_seconds
+        # Attese dovute alle risposte "coda piena" del hub
+        self.backoff_seconds = 0.0
+        self.started_at = time.perf_counter()
+
+    @property
+    def queue_seconds(self) -> float:
+        return self.queued_seconds + self.backoff_seconds
+
+    def execution_seconds(self) -> float:
+        return time.perf_counter() - self.started_at - self.backoff_seconds
+
+
+class CloudScheduler:
+    """
+    Slot delle sessioni cloud per l'event loop dell'executor.
+    slot() va usato come async context manager attorno all'intero test; create_session()
+    (sincrono, dal worker thread del device) ritenta la creazione sulle risposte "coda piena".
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 2,
+        backoff_initial: float = 5.0,
+        backoff_max: float = 60.0,
+        queue_timeout: float = 600.0,
+    ):
+        """
+        Args:
+            max_sessions: Sessioni cloud contemporanee consentite dal piano
+            backoff_initial: Prima attesa dopo una risposta "coda piena", in secondi
+            backoff_max: Attesa massima tra due tentativi, in secondi
+            queue_timeout: Oltre questo tempo di backoff l'errore del hub viene propagato
+        """
+        self.max_sessions = max(1, max_sessions)
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.queue_timeout = queue_timeout
+        self._free_slots = list(range(self.max_sessions))
+        # workbook -> future dei test in attesa; il primo workbook è il prossimo servito
+        self._waiters = OrderedDict()
+        self.tests = 0
+        self.queue_full_retries = 0
+        self.total_queue_seconds = 0.0
+        self.total_execution_seconds = 0.0
+
+    @classmethod
+    def from_env(cls) -> 'CloudScheduler':
+        """LT_MAX_CONCURRENCY, LT_QUEUE_BACKOFF, LT_QUEUE_BACKOFF_MAX e LT_QUEUE_TIMEOUT da .env."""
+        return cls(
+            max_sessions=int(os.getenv('LT_MAX_CONCURRENCY', '2')),
+            backoff_initial=float(os.getenv('LT_QUEUE_BACKOFF', '5')),
+            backoff_max=float(os.getenv('LT_QUEUE_BACKOFF_MAX', '60')),
+            queue_timeout=float(os.getenv('LT_QUEUE_TIMEOUT', '600')),
+        )
+
+    @property
+    def running(self) -> int:
+        """Test cloud in esecuzione (uno per slot occupato)."""
+        return self.max_sessions - len(self._free_slots)
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    @asynccontextmanager
+    async def slot(self, workbook: str = DEFAULT_WORKBOOK):
+        """
+        Attende uno slot libero (a turno tra i workbook) e lo rilascia a fine test.
+
+        Yields:
+            CloudTicket del test
+        """
+        requested = time.perf_counter()
+        if self._free_slots and not self._waiters:
+            slot = self._free_slots.pop(0)
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._waiters.setdefault(workbook, deque()).append(future)
+            try:
+                slot = await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self._release(future.result())
+                else:
+                    self._forget(workbook, future)
+                raise
+        ticket = CloudTicket(workbook, slot, time.perf_counter() - requested)
+        try:
+            yield ticket
+        finally:
+            self.tests += 1
+            self.total_queue_seconds += ticket.queue_seconds
+            self.total_execution_seconds += ticket.execution_seconds()
+            self._release(slot)
+
+    def _release(self, slot: int):
+        """Assegna lo slot al primo workbook in attesa, che passa in fondo alla rotazione."""
+        while self._waiters:
+            workbook, waiters = next(iter(self._waiters.items()))
+            future = waiters.popleft()
+            if waiters:
+                self._waiters.move_to_end(workbook)
+            else:
+                del self._waiters[workbook]
+            if not future.done():
+                future.set_result(slot)
+                return
+        self._free_slots.append(slot)
+        self._free_slots.sort()
+
+    def _forget(self, workbook: str, future):
+        waiters = self._waiters.get(workbook)
+        if waiters and future in waiters:
+            waiters.remove(future)
+            if not waiters:
+                del self._waiters[workbook]
+
+    def create_session(self, factory, ticket: CloudTicket | None = None):
+        """
+        Crea la sessione ritentando con backoff esponenziale finché il hub risponde "coda piena".
+
+        Args:
+            factory: Callable senza argomenti che crea la App
+            ticket: Ticket del test, a cui vengono addebitate le attese
+
+        Returns:
+            La App creata
+        """
+        delay = self.backoff_initial
+        waited = 0.0
+        while True:
+            try:
+                return factory()
+            except Exception as e:
+                if not is_queue_full(e) or waited + delay > self.queue_timeout:
+                    raise
+                pause = delay * random.uniform(0.8, 1.2)
+                self.queue_full_retries += 1
+                logger.warning(f'Coda del hub cloud piena, nuovo tentativo tra {pause:.0f}s')
+                time.sleep(pause)
+                waited += pause
+                if ticket is not None:
+                    ticket.backoff_seconds += pause
+                delay = min(delay * 2, self.backoff_max)
+
+    def get_stats(self) -> dict:
+        return {
+            'tests': self.tests,
+            'queue_seconds': round(self.total_queue_seconds, 1),
+            'execution_seconds': round(self.total_execution_seconds, 1),
+            'queue_full_retries': self.queue_full_retries,
+        }
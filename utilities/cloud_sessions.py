@@ -0,0 +1,208 @@
+"""
+Cloud Sessions - Pre-riscaldamento delle sessioni LambdaTest per i test mobile cloud
+L'allocazione di un device reale nel cloud può richiedere un minuto: mentre la riga
+corrente è in esecuzione, le sessioni delle righe successive (fino a CLOUD_PREFETCH_LOOKAHEAD)
+vengono create in background, senza superare il limite di concorrenza dell'account.
+Le sessioni pronte ma inutilizzate oltre l'idle timeout vengono chiuse.
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, urlsplit, urlunsplit
+
+from utilities.appium_session_pool import AppiumSessionPool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LT_HUB_URL = 'https://mobile-hub.lambdatest.com/wd/hub'
+
+# Margine (secondi) prima dell'idle timeout del hub: oltre, una sessione pronta viene chiusa
+IDLE_MARGIN = 10
+
+
+def lambdatest_hub_url(username: str | None = None, access_key: str | None = None, hub_url: str | None = None) -> str:
+    """
+    URL del hub con le credenziali LambdaTest. LT_HUB_URL permette di puntare a un hub
+    locale (es. benchmarks/fake_appium_server.py); senza credenziali l'URL resta invariato.
+    """
+    hub_url = hub_url or os.getenv('LT_HUB_URL') or DEFAULT_LT_HUB_URL
+    username = os.getenv('LT_USERNAME') if username is None else username
+    access_key = os.getenv('LT_ACCESS_KEY') if access_key is None else access_key
+    if not username or not access_key:
+        return hub_url
+    parts = urlsplit(hub_url)
+    netloc = f"{quote(username, safe='')}:{quote(access_key, safe='')}@{parts.netloc.rsplit('@', 1)[-1]}"
+    return urlunsplit(parts._replace(netloc=netloc))
+
+
+class _PrefetchedSession:
+    """Sessione in creazione (future) o pronta, con l'istante in cui è diventata inattiva."""
+
+    def __init__(self, future):
+        self.future = future
+        self.requested_at = time.monotonic()
+        self.ready_at = None
+        future.add_done_callback(self._on_done)
+
+    def _on_done(self, future):
+        self.ready_at = time.monotonic()
+
+    def idle_seconds(self) -> float:
+        return time.monotonic() - self.ready_at if self.ready_at is not None else 0.0
+
+
+class CloudSessionPrefetcher:
+    """
+    Sessioni cloud create in anticipo, indicizzate per make_session_key.
+    prefetch() avvia la creazione in un thread, take() consegna la sessione al test
+    (attendendo se la creazione è ancora in corso); un App non preso entro
+    idle_timeout - IDLE_MARGIN secondi viene chiuso da expire_idle().
+    """
+
+    def __init__(self, lookahead: int = 1, max_concurrency: int = 2, idle_timeout: int = 300):
+        """
+        Args:
+            lookahead: Righe successive di cui creare la sessione in anticipo (0 = disattivato)
+            max_concurrency: Sessioni cloud contemporanee consentite dall'account
+            idle_timeout: Idle timeout delle sessioni sul hub (capability idleTimeout), in secondi
+        """
+        self.lookahead = max(0, lookahead)
+        self.max_concurrency = max(1, max_concurrency)
+        self.idle_timeout = idle_timeout
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        self.requested = 0
+        self.hits = 0
+        self.expired = 0
+        self.failed = 0
+
+    @classmethod
+    def from_env(cls) -> 'CloudSessionPrefetcher':
+        """CLOUD_PREFETCH_LOOKAHEAD, LT_MAX_CONCURRENCY e LT_IDLE_TIMEOUT da .env."""
+        return cls(
+            lookahead=int(os.getenv('CLOUD_PREFETCH_LOOKAHEAD', '1')),
+            max_concurrency=int(os.getenv('LT_MAX_CONCURRENCY', '2')),
+            idle_timeout=int(os.getenv('LT_IDLE_TIMEOUT', '300')),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.lookahead > 0
+
+    @property
+    def pending(self) -> int:
+        """Sessioni in creazione o pronte e non ancora consegnate (occupano la concorrenza)."""
+        with self._lock:
+            return sum(len(entries) for entries in self._sessions.values())
+
+    def has(self, key: tuple) -> bool:
+        with self._lock:
+            return bool(self._sessions.get(key))
+
+    def prefetch(self, key: tuple, factory, open_sessions: int = 0) -> bool:
+        """
+        Avvia la creazione di una sessione in background se la concorrenza lo consente.
+
+        Args:
+            key: Chiave della sessione (make_session_key)
+            factory: Callable senza argomenti che crea la App
+            open_sessions: Sessioni cloud già aperte (es. quelle del pool)
+
+        Returns:
+            True se la creazione è stata avviata
+        """
+        if not self.enabled:
+            return False
+        self.expire_idle()
+        with self._lock:
+            in_flight = sum(len(entries) for entries in self._sessions.values())
+            if open_sessions + in_flight >= self.max_concurrency:
+                logger.info(f'Prefetch cloud rimandato: {open_sessions + in_flight}/{self.max_concurrency} sessioni in uso')
+                return False
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.lookahead, thread_name_prefix='cloud-prefetch')
+            self._sessions.setdefault(key, []).append(_PrefetchedSession(self._executor.submit(factory)))
+            self.requested += 1
+        return True
+
+    def take(self, key: tuple):
+        """
+        Sessione pre-riscaldata per la chiave, None se assente, fallita o scaduta.
+        Se la creazione è ancora in corso attende il suo completamento.
+        """
+        with self._lock:
+            entries = self._sessions.get(key)
+            entry = entries.pop(0) if entries else None
+            if entries == []:
+                del self._sessions[key]
+        if entry is None:
+            return None
+        try:
+            app = entry.future.result()
+        except Exception as e:
+            self.failed += 1
+            logger.warning(f'Creazione anticipata della sessione cloud fallita: {e}')
+            return None
+        if entry.idle_seconds() > self.idle_timeout - IDLE_MARGIN or not AppiumSessionPool.is_healthy(app):
+            self.expired += 1
+            logger.info(f'Sessione cloud pre-riscaldata scaduta dopo {entry.idle_seconds():.0f}s di inattività')
+            self._close(app)
+            return None
+        self.hits += 1
+        logger.info(f'Sessione cloud pre-riscaldata pronta da {entry.idle_seconds():.0f}s')
+        return app
+
+    def expire_idle(self):
+        """Chiude le sessioni pronte rimaste inattive oltre l'idle timeout del hub."""
+        expired = []
+        with self._lock:
+            for key, entries in list(self._sessions.items()):
+                keep = []
+                for entry in entries:
+                    if entry.future.done() and entry.idle_seconds() > self.idle_timeout - IDLE_MARGIN:
+                        expired.append(entry)
+                    else:
+                        keep.append(entry)
+                if keep:
+                    self._sessions[key] = keep
+                else:
+                    del self._sessions[key]
+        for entry in expired:
+            if entry.future.exception() is None:
+                self.expired += 1
+                self._close(entry.future.result())
+            else:
+                self.failed += 1
+
+    def close_all(self):
+        """Attende le creazioni in corso e chiude tutte le sessioni non consegnate."""
+        with self._lock:
+            entries = [entry for entries in self._sessions.values() for entry in entries]
+            self._sessions.clear()
+        for entry in entries:
+            try:
+                self._close(entry.future.result())
+            except Exception:
+                pass
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    @staticmethod
+    def _close(app):
+        try:
+            app.close(force=True)
+        except Exception as e:
+            logger.warning(f'Chiusura della sessione cloud fallita: {e}')
+
+    def get_stats(self) -> dict:
+        return {
+            'requested': self.requested,
+            'hits': self.hits,
+            'expired': self.expired,
+            'failed': self.failed,
+            'pending': self.pending,
+        }
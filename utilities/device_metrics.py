@@ -0,0 +1,94 @@
+"""
+Device Metrics - Cache delle dimensioni della finestra del device
+driver.get_window_size() è un round-trip HTTP verso Appium ed è chiamato più volte per
+ogni step (tree builder, gesture, scroll). Le dimensioni vengono lette una volta per
+sessione e aggiornate solo quando cambia l'orientamento o su invalidazione esplicita.
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def orientation_hint(root) -> tuple | None:
+    """
+    Indizio dell'orientamento ricavato dalla page source già scaricata (nessun round-trip):
+    attributo rotation della radice su Android, dimensioni dell'Application su iOS.
+
+    Args:
+        root: Elemento radice (xml.etree / lxml) della page source
+    """
+    rotation = root.get('rotation')
+    if rotation is not None:
+        return ('rotation', rotation)
+    app_element = root[0] if len(root) else root
+    width, height = app_element.get('width'), app_element.get('height')
+    if width is not None and height is not None:
+        return ('size', width, height)
+    return None
+
+
+class DeviceMetricsCache:
+    """
+    Cache per sessione Appium. App e tree builder chiedono le dimensioni a get_window_size()
+    invece che al driver; il tree builder segnala le rotazioni con observe_orientation().
+    """
+
+    def __init__(self, driver):
+        """
+        Args:
+            driver: Istanza webdriver.Remote di Appium
+        """
+        self.driver = driver
+        self._window_size = None
+        self._orientation_hint = None
+        self.round_trips = 0
+        self.saved_round_trips = 0
+
+    def get_window_size(self) -> dict:
+        """Dimensioni della finestra corrente ({'width', 'height'}), lette una volta per orientamento."""
+        if self._window_size is None:
+            self._window_size = dict(self.driver.get_window_size())
+            self.round_trips += 1
+        else:
+            self.saved_round_trips += 1
+        return dict(self._window_size)
+
+    def observe_orientation(self, hint):
+        """
+        Confronta l'indizio di orientamento con quello precedente: se cambia (rotazione)
+        la cache viene invalidata.
+        """
+        if hint is None:
+            return
+        if self._orientation_hint is not None and hint != self._orientation_hint:
+            logger.info('Rotazione del device rilevata, aggiorno le dimensioni dello schermo')
+            self.invalidate()
+        self._orientation_hint = hint
+
+    def invalidate(self):
+        """Forza la rilettura delle dimensioni alla prossima richiesta."""
+        self._window_size = None
+
+    def reset_counters(self):
+        self.round_trips = 0
+        self.saved_round_trips = 0
+
+
+class CachedWindowSizeDriver:
+    """
+    Driver passato ad AppiumElementTreeBuilder dal tree builder incrementale: il codice
+    ereditato da app_use (es. il disegno degli highlight sullo screenshot) chiama
+    driver.get_window_size(), che qui passa dalla cache; tutto il resto va al driver.
+    """
+
+    def __init__(self, driver, device_metrics: DeviceMetricsCache):
+        self._driver = driver
+        self._device_metrics = device_metrics
+
+    def get_window_size(self, windowHandle: str = 'current') -> dict:
+        if windowHandle != 'current':
+            return self._driver.get_window_size(windowHandle)
+        return self._device_metrics.get_window_size()
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
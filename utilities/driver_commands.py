@@ -0,0 +1,55 @@
+"""
+Driver Commands - Conteggio dei comandi (round-trip HTTP) inviati ad Appium
+install() sostituisce driver.execute sull'istanza del driver: vengono contati anche i
+comandi degli elementi (WebElement._execute passa dal driver) e quelli di app_use.
+"""
+import logging
+from collections import Counter
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class DriverCommandCounter:
+    """
+    Contatore per sessione Appium, per nome del comando (es. 'findElement', 'executeScript').
+    """
+
+    def __init__(self, driver):
+        """
+        Args:
+            driver: Istanza webdriver.Remote di Appium
+        """
+        self.driver = driver
+        self._driver_execute = driver.execute
+        self.counts = Counter()
+        self.total = 0
+
+    def install(self):
+        """Instrada driver.execute() attraverso il contatore."""
+        self.driver.execute = self.execute
+
+    def execute(self, driver_command: str, params: dict = None):
+        self.counts[driver_command] += 1
+        self.total += 1
+        return self._driver_execute(driver_command, params)
+
+    @contextmanager
+    def measure(self):
+        """
+        Conta i comandi eseguiti all'interno del blocco:
+
+            with counter.measure() as measured:
+                ...
+            measured['commands']
+        """
+        measured = {'commands': 0}
+        start = self.total
+        try:
+            yield measured
+        finally:
+            measured['commands'] = self.total - start
+
+    def reset_counters(self):
+        self.counts = Counter()
+        self.total = 0
@@ -0,0 +1,407 @@
+"""
+Element Tree - Costruzione incrementale dell'albero degli elementi mobile
+Estende AppiumElementTreeBuilder di app_use: a ogni rebuild confronta la page source
+con lo snapshot precedente, ricostruisce solo i sottoalberi cambiati e mantiene
+stabili gli highlight index degli elementi rimasti sullo schermo. La page source è letta
+in streaming (utilities.page_source) scartando i sottoalberi non evidenziabili.
+"""
+import base64
+import copy
+import logging
+import time
+from collections import Counter
+
+from app_use.nodes.app_node import AppState, ViewportInfo
+from app_use.nodes.appium_tree_builder import AppiumElementTreeBuilder
+
+from utilities.device_metrics import CachedWindowSizeDriver, orientation_hint
+from utilities.locator_index import LocatorIndex, locator_count_keys
+from utilities.page_source import SourceNode, iter_page_source
+
+logger = logging.getLogger(__name__)
+
+# Se meno di questa frazione degli elementi interattivi era già presente nello snapshot
+# precedente (nuova schermata), gli indici vengono riassegnati per posizione
+STABLE_INDEX_MIN_OVERLAP = 0.5
+# Attesa massima (s) di un frame MJPEG successivo all'inizio del build prima di
+# ripiegare sullo screenshot WebDriver
+STREAM_FRAME_TIMEOUT = 0.5
+
+
+class IncrementalElementTreeBuilder(AppiumElementTreeBuilder):
+    """
+    AppiumElementTreeBuilder con cache dei sottoalberi e highlight index stabili.
+    Ogni sottoalbero XML è identificato da un hash di tag, attributi e hash dei figli:
+    i sottoalberi con lo stesso hash dello snapshot precedente vengono copiati dai nodi già
+    costruiti, senza modificarli (appartengono a un AppState già restituito). Solo una
+    schermata identica condivide l'intero albero, con parent e highlight index invariati.
+    La page source è letta in streaming e, con prune attivo, i sottoalberi senza elementi
+    evidenziabili vengono scartati già durante il parsing.
+    """
+
+    def __init__(self, driver, device_metrics=None, prune: bool = True):
+        """
+        Args:
+            driver: Appium WebDriver
+            device_metrics: DeviceMetricsCache opzionale, informata delle rotazioni
+            prune: Scarta i sottoalberi invisibili o fuori viewport senza elementi interattivi
+        """
+        # Le chiamate a get_window_size() dei metodi ereditati da app_use usano la cache
+        super().__init__(CachedWindowSizeDriver(driver, device_metrics) if device_metrics is not None else driver)
+        self.device_metrics = device_metrics
+        self.prune = prune
+        self._context = None
+        self._last_page_source = None
+        self._last_root = None
+        self._last_extents = (None, None, None, None)
+        self._last_locator_counts = Counter()
+        # Locator univoci degli elementi evidenziabili dell'ultimo build
+        self.last_locator_index = LocatorIndex()
+        self._subtree_cache = {}
+        self._claimed = set()
+        self._previous_indices = {}
+        self.last_build_stats = {}
+        # Screenshot senza highlight dell'ultimo build, riusato per il report
+        self.last_screenshot = None
+        # MjpegFrameReader opzionale: screenshot dallo stream invece che da WebDriver
+        self.frame_source = None
+        # Età (s) del frame MJPEG usato dall'ultimo build, None se lo screenshot è da WebDriver
+        self.last_screenshot_age = None
+        self._build_started = 0.0
+
+    def reset(self):
+        """Dimentica lo snapshot precedente: il prossimo build è completo."""
+        self._context = None
+        self._last_page_source = None
+        self._last_root = None
+        self._subtree_cache = {}
+        self._previous_indices = {}
+
+    def build_element_tree(
+        self,
+        platform_type: str,
+        viewport_expansion: int = 0,
+        debug_mode: bool = False,
+        include_highlights: bool = True,
+        page_source: str | None = None,
+        take_screenshot: bool = True,
+    ):
+        """
+        Costruisce l'AppState riusando i sottoalberi invariati dello snapshot precedente.
+
+        Args:
+            platform_type: 'android' o 'ios'
+            viewport_expansion: Espansione del viewport in pixel
+            debug_mode: Modalità debug
+            include_highlights: Disegna i bounding box sullo screenshot
+            page_source: Page source già letta dal chiamante (evita un round-trip)
+            take_screenshot: False per aggiornare solo albero e selector map
+        """
+        start_time = time.time()
+        stats = {'reused_nodes': 0, 'parsed_nodes': 0, 'pruned_nodes': 0, 'full_reuse': False}
+        self.last_screenshot = None
+        self.last_screenshot_age = None
+        self._build_started = time.monotonic()
+        self.last_locator_index = LocatorIndex()
+        platform_type = platform_type.lower()
+        try:
+            if page_source is None:
+                page_source = self.driver.page_source
+
+            root = screen = None
+            if page_source != self._last_page_source or self._last_root is None:
+                # Le dimensioni dello schermo vengono lette durante il parsing, dopo la radice
+                root, screen, extents, locator_counts = self._parse_page_source(
+                    page_source, platform_type, viewport_expansion, stats
+                )
+            if screen is None:
+                screen = self._window_size()
+            screen_width, screen_height = screen
+            viewport_info = ViewportInfo(width=screen_width, height=screen_height)
+
+            context = (platform_type, screen_width, screen_height, viewport_expansion)
+            if context != self._context:
+                self.reset()
+                self._context = context
+
+            if root is None and self._last_root is not None:
+                # Schermata identica: nessun parsing
+                root_node = self._last_root
+                extents = self._last_extents
+                locator_counts = self._last_locator_counts
+                stats['full_reuse'] = True
+                new_cache = self._subtree_cache
+            else:
+                if root is None:
+                    root, _, extents, locator_counts = self._parse_page_source(
+                        page_source, platform_type, viewport_expansion, stats, screen
+                    )
+                new_cache = {}
+                self._claimed = set()
+                root_node = self._build_subtree(
+                    root, None, new_cache, stats,
+                    platform_type, screen_width, screen_height, viewport_expansion, debug_mode, viewport_info,
+                )
+                root_node.parent = None
+
+            self._subtree_cache = new_cache
+            self._last_page_source = page_source
+            self._last_root = root_node
+            self._last_extents = extents
+            self._last_locator_counts = locator_counts
+
+            all_nodes = self._collect_all_nodes(root_node)
+            interactive_nodes = [node for node in all_nodes if node.highlight_index is not None]
+            if not stats['full_reuse']:
+                # Su una schermata identica l'albero è condiviso con lo snapshot precedente: indici già assegnati
+                self._assign_stable_indices(interactive_nodes)
+
+            selector_map = {node.highlight_index: node for node in interactive_nodes}
+            self._selector_map = selector_map
+            self.last_locator_index = LocatorIndex(platform_type, locator_counts, interactive_nodes)
+            self._perf_metrics = {
+                'build_tree_time': time.time() - start_time,
+                'node_count': len(all_nodes),
+                'highlighted_count': len(selector_map),
+            }
+            self.last_build_stats = stats
+            logger.info(
+                f'Built element tree with {len(all_nodes)} nodes, {len(selector_map)} highlighted '
+                f'({stats["reused_nodes"]} reused, {stats["parsed_nodes"]} parsed, {stats["pruned_nodes"]} pruned)'
+            )
+
+            app_state = AppState(element_tree=root_node, selector_map=dict(selector_map))
+            # Calcolato sugli estremi raccolti durante il parsing: include anche i sottoalberi potati
+            self._apply_scroll_extents(app_state, extents)
+
+            if take_screenshot:
+                try:
+                    app_state.screenshot = self._take_screenshot_with_highlights(app_state, include_highlights)
+                except Exception as e:
+                    logger.error(f'Failed to capture screenshot: {e}')
+
+            return app_state
+
+        except Exception as e:
+            logger.error(f'Error building element tree incrementally, falling back to full build: {e}')
+            self.reset()
+            return super().build_element_tree(
+                platform_type,
+                viewport_expansion=viewport_expansion,
+                debug_mode=debug_mode,
+                include_highlights=include_highlights,
+            )
+
+    def _window_size(self) -> tuple:
+        try:
+            # Dimensioni dalla cache di sessione: nessun round-trip se lo schermo non è ruotato
+            size = (self.device_metrics or self.driver).get_window_size()
+            return size['width'], size['height']
+        except Exception:
+            return 0, 0
+
+    def _parse_page_source(self, page_source: str, platform_type: str, viewport_expansion: int, stats: dict, screen: tuple | None = None):
+        """
+        Legge la page source in streaming costruendo un albero di SourceNode.
+        Alla chiusura di ogni elemento ne calcola l'hash del sottoalbero e, con il pruning
+        attivo, scarta i sottoalberi che non contengono elementi evidenziabili né testo
+        di un antenato evidenziabile (elementi invisibili o fuori dal viewport espanso).
+
+        Args:
+            page_source: XML della page source
+            platform_type: 'android' o 'ios'
+            viewport_expansion: Espansione del viewport in pixel, applicata già durante il parsing
+            stats: Statistiche del build (pruned_nodes)
+            screen: Dimensioni dello schermo già note, altrimenti lette dopo la radice
+
+        Returns:
+            (radice, (larghezza, altezza), estremi verticali per pixels_above/below,
+            occorrenze delle chiavi dei locator per LocatorIndex)
+        """
+        stack = []
+        root = None
+        locator_counts = Counter()
+        # [top, bottom] di tutti gli elementi e di quelli nel viewport
+        extents = [None, None, None, None]
+        for event, tag, attrib in iter_page_source(page_source):
+            if event == 'start':
+                node = SourceNode(tag, attrib)
+                locator_counts.update(locator_count_keys(attrib, platform_type))
+                if not stack:
+                    root = node
+                else:
+                    parent = stack[-1]
+                    parent.children.append(node)
+                    if screen is None:
+                        screen = self._resolve_screen(root)
+                    self._classify_source_node(node, parent, platform_type, screen, viewport_expansion, extents)
+                stack.append(node)
+                continue
+
+            node = stack.pop()
+            if stack and self.prune and not (node.has_target or (node.under_target and node.has_text)):
+                stack[-1].children.pop()
+                stats['pruned_nodes'] += self._count_source_nodes(node)
+                continue
+            node.subtree_hash = hash((
+                node.tag,
+                tuple(sorted(node.attrib.items())),
+                tuple(child.subtree_hash for child in node.children),
+            ))
+            if stack:
+                parent = stack[-1]
+                parent.has_target = parent.has_target or node.has_target
+                parent.has_text = parent.has_text or node.has_text
+
+        if root is None:
+            raise ValueError('Page source vuota')
+        if screen is None:
+            screen = self._resolve_screen(root)
+        return root, screen, tuple(extents), locator_counts
+
+    def _resolve_screen(self, root: SourceNode) -> tuple:
+        """Dimensioni dello schermo, dopo aver segnalato l'orientamento letto dalla radice."""
+        if self.device_metrics is not None:
+            # Rotazione rilevata dalla page source: invalida la cache delle dimensioni
+            self.device_metrics.observe_orientation(orientation_hint(root))
+        return self._window_size()
+
+    def _classify_source_node(self, node, parent, platform_type, screen, viewport_expansion, extents):
+        """Visibilità, interattività e testo dell'elemento con la logica di app_use."""
+        attrib = node.attrib
+        screen_width, screen_height = screen
+        coordinates, _, is_visible, is_in_viewport = self._parse_coordinates(
+            attrib, screen_width, screen_height, viewport_expansion, platform_type
+        )
+        if coordinates is not None:
+            top, bottom = coordinates.y, coordinates.y + coordinates.height
+            extents[0] = top if extents[0] is None else min(extents[0], top)
+            extents[1] = bottom if extents[1] is None else max(extents[1], bottom)
+            if is_in_viewport:
+                extents[2] = top if extents[2] is None else min(extents[2], top)
+                extents[3] = bottom if extents[3] is None else max(extents[3], bottom)
+        original_type = self._get_element_type(attrib, platform_type)
+        node.is_target = bool(
+            is_visible and is_in_viewport and self._is_element_interactive(attrib, original_type, platform_type)
+        )
+        node.has_target = node.is_target
+        node.has_text = bool(self._extract_text_content(attrib, platform_type))
+        node.under_target = parent.is_target or parent.under_target
+
+    @staticmethod
+    def _count_source_nodes(node: SourceNode) -> int:
+        return 1 + sum(IncrementalElementTreeBuilder._count_source_nodes(child) for child in node.children)
+
+    @staticmethod
+    def _apply_scroll_extents(app_state: AppState, extents: tuple):
+        """pixels_above/below come _calculate_scroll_info di app_use."""
+        total_top, total_bottom, visible_top, visible_bottom = extents
+        if total_top is None or visible_top is None:
+            return
+        app_state.pixels_above = max(0, int(visible_top - total_top))
+        app_state.pixels_below = max(0, int(total_bottom - visible_bottom))
+
+    def _take_screenshot_with_highlights(self, app_state: AppState, include_highlights: bool = True) -> str:
+        """
+        Come in app_use, ma conserva lo screenshot originale in last_screenshot:
+        il report lo riusa invece di scaricarne un secondo. Con uno stream MJPEG attivo
+        usa il primo frame ricevuto dopo l'inizio del build (nessun round-trip).
+        """
+        screenshot = self._stream_screenshot()
+        if screenshot is None:
+            try:
+                screenshot = self.driver.get_screenshot_as_base64()
+            except Exception as e:
+                logger.error(f'Error taking screenshot: {e}')
+                return ''
+        self.last_screenshot = screenshot
+        if not include_highlights:
+            return screenshot
+        highlighted_screenshot = self._draw_bounding_boxes_on_screenshot(screenshot, app_state)
+        return highlighted_screenshot or screenshot
+
+    def _stream_screenshot(self) -> str | None:
+        """Frame MJPEG in base64, None se lo stream non è attivo o non ha frame recenti."""
+        if self.frame_source is None:
+            return None
+        frame = self.frame_source.wait_for_frame(newer_than=self._build_started, timeout=STREAM_FRAME_TIMEOUT)
+        if frame is None:
+            logger.debug('Nessun frame MJPEG recente, uso lo screenshot WebDriver')
+            return None
+        jpeg, received_at = frame
+        self.last_screenshot_age = time.monotonic() - received_at
+        return base64.b64encode(jpeg).decode('ascii')
+
+    def _build_subtree(self, element, parent, new_cache, stats, *parse_args):
+        """
+        Riusa il sottoalbero dallo snapshot precedente se invariato, altrimenti
+        costruisce il nodo con la logica di app_use e scende nei figli.
+        """
+        subtree_hash = element.subtree_hash
+        candidates = [
+            node for node in self._subtree_cache.get(subtree_hash, []) if id(node) not in self._claimed
+        ]
+        if candidates:
+            # Un sottoalbero duplicato non può riusare due volte gli stessi nodi
+            return self._clone_subtree(element, candidates[0], parent, new_cache, stats)
+
+        # Nodo senza figli: _parse_element di app_use gestisce tipo, testo, coordinate e interattività
+        node = self._parse_element(element.shallow_copy(), parent, *parse_args)
+        stats['parsed_nodes'] += 1
+        for child in element:
+            node.add_child(self._build_subtree(child, node, new_cache, stats, *parse_args))
+        new_cache.setdefault(subtree_hash, []).append(node)
+        return node
+
+    def _clone_subtree(self, element, cached, parent, new_cache, stats):
+        """
+        Copia (shallow, con i figli ricollegati) di un ramo riutilizzato: i nodi dello snapshot
+        precedente restano intatti, mentre parent e highlight_index vengono aggiornati sulla copia.
+        La copia è registrata nella nuova cache per il build successivo.
+        """
+        node = copy.copy(cached)
+        node.parent = parent
+        self._claimed.add(id(cached))
+        stats['reused_nodes'] += 1
+        if getattr(cached, 'children', None) is not None:
+            node.children = [
+                self._clone_subtree(child_element, child, node, new_cache, stats)
+                for child_element, child in zip(element, cached.children)
+            ]
+        new_cache.setdefault(element.subtree_hash, []).append(node)
+        return node
+
+    @staticmethod
+    def _node_signature(node) -> tuple:
+        """Identità di un elemento tra due snapshot: tipo, key, testo e posizione."""
+        coords = node.viewport_coordinates
+        bounds = (coords.x, coords.y, coords.width, coords.height) if coords else None
+        return (node.attributes.get('_original_type'), node.key, node.text, bounds)
+
+    def _assign_stable_indices(self, interactive_nodes: list):
+        """
+        Gli elementi già presenti mantengono il proprio highlight index, i nuovi ricevono
+        indici successivi. Su una schermata nuova gli indici vengono riassegnati per posizione.
+        """
+        self._sort_nodes_by_position(interactive_nodes)
+        signatures = [self._node_signature(node) for node in interactive_nodes]
+        previous = self._previous_indices
+        carried = sum(1 for signature in signatures if signature in previous)
+
+        if not previous or carried < len(interactive_nodes) * STABLE_INDEX_MIN_OVERLAP:
+            for index, node in enumerate(interactive_nodes):
+                node.highlight_index = index
+        else:
+            used = set()
+            next_index = max(previous.values()) + 1
+            for node, signature in zip(interactive_nodes, signatures):
+                index = previous.get(signature)
+                if index is None or index in used:
+                    index = next_index
+                    next_index += 1
+                node.highlight_index = index
+                used.add(index)
+
+        self._previous_indices = {
+            signature: node.highlight_index for node, signature in zip(interactive_nodes, signatures)
+        }
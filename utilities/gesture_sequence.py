@@ -0,0 +1,167 @@
+"""
+Gesture Sequence - Più gesture in un unico payload W3C Actions
+Ogni gesture di GestureService è una richiesta HTTP separata: una GestureSequence
+compone tap, swipe, long press, drag, pinch e pause (es. "swipe su 3 volte e poi tap")
+e le invia ad Appium con un solo POST /actions.
+"""
+import logging
+
+from selenium.webdriver.remote.command import Command
+
+logger = logging.getLogger(__name__)
+
+PRIMARY_FINGER = 'finger1'
+SECONDARY_FINGER = 'finger2'
+# Durata del contatto di un tap e pausa prima di un drag (ms)
+TAP_DURATION = 50
+DRAG_HOLD = 100
+# Direzione del dito -> verso dello spostamento (dx, dy)
+SWIPE_DIRECTIONS = {'up': (0, -1), 'down': (0, 1), 'left': (-1, 0), 'right': (1, 0)}
+
+
+def _move(x: int, y: int, duration: int = 0) -> dict:
+    return {'type': 'pointerMove', 'duration': int(duration), 'x': int(x), 'y': int(y), 'origin': 'viewport'}
+
+
+def _down() -> dict:
+    return {'type': 'pointerDown', 'button': 0}
+
+
+def _up() -> dict:
+    return {'type': 'pointerUp', 'button': 0}
+
+
+def _pause(duration: int = 0) -> dict:
+    return {'type': 'pause', 'duration': int(duration)}
+
+
+class GestureSequence:
+    """
+    Builder fluente di gesture touch. Ogni gesture aggiunge dei tick: le dita non
+    coinvolte ricevono una pausa, così le gesture restano in sequenza anche con il pinch.
+    """
+
+    def __init__(self, screen_size: dict | None = None):
+        """
+        Args:
+            screen_size: Dimensioni dello schermo {'width', 'height'}, richieste da swipe_direction
+        """
+        self.screen_size = screen_size
+        self._ticks = []
+        self.gestures = []
+
+    def __len__(self):
+        return len(self.gestures)
+
+    def _add(self, name: str, *ticks: dict) -> 'GestureSequence':
+        self._ticks.extend(ticks)
+        self.gestures.append(name)
+        return self
+
+    def tap(self, x: int, y: int) -> 'GestureSequence':
+        return self._add(
+            'tap',
+            {PRIMARY_FINGER: _move(x, y)},
+            {PRIMARY_FINGER: _down()},
+            {PRIMARY_FINGER: _pause(TAP_DURATION)},
+            {PRIMARY_FINGER: _up()},
+        )
+
+    def long_press(self, x: int, y: int, duration: int = 1000) -> 'GestureSequence':
+        return self._add(
+            'long_press',
+            {PRIMARY_FINGER: _move(x, y)},
+            {PRIMARY_FINGER: _down()},
+            {PRIMARY_FINGER: _pause(duration)},
+            {PRIMARY_FINGER: _up()},
+        )
+
+    def swipe(self, start_x: int, start_y: int, end_x: int, end_y: int, duration: int = 300) -> 'GestureSequence':
+        return self._add(
+            'swipe',
+            {PRIMARY_FINGER: _move(start_x, start_y)},
+            {PRIMARY_FINGER: _down()},
+            {PRIMARY_FINGER: _move(end_x, end_y, duration)},
+            {PRIMARY_FINGER: _up()},
+        )
+
+    def drag(self, start_x: int, start_y: int, end_x: int, end_y: int, duration: int = 1000) -> 'GestureSequence':
+        return self._add(
+            'drag',
+            {PRIMARY_FINGER: _move(start_x, start_y)},
+            {PRIMARY_FINGER: _down()},
+            {PRIMARY_FINGER: _pause(DRAG_HOLD)},
+            {PRIMARY_FINGER: _move(end_x, end_y, duration)},
+            {PRIMARY_FINGER: _up()},
+        )
+
+    def pinch(self, center_x: int, center_y: int, start_distance: int, end_distance: int, duration: int = 500) -> 'GestureSequence':
+        """
+        Due dita sull'asse orizzontale: end_distance < start_distance chiude (zoom out),
+        end_distance > start_distance apre (zoom in). Le distanze sono dal centro.
+        """
+        return self._add(
+            'pinch',
+            {
+                PRIMARY_FINGER: _move(center_x - start_distance, center_y),
+                SECONDARY_FINGER: _move(center_x + start_distance, center_y),
+            },
+            {PRIMARY_FINGER: _down(), SECONDARY_FINGER: _down()},
+            {
+                PRIMARY_FINGER: _move(center_x - end_distance, center_y, duration),
+                SECONDARY_FINGER: _move(center_x + end_distance, center_y, duration),
+            },
+            {PRIMARY_FINGER: _up(), SECONDARY_FINGER: _up()},
+        )
+
+    def pause(self, duration: int) -> 'GestureSequence':
+        """Attesa (ms) tra due gesture, es. per far terminare l'inerzia di uno scroll."""
+        return self._add('pause', {PRIMARY_FINGER: _pause(duration)})
+
+    def swipe_direction(self, direction: str, times: int = 1, distance: float = 0.5, duration: int = 300, settle: int = 200) -> 'GestureSequence':
+        """
+        Swipe dal centro dello schermo nella direzione del dito ('up' fa scorrere il contenuto verso il basso).
+
+        Args:
+            direction: 'up', 'down', 'left' o 'right'
+            times: Numero di swipe
+            distance: Lunghezza dello swipe come frazione dello schermo
+            duration: Durata di ogni swipe (ms)
+            settle: Pausa dopo ogni swipe (ms)
+        """
+        if direction not in SWIPE_DIRECTIONS:
+            raise ValueError(f"Direzione non valida: {direction}. Valori validi: {', '.join(SWIPE_DIRECTIONS)}")
+        if not self.screen_size:
+            raise ValueError('swipe_direction richiede screen_size')
+        width, height = self.screen_size['width'], self.screen_size['height']
+        dx, dy = SWIPE_DIRECTIONS[direction]
+        center_x, center_y = width // 2, height // 2
+        half_x, half_y = int(width * distance / 2) * dx, int(height * distance / 2) * dy
+        for _ in range(times):
+            self.swipe(center_x - half_x, center_y - half_y, center_x + half_x, center_y + half_y, duration)
+            if settle:
+                self.pause(settle)
+        return self
+
+    def to_payload(self) -> dict:
+        """Payload del comando W3C Actions (una sorgente touch per dito)."""
+        fingers = sorted({finger for tick in self._ticks for finger in tick})
+        return {
+            'actions': [
+                {
+                    'type': 'pointer',
+                    'id': finger,
+                    'parameters': {'pointerType': 'touch'},
+                    'actions': [tick.get(finger, _pause()) for tick in self._ticks],
+                }
+                for finger in fingers
+            ]
+        }
+
+    def perform(self, driver) -> bool:
+        """Esegue tutte le gesture con una sola richiesta ad Appium."""
+        if not self._ticks:
+            return True
+        driver.execute(Command.W3C_ACTIONS, self.to_payload())
+        logger.info(f'Eseguite {len(self.gestures)} gesture in un solo payload: {", ".join(self.gestures)}')
+        return True
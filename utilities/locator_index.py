@@ -0,0 +1,129 @@
+"""
+Locator Index - Locator univoco più economico per ogni elemento di uno snapshot
+Durante il parsing della page source il tree builder conta le occorrenze di resource-id,
+accessibility id, testo e combinazioni di attributi. A fine build LocatorIndex sceglie per
+ogni elemento evidenziabile il primo locator univoco nell'ordine di costo lato server
+(id / accessibility id, poi UiSelector o predicate iOS) evitando le query XPath.
+"""
+from collections import Counter
+from typing import NamedTuple
+
+from appium.webdriver.common.appiumby import AppiumBy
+
+
+class Locator(NamedTuple):
+    """Locator di un elemento: strategia, argomenti di find_element e selettore per lo scroll."""
+
+    strategy: str
+    by: str
+    value: str
+    # UiSelector (Android) o predicate (iOS) utilizzabile da UiScrollable / mobile: scroll
+    scroll_selector: str
+
+
+def quote_selector_value(value: str) -> str:
+    """Escape di backslash e virgolette per stringhe UiSelector e predicate iOS."""
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def locator_count_keys(attrib: dict, platform_type: str) -> list:
+    """Chiavi da contare per verificare l'univocità dei locator di un elemento."""
+    if platform_type == 'android':
+        element_class = attrib.get('class', '')
+        resource_id = attrib.get('resource-id', '')
+        text = attrib.get('text', '')
+        description = attrib.get('content-desc', '')
+        keys = [('combo', element_class, resource_id, text, description)]
+        if resource_id:
+            keys.append(('id', resource_id))
+        if description:
+            keys.append(('accessibility_id', description))
+        if text:
+            keys.append(('text', text))
+        return keys
+    element_type = attrib.get('type', '')
+    name = attrib.get('name', '')
+    label = attrib.get('label', '')
+    keys = [('combo', element_type, name, label, attrib.get('value', ''))]
+    if name:
+        keys.append(('accessibility_id', name))
+    if label:
+        keys.append(('label', element_type, label))
+    return keys
+
+
+def _android_candidates(attrib: dict):
+    element_class = attrib.get('class', '')
+    resource_id = attrib.get('resource-id', '')
+    text = attrib.get('text', '')
+    description = attrib.get('content-desc', '')
+    if resource_id:
+        yield ('id', resource_id), Locator(
+            'id', AppiumBy.ID, resource_id, f'new UiSelector().resourceId("{quote_selector_value(resource_id)}")'
+        )
+    if description:
+        yield ('accessibility_id', description), Locator(
+            'accessibility_id', AppiumBy.ACCESSIBILITY_ID, description,
+            f'new UiSelector().description("{quote_selector_value(description)}")',
+        )
+    if text:
+        selector = f'new UiSelector().text("{quote_selector_value(text)}")'
+        yield ('text', text), Locator('uiselector', AppiumBy.ANDROID_UIAUTOMATOR, selector, selector)
+    parts = [f'className("{quote_selector_value(element_class)}")'] if element_class else []
+    for method, value in (('resourceId', resource_id), ('text', text), ('description', description)):
+        if value:
+            parts.append(f'{method}("{quote_selector_value(value)}")')
+    if len(parts) > 1:
+        selector = 'new UiSelector().' + '.'.join(parts)
+        yield ('combo', element_class, resource_id, text, description), Locator(
+            'uiselector', AppiumBy.ANDROID_UIAUTOMATOR, selector, selector
+        )
+
+
+def _ios_candidates(attrib: dict):
+    element_type = attrib.get('type', '')
+    name = attrib.get('name', '')
+    label = attrib.get('label', '')
+    value = attrib.get('value', '')
+    if name:
+        yield ('accessibility_id', name), Locator('accessibility_id', AppiumBy.ACCESSIBILITY_ID, name, f'name == "{quote_selector_value(name)}"')
+    if label:
+        predicate = f'type == "{quote_selector_value(element_type)}" AND label == "{quote_selector_value(label)}"'
+        yield ('label', element_type, label), Locator('predicate', AppiumBy.IOS_PREDICATE, predicate, predicate)
+    conditions = [f'type == "{quote_selector_value(element_type)}"'] if element_type else []
+    for attribute, attribute_value in (('name', name), ('label', label), ('value', value)):
+        if attribute_value:
+            conditions.append(f'{attribute} == "{quote_selector_value(attribute_value)}"')
+    if len(conditions) > 1:
+        predicate = ' AND '.join(conditions)
+        yield ('combo', element_type, name, label, value), Locator('predicate', AppiumBy.IOS_PREDICATE, predicate, predicate)
+
+
+class LocatorIndex:
+    """
+    Locator precalcolati degli elementi di uno snapshot, cercati per identità del nodo.
+    Un elemento senza locator univoco non ha voce: le azioni usano le strategie generiche.
+    """
+
+    def __init__(self, platform_type: str = '', counts: Counter | None = None, nodes: list = ()):
+        """
+        Args:
+            platform_type: 'android' o 'ios'
+            counts: Occorrenze delle chiavi di locator_count_keys() nell'intera page source
+            nodes: AppElementNode da indicizzare (gli elementi evidenziabili)
+        """
+        counts = counts or Counter()
+        candidates = _android_candidates if platform_type == 'android' else _ios_candidates
+        self._locators = {}
+        for node in nodes:
+            for key, locator in candidates(node.attributes):
+                if counts[key] == 1:
+                    self._locators[id(node)] = (node, locator)
+                    break
+
+    def __len__(self):
+        return len(self._locators)
+
+    def get(self, node) -> Locator | None:
+        entry = self._locators.get(id(node))
+        return entry[1] if entry is not None and entry[0] is node else None
@@ -0,0 +1,111 @@
+"""
+Locator Stats - Ordinamento adattivo delle strategie di ricerca degli elementi
+Registra quale strategia (coordinate, key, xpath per tipo, testo...) ha funzionato e in
+quanto tempo, per app (package / bundle id) e firma dell'elemento, in un piccolo file JSON.
+Le statistiche vengono usate per provare per prima la strategia che si prevede vincente
+e per spostare in fondo quelle che falliscono sempre.
+"""
+import json
+import logging
+import os
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATS_FILE = Path(__file__).parent.parent / 'locator_stats.json'
+
+# Chiave che aggrega tutti gli elementi di un'azione, usata per gli elementi mai visti
+ANY_ELEMENT = '*'
+# Una strategia con almeno questi tentativi e nessun successo viene sempre provata per ultima
+DEMOTE_AFTER_FAILURES = 3
+# Limite di firme per app, per mantenere il file piccolo
+MAX_SIGNATURES_PER_APP = 2000
+
+
+class LocatorStatsStore:
+    """
+    Statistiche persistenti {app: {firma: {strategia: {success, fail, seconds}}}}.
+    Il file viene letto alla creazione e riscritto solo con save().
+    """
+
+    def __init__(self, path=DEFAULT_STATS_FILE):
+        """
+        Args:
+            path: File JSON delle statistiche
+        """
+        self.path = Path(path)
+        self._stats = {}
+        self._dirty = False
+        self.load()
+
+    @classmethod
+    def from_env(cls) -> 'LocatorStatsStore | None':
+        """
+        Crea l'archivio da .env (LOCATOR_LEARNING, LOCATOR_STATS_FILE); None se disattivato.
+        """
+        if os.getenv('LOCATOR_LEARNING', 'true').lower() != 'true':
+            return None
+        return cls(os.getenv('LOCATOR_STATS_FILE') or DEFAULT_STATS_FILE)
+
+    @staticmethod
+    def element_signature(action: str, node) -> str:
+        """Firma di un elemento: azione, tipo, key e testo."""
+        return '|'.join([action, node.tag_name or '', node.key or '', (node.text or '')[:80]])
+
+    def load(self):
+        if not self.path.exists():
+            return
+        try:
+            self._stats = json.loads(self.path.read_text(encoding='utf-8'))
+        except Exception as e:
+            logger.warning(f'Statistiche dei locator non leggibili ({self.path}), riparto da zero: {e}')
+            self._stats = {}
+
+    def save(self):
+        """Scrive le statistiche su disco (scrittura atomica) se sono cambiate."""
+        if not self._dirty:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.json.tmp')
+            tmp_path.write_text(json.dumps(self._stats, indent=1), encoding='utf-8')
+            tmp_path.replace(self.path)
+            self._dirty = False
+        except Exception as e:
+            logger.warning(f'Impossibile salvare le statistiche dei locator: {e}')
+
+    def record(self, app_id: str, action: str, signature: str, strategy: str, success: bool, seconds: float):
+        """Registra l'esito di una strategia per l'elemento e per l'azione in generale."""
+        app_stats = self._stats.setdefault(app_id, {})
+        if signature not in app_stats and len(app_stats) >= MAX_SIGNATURES_PER_APP:
+            return
+        for key in (signature, f'{action}|{ANY_ELEMENT}'):
+            entry = app_stats.setdefault(key, {}).setdefault(strategy, {'success': 0, 'fail': 0, 'seconds': 0.0})
+            entry['success' if success else 'fail'] += 1
+            entry['seconds'] = round(entry['seconds'] + seconds, 3)
+        self._dirty = True
+
+    def order(self, app_id: str, action: str, signature: str, strategies: list) -> list:
+        """
+        Ordina le strategie applicabili: prima quella con la probabilità di successo
+        più alta (a parità, la più veloce); quelle che falliscono sempre vanno in fondo.
+        Senza statistiche l'ordine originale resta invariato.
+        """
+        app_stats = self._stats.get(app_id, {})
+        element_stats = app_stats.get(signature) or app_stats.get(f'{action}|{ANY_ELEMENT}')
+        if not element_stats:
+            return list(strategies)
+
+        def score(item):
+            position, strategy = item
+            entry = element_stats.get(strategy)
+            if entry is None:
+                # Mai provata: resta nella posizione originale, con probabilità neutra
+                return (False, -0.5, 0.0, position)
+            attempts = entry['success'] + entry['fail']
+            demoted = entry['success'] == 0 and attempts >= DEMOTE_AFTER_FAILURES
+            success_rate = (entry['success'] + 1) / (attempts + 2)
+            avg_seconds = entry['seconds'] / attempts if attempts else 0.0
+            return (demoted, -success_rate, avg_seconds, position)
+
+        return [strategy for _, strategy in sorted(enumerate(strategies), key=score)]
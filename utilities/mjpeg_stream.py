@@ -0,0 +1,117 @@
+"""
+MJPEG Stream - Lettura in background dello stream MJPEG dello schermo di Appium
+UiAutomator2 e XCUITest espongono lo schermo come stream MJPEG (capability mjpegServerPort).
+Un thread legge lo stream e conserva in memoria solo l'ultimo frame: screenshot per
+LLM e report senza round-trip WebDriver.
+"""
+import logging
+import threading
+import time
+import urllib.request
+
+logger = logging.getLogger(__name__)
+
+JPEG_START = b'\xff\xd8'
+JPEG_END = b'\xff\xd9'
+# Oltre questa dimensione il buffer senza un frame completo viene scartato
+MAX_BUFFER_SIZE = 8 * 1024 * 1024
+
+
+class MjpegFrameReader:
+    """
+    Lettore dello stream con riconnessione automatica. latest_frame() e wait_for_frame()
+    restituiscono (jpeg_bytes, timestamp) con timestamp di time.monotonic().
+    """
+
+    def __init__(self, url: str, timeout: float = 5.0, reconnect_delay: float = 1.0):
+        """
+        Args:
+            url: URL dello stream (es. http://127.0.0.1:7810)
+            timeout: Timeout di connessione e lettura in secondi
+            reconnect_delay: Attesa prima di riconnettersi dopo un errore
+        """
+        self.url = url
+        self.timeout = timeout
+        self.reconnect_delay = reconnect_delay
+        self._frame = None
+        self._frame_time = 0.0
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+        self.frames = 0
+        self.errors = 0
+
+    def start(self) -> 'MjpegFrameReader':
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='mjpeg-reader', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.timeout)
+            self._thread = None
+
+    def latest_frame(self) -> tuple | None:
+        """Ultimo frame ricevuto, None se lo stream non ha ancora prodotto frame."""
+        with self._condition:
+            return (self._frame, self._frame_time) if self._frame is not None else None
+
+    def wait_for_frame(self, newer_than: float, timeout: float) -> tuple | None:
+        """
+        Attende un frame ricevuto dopo newer_than (time.monotonic()).
+
+        Returns:
+            (jpeg_bytes, timestamp) oppure None allo scadere del timeout
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while self._frame is None or self._frame_time <= newer_than:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._stop.is_set():
+                    return None
+                self._condition.wait(remaining)
+            return self._frame, self._frame_time
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                with urllib.request.urlopen(self.url, timeout=self.timeout) as response:
+                    logger.info(f'Stream MJPEG connesso: {self.url}')
+                    self._read_stream(response)
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                self.errors += 1
+                logger.debug(f'Stream MJPEG interrotto ({self.url}): {e}')
+            self._stop.wait(self.reconnect_delay)
+
+    def _read_stream(self, response):
+        """Estrae i JPEG completi (SOI ... EOI) dallo stream multipart."""
+        buffer = b''
+        while not self._stop.is_set():
+            chunk = response.read1(65536)
+            if not chunk:
+                return
+            buffer += chunk
+            latest = None
+            while True:
+                start = buffer.find(JPEG_START)
+                if start < 0:
+                    buffer = buffer[-1:]
+                    break
+                end = buffer.find(JPEG_END, start + 2)
+                if end < 0:
+                    buffer = buffer[start:]
+                    break
+                latest = buffer[start:end + 2]
+                buffer = buffer[end + 2:]
+            if latest is not None:
+                with self._condition:
+                    self._frame = latest
+                    self._frame_time = time.monotonic()
+                    self.frames += 1
+                    self._condition.notify_all()
+            if len(buffer) > MAX_BUFFER_SIZE:
+                buffer = b''
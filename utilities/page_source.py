@@ -0,0 +1,74 @@
+"""
+Page Source - Parsing in streaming della page source Appium
+Le page source di UiAutomator2/XCUITest su schermate con liste lunghe o web view arrivano
+a diversi megabyte. iter_page_source() le legge con iterparse (lxml se installato,
+altrimenti xml.etree) liberando gli elementi già letti, e SourceNode conserva solo
+quanto serve al tree builder in una rappresentazione compatta con __slots__.
+"""
+import io
+import xml.etree.ElementTree as ET
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:  # lxml è opzionale
+    lxml_etree = None
+
+
+class SourceNode:
+    """
+    Elemento della page source: tag, attributi, figli mantenuti e hash del sottoalbero.
+    Espone get(), len(), indice e iterazione come un elemento xml.etree.
+    """
+
+    __slots__ = ('tag', 'attrib', 'children', 'subtree_hash', 'is_target', 'has_target', 'has_text', 'under_target')
+
+    def __init__(self, tag: str, attrib: dict, children: list | None = None):
+        self.tag = tag
+        self.attrib = attrib
+        self.children = [] if children is None else children
+        self.subtree_hash = None
+        # Elemento evidenziabile (interattivo, visibile, nel viewport)
+        self.is_target = False
+        # Il sottoalbero contiene un elemento evidenziabile / del testo
+        self.has_target = False
+        self.has_text = False
+        # Un antenato è evidenziabile: il testo del sottoalbero finisce nella sua descrizione
+        self.under_target = False
+
+    def get(self, key: str, default=None):
+        return self.attrib.get(key, default)
+
+    def shallow_copy(self) -> 'SourceNode':
+        """Stesso tag e attributi, senza figli (per _parse_element di app_use)."""
+        return SourceNode(self.tag, self.attrib, ())
+
+    def __len__(self):
+        return len(self.children)
+
+    def __getitem__(self, index):
+        return self.children[index]
+
+    def __iter__(self):
+        return iter(self.children)
+
+
+def iter_page_source(page_source: str):
+    """
+    Eventi ('start' | 'end', tag, attributi) della page source, senza tenere in memoria
+    l'intero albero XML: ogni elemento viene svuotato al termine della lettura.
+    """
+    data = io.BytesIO(page_source.encode('utf-8') if isinstance(page_source, str) else page_source)
+    if lxml_etree is not None:
+        events = lxml_etree.iterparse(data, events=('start', 'end'), resolve_entities=False, no_network=True)
+    else:
+        events = ET.iterparse(data, events=('start', 'end'))
+    for event, element in events:
+        if event == 'start':
+            yield event, element.tag, dict(element.attrib)
+            continue
+        yield event, element.tag, None
+        element.clear()
+        if lxml_etree is not None:
+            # lxml: rimuove anche i fratelli precedenti già letti
+            while element.getprevious() is not None:
+                del element.getparent()[0]
@@ -1,7 +1,50 @@
 import datetime
 from pathlib import Path
+from io import BytesIO
 import base64
+import mimetypes
 import os
+import re
+import shutil
+
+# Screenshot del report: file in assets/ accanto all'HTML (external) o incorporati in base64 (inline)
+ASSETS_EXTERNAL = 'external'
+ASSETS_INLINE = 'inline'
+ASSETS_DIR = 'assets'
+# Lato massimo (pixel) delle miniature incorporate nel report in modalità external
+THUMBNAIL_SIDE = 200
+EMPTY_IMAGE = "data:image/gif;base64,R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7"
+# Immagini con l'originale in assets/: src (miniatura) seguito da data-full
+FULL_IMAGE_PATTERN = re.compile(r'src="[^"]*" data-full="([^"]+)"')
+
+
+def image_to_data_uri(file_path) -> str:
+    """Data URI dell'immagine con il MIME type corretto (png, jpeg, gif)."""
+    mime_type = mimetypes.guess_type(str(file_path))[0] or 'image/png'
+    with open(file_path, "rb") as image_file:
+        return f"data:{mime_type};base64,{base64.b64encode(image_file.read()).decode('utf-8')}"
+
+
+def build_single_file(report_path) -> str:
+    """HTML del report con gli screenshot di assets/ incorporati, da condividere come file unico."""
+    report_path = Path(report_path)
+    content = report_path.read_text(encoding="utf-8")
+
+    def inline(match):
+        asset_path = report_path.parent / match.group(1)
+        return f'src="{image_to_data_uri(asset_path) if asset_path.is_file() else EMPTY_IMAGE}"'
+
+    return FULL_IMAGE_PATTERN.sub(inline, content)
+
+
+def export_single_file(report_path, output_path=None) -> Path:
+    """
+    Salva la versione a file singolo del report (default: single_<nome report> nella stessa cartella).
+    """
+    report_path = Path(report_path)
+    output_path = Path(output_path) if output_path else report_path.with_name(f"single_{report_path.name}")
+    output_path.write_text(build_single_file(report_path), encoding="utf-8")
+    return output_path
 
 # La classe TestCase rimane invariata
 class TestCase:
@@ -10,16 +53,36 @@ class TestCase:
         self.description = description
         self.steps = []
         self.status = "Passato"
+        self.metrics = {}
     def add_step(self, action, screenshot_path, is_failure=False):
         self.steps.append({ "action": action, "screenshot": screenshot_path })
         if is_failure:
             self.status = "Fallito"
+    def add_metric(self, label, value):
+        """Aggiunge una metrica (es. richieste bloccate) mostrata sotto l'intestazione del test."""
+        self.metrics[label] = value
 
 class HTMLReportGenerator:
-    """Genera un report HTML con thumbnail e modale per l'ingrandimento."""
+    """
+    Genera un report HTML con thumbnail e modale per l'ingrandimento.
+    In modalità external (REPORT_ASSETS, default) gli screenshot sono copiati in assets/:
+    l'HTML contiene solo miniature e l'immagine intera viene caricata all'apertura della modale.
+    """
 
-    def __init__(self, output_dir="reports"):
+    def __init__(self, output_dir="reports", asset_mode=None, single_file=None):
+        """
+        Args:
+            output_dir: Cartella del report
+            asset_mode: 'external' o 'inline' (default: REPORT_ASSETS)
+            single_file: Salva anche la copia a file singolo in finalize_report (default: REPORT_SINGLE_FILE)
+        """
+        self.asset_mode = (asset_mode or os.getenv("REPORT_ASSETS", ASSETS_EXTERNAL)).lower()
+        if single_file is None:
+            single_file = os.getenv("REPORT_SINGLE_FILE", "false").lower() == "true"
+        self.single_file = single_file
         self.output_dir = Path(output_dir)
+        self.assets_dir = self.output_dir / ASSETS_DIR
+        self._asset_count = 0
         self.output_dir.mkdir(parents=True, exist_ok=True)
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
         self.report_file = self.output_dir / f"test_report_{timestamp}.html"
@@ -47,6 +110,9 @@ class HTMLReportGenerator:
         .test-case {{ border-bottom: 1px solid #e1e1e1; }}
         .test-header {{ padding: 15px 20px; display: flex; justify-content: space-between; align-items: center; }}
         .test-info h3 {{ margin: 0; font-size: 18px; }}
+        .test-metrics {{ padding: 0 20px 10px 20px; display: flex; flex-wrap: wrap; gap: 6px; }}
+        .metric {{ background-color: #eef3f7; border-radius: 4px; padding: 3px 8px; font-size: 12px; color: #555; }}
+        .metric b {{ color: #2c3e50; }}
         .status {{ padding: 5px 12px; border-radius: 15px; font-weight: bold; font-size: 14px; color: #fff; }}
         .status.passed {{ background-color: #2ecc71; }} .status.failed {{ background-color: #e74c3c; }}
         .steps-container {{ padding: 0 20px 20px 20px; }}
@@ -93,13 +159,44 @@ class HTMLReportGenerator:
     def _image_to_base64(self, file_path):
         try:
             if file_path and os.path.exists(file_path) and os.path.getsize(file_path) > 0:
-                with open(file_path, "rb") as image_file:
-                    return f"data:image/png;base64,{base64.b64encode(image_file.read()).decode('utf-8')}"
-            return "data:image/gif;base64,R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7"
+                return image_to_data_uri(file_path)
+            return EMPTY_IMAGE
         except Exception as e:
             print(f"⚠️  Attenzione: Impossibile leggere lo screenshot '{file_path}'. Errore: {e}")
             return ""
 
+    def _image_attributes(self, file_path) -> str:
+        """Attributi src (e data-full in modalità external) dell'immagine di uno step."""
+        if self.asset_mode == ASSETS_INLINE:
+            return f'src="{self._image_to_base64(file_path)}"'
+        if not file_path or not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
+            return f'src="{EMPTY_IMAGE}"'
+        try:
+            # Copia: le cartelle degli screenshot vengono svuotate a ogni test
+            self.assets_dir.mkdir(parents=True, exist_ok=True)
+            self._asset_count += 1
+            asset_name = f"{self._asset_count:05d}_{Path(file_path).name}"
+            shutil.copyfile(file_path, self.assets_dir / asset_name)
+        except Exception as e:
+            print(f"⚠️  Attenzione: Impossibile copiare lo screenshot '{file_path}'. Errore: {e}")
+            return ""
+        asset_url = f"{ASSETS_DIR}/{asset_name}"
+        return f'src="{self._thumbnail(file_path) or asset_url}" data-full="{asset_url}"'
+
+    @staticmethod
+    def _thumbnail(file_path):
+        """Miniatura JPEG in base64 (primo frame per le GIF), None senza Pillow."""
+        try:
+            from PIL import Image
+
+            with Image.open(file_path) as img:
+                img.thumbnail((THUMBNAIL_SIDE, THUMBNAIL_SIDE))
+                buffer = BytesIO()
+                img.convert('RGB').save(buffer, format='JPEG', quality=60)
+            return f"data:image/jpeg;base64,{base64.b64encode(buffer.getvalue()).decode('utf-8')}"
+        except Exception:
+            return None
+
     def add_test_case_result(self, test_case: TestCase):
         self.total_tests += 1
         if test_case.status.lower() == "passato": self.passed_count += 1
@@ -107,18 +204,24 @@ class HTMLReportGenerator:
         
         steps_html_parts = []
         for step in test_case.steps:
-            base64_image_src = self._image_to_base64(step['screenshot'])
+            image_attributes = self._image_attributes(step['screenshot'])
             step_html = f"""
             <div class="step">
                 <div class="step-header">{step['action']}</div>
                 <div class="screenshot-container">
-                    <img src="{base64_image_src}" alt="Screenshot per: {step['action']}" loading="lazy"
+                    <img {image_attributes} alt="Screenshot per: {step['action']}" loading="lazy"
                          title="Clicca per ingrandire l'immagine">
                 </div>
             </div>"""
             steps_html_parts.append(step_html)
         
         steps_html = "".join(steps_html_parts)
+        metrics_html = ""
+        if test_case.metrics:
+            metric_items = "".join(
+                f'<span class="metric">{label}: <b>{value}</b></span>' for label, value in test_case.metrics.items()
+            )
+            metrics_html = f'<div class="test-metrics">{metric_items}</div>'
         status_class = "passed" if test_case.status.lower() == "passato" else "failed"
         test_case_html = f"""
         <div class="test-case">
@@ -126,6 +229,7 @@ class HTMLReportGenerator:
                 <div class.test-info"><h3>{test_case.test_id}: {test_case.description}</h3></div>
                 <div class="status {status_class}">{test_case.status.upper()}</div>
             </div>
+            {metrics_html}
             <div class="steps-container">{steps_html}</div>
         </div>"""
         
@@ -153,7 +257,8 @@ class HTMLReportGenerator:
             document.querySelector('.test-list').addEventListener('click', function(event) {
                 if (event.target.tagName === 'IMG' && event.target.closest('.screenshot-container')) {
                     modal.style.display = "block";
-                    modalImg.src = event.target.src;
+                    // Immagine intera da assets/ caricata solo all'apertura della modale
+                    modalImg.src = event.target.dataset.full || event.target.src;
                     captionText.innerHTML = event.target.alt;
                 }
             });
@@ -169,4 +274,6 @@ class HTMLReportGenerator:
         content = content.replace("__TOTAL__", str(self.total_tests)).replace("__PASSED__", str(self.passed_count)).replace("__FAILED__", str(self.failed_count))
         with open(self.filename, "w", encoding="utf-8") as f: f.write(content)
         print(f"✅ Report finalizzato: {self.filename}")
+        if self.single_file and self.asset_mode == ASSETS_EXTERNAL:
+            print(f"📦 Report a file singolo: {export_single_file(self.filename)}")
         return self.filename
\ No newline at end of file
@@ -0,0 +1,216 @@
+"""
+Request Blocking - Profili di blocco delle richieste di rete per i test web
+Installa l'intercettazione delle richieste (CDP Network.setBlockedURLs) sulla sessione
+browser-use, così analytics, pubblicità, font e media pesanti non rallentano il caricamento.
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+ANALYTICS_PATTERNS = [
+    '*google-analytics.com*',
+    '*googletagmanager.com*',
+    '*analytics.google.com*',
+    '*stats.g.doubleclick.net*',
+    '*connect.facebook.net*',
+    '*hotjar.com*',
+    '*segment.io*',
+    '*segment.com/analytics*',
+    '*mixpanel.com*',
+    '*clarity.ms*',
+    '*newrelic.com*',
+    '*nr-data.net*',
+    '*omtrdc.net*',
+    '*scorecardresearch.com*',
+]
+
+ADS_PATTERNS = [
+    '*doubleclick.net*',
+    '*googlesyndication.com*',
+    '*googleadservices.com*',
+    '*adservice.google.*',
+    '*amazon-adsystem.com*',
+    '*criteo.com*',
+    '*taboola.com*',
+    '*outbrain.com*',
+]
+
+MEDIA_PATTERNS = [
+    '*.mp4*', '*.webm*', '*.m3u8*', '*.mp3*', '*.ogg*',
+    '*.gif*', '*.jpg*', '*.jpeg*', '*.png*', '*.webp*', '*.avif*',
+]
+
+FONT_PATTERNS = [
+    '*.woff*', '*.ttf*', '*.otf*', '*.eot*',
+    '*fonts.googleapis.com*', '*fonts.gstatic.com*', '*use.typekit.net*',
+]
+
+BLOCK_PROFILES = {
+    'none': [],
+    'analytics': ANALYTICS_PATTERNS + ADS_PATTERNS,
+    'media': MEDIA_PATTERNS + FONT_PATTERNS,
+    'aggressive': ANALYTICS_PATTERNS + ADS_PATTERNS + MEDIA_PATTERNS + FONT_PATTERNS,
+}
+
+# Una richiesta bloccata non viene mai scaricata, quindi la sua dimensione reale non è nota:
+# i byte risparmiati sono stimati con una dimensione tipica per tipo di risorsa CDP.
+ESTIMATED_BYTES_BY_RESOURCE_TYPE = {
+    'Image': 45_000,
+    'Media': 750_000,
+    'Font': 35_000,
+    'Script': 25_000,
+    'Stylesheet': 15_000,
+    'XHR': 2_000,
+    'Fetch': 2_000,
+    'Ping': 500,
+}
+DEFAULT_ESTIMATED_BYTES = 5_000
+
+
+def resolve_block_profile(name) -> str:
+    """
+    Normalizza il nome del profilo; valori sconosciuti ricadono su 'none'.
+    """
+    profile = str(name or 'none').strip().lower()
+    if profile not in BLOCK_PROFILES:
+        logger.warning(f"BlockProfile sconosciuto '{name}', uso 'none'. Valori validi: {', '.join(BLOCK_PROFILES)}")
+        return 'none'
+    return profile
+
+
+class RequestBlocker:
+    """
+    Applica un profilo di blocco a una sessione browser-use e conta le richieste bloccate.
+    Il browser è condiviso tra i test: creare un RequestBlocker per ogni test
+    in modo che profilo e statistiche siano quelli della singola riga.
+    """
+
+    def __init__(self, browser_session, profile: str = 'none'):
+        """
+        Args:
+            browser_session: Istanza Browser/BrowserSession di browser-use
+            profile: Nome del profilo (none, analytics, media, aggressive)
+        """
+        self.browser_session = browser_session
+        self.profile = resolve_block_profile(profile)
+        self.patterns = BLOCK_PROFILES[self.profile]
+        self.blocked_requests = 0
+        self.estimated_bytes_saved = 0
+        self._applied_targets = set()
+        self._blocked_request_ids = set()
+        self._registered_client = None
+        self._previous_handler = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.patterns)
+
+    async def apply(self):
+        """
+        Installa (o aggiorna) il blocco sul tab attualmente in focus.
+        Idempotente: va chiamato a inizio test e a ogni step, così copre anche
+        i nuovi tab aperti dall'agente.
+        """
+        if not self.enabled or self.browser_session is None:
+            return
+        target_id = getattr(self.browser_session, 'agent_focus_target_id', None)
+        if target_id is None or (target_id in self._applied_targets and self._registered_client is not None):
+            return
+        try:
+            cdp_session = await self.browser_session.get_or_create_cdp_session(target_id=target_id, focus=False)
+            await cdp_session.cdp_client.send.Network.enable(session_id=cdp_session.session_id)
+            await cdp_session.cdp_client.send.Network.setBlockedURLs(
+                params={'urls': self.patterns}, session_id=cdp_session.session_id
+            )
+            self._register_listener(self.browser_session.cdp_client)
+            self._applied_targets.add(target_id)
+            logger.info(f"Request blocking '{self.profile}' attivo su target {target_id[-4:]} ({len(self.patterns)} pattern)")
+        except Exception as e:
+            logger.warning(f'Impossibile applicare il profilo di blocco {self.profile}: {e}')
+
+    def _register_listener(self, cdp_client):
+        """
+        Registra il contatore su Network.loadingFailed con l'API pubblica register di cdp_use.
+        Un eventuale handler già presente viene mantenuto (catena) leggendolo dal registro
+        interno del client: se la versione di browser-use non lo espone più il contatore
+        funziona comunque, ma l'handler precedente non viene richiamato.
+        """
+        if cdp_client is None or cdp_client is self._registered_client:
+            return
+        handlers = self._event_handlers(cdp_client)
+        previous = handlers.get('Network.loadingFailed') if handlers is not None else None
+
+        def on_loading_failed(params, session_id=None):
+            # Dopo remove() il contatore resta inerte anche se non è stato possibile deregistrarlo
+            if self._registered_client is cdp_client:
+                self._on_loading_failed(params)
+            if previous is not None:
+                return previous(params, session_id)
+
+        cdp_client.register.Network.loadingFailed(on_loading_failed)
+        self._registered_client = cdp_client
+        self._previous_handler = previous
+
+    @staticmethod
+    def _event_handlers(cdp_client) -> dict | None:
+        """Handler registrati sul client CDP (registro interno di cdp_use), None se non accessibile."""
+        handlers = getattr(getattr(cdp_client, '_event_registry', None), '_handlers', None)
+        if not isinstance(handlers, dict):
+            logger.warning(
+                'Registro degli eventi CDP non accessibile (versione di browser-use non supportata): '
+                'il conteggio delle richieste bloccate non concatena gli handler esistenti'
+            )
+            return None
+        return handlers
+
+    def _on_loading_failed(self, params):
+        try:
+            get = params.get if hasattr(params, 'get') else lambda key, default=None: getattr(params, key, default)
+            if not get('blockedReason'):
+                return
+            request_id = get('requestId')
+            if request_id in self._blocked_request_ids:
+                return
+            self._blocked_request_ids.add(request_id)
+            self.blocked_requests += 1
+            resource_type = get('type') or 'Other'
+            self.estimated_bytes_saved += ESTIMATED_BYTES_BY_RESOURCE_TYPE.get(resource_type, DEFAULT_ESTIMATED_BYTES)
+        except Exception as e:
+            logger.debug(f'Errore nel conteggio delle richieste bloccate: {e}')
+
+    async def remove(self):
+        """
+        Rimuove il blocco e il contatore: il browser viene riutilizzato dal test successivo,
+        che installerà il proprio profilo.
+        """
+        for target_id in list(self._applied_targets):
+            try:
+                cdp_session = await self.browser_session.get_or_create_cdp_session(target_id=target_id, focus=False)
+                await cdp_session.cdp_client.send.Network.setBlockedURLs(
+                    params={'urls': []}, session_id=cdp_session.session_id
+                )
+            except Exception as e:
+                # Il tab potrebbe essere già stato chiuso dall'agente
+                logger.debug(f'Impossibile rimuovere il blocco dal target {target_id[-4:]}: {e}')
+        self._applied_targets.clear()
+
+        client = self._registered_client
+        if client is not None:
+            self._registered_client = None
+            if self._previous_handler is not None:
+                client.register.Network.loadingFailed(self._previous_handler)
+            else:
+                unregister = getattr(getattr(client, '_event_registry', None), 'unregister', None)
+                if callable(unregister):
+                    unregister('Network.loadingFailed')
+                else:
+                    logger.warning('Impossibile deregistrare il contatore Network.loadingFailed: resta registrato ma inattivo')
+            self._previous_handler = None
+
+    def get_stats(self) -> dict:
+        """Statistiche da riportare nel report del test."""
+        return {
+            'profile': self.profile,
+            'blocked_requests': self.blocked_requests,
+            'estimated_bytes_saved': self.estimated_bytes_saved,
+        }
@@ -0,0 +1,83 @@
+"""
+Screenshot Writer - Scrittura asincrona degli screenshot dei report
+Gli screenshot già catturati (base64) vengono decodificati una sola volta, ridimensionati
+e salvati in JPEG su un thread di background, senza bloccare l'esecuzione del test.
+"""
+import base64
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+from io import BytesIO
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JPEG_QUALITY = 85
+
+
+class ScreenshotWriter:
+    """
+    Coda di scrittura degli screenshot. flush() attende le scritture in sospeso
+    e va chiamato prima di aggiungere il test al report.
+    """
+
+    def __init__(self, max_side: int = 0, jpeg_quality: int = DEFAULT_JPEG_QUALITY):
+        """
+        Args:
+            max_side: Lato lungo massimo in pixel (0 = risoluzione originale)
+            jpeg_quality: Qualità JPEG (1-100)
+        """
+        self.max_side = max(0, int(max_side or 0))
+        self.jpeg_quality = min(100, max(1, int(jpeg_quality or DEFAULT_JPEG_QUALITY)))
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='screenshot-writer')
+        self._pending = []
+
+    @classmethod
+    def from_env(cls) -> 'ScreenshotWriter':
+        """Impostazioni da .env (REPORT_SCREENSHOT_MAX_SIDE, REPORT_SCREENSHOT_QUALITY)."""
+        try:
+            return cls(
+                int(os.getenv('REPORT_SCREENSHOT_MAX_SIDE', '0') or 0),
+                int(os.getenv('REPORT_SCREENSHOT_QUALITY', str(DEFAULT_JPEG_QUALITY)) or DEFAULT_JPEG_QUALITY),
+            )
+        except ValueError:
+            logger.warning('Impostazioni degli screenshot del report non valide, uso i valori di default')
+            return cls()
+
+    def submit(self, image_base64: str, path):
+        """
+        Accoda la scrittura di uno screenshot base64.
+
+        Args:
+            image_base64: Screenshot (PNG/JPEG) in base64
+            path: File di destinazione
+        """
+        future = self._executor.submit(self._write, image_base64, Path(path))
+        self._pending.append(future)
+        return future
+
+    def flush(self):
+        """Attende il completamento delle scritture in sospeso."""
+        pending, self._pending = self._pending, []
+        wait(pending)
+
+    def close(self):
+        self.flush()
+        self._executor.shutdown(wait=True)
+
+    def _write(self, image_base64: str, path: Path):
+        image_bytes = base64.b64decode(image_base64)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            from PIL import Image
+
+            with Image.open(BytesIO(image_bytes)) as img:
+                longest = max(img.size)
+                if self.max_side and longest > self.max_side:
+                    scale = self.max_side / longest
+                    img = img.resize((round(img.width * scale), round(img.height * scale)), Image.Resampling.LANCZOS)
+                img.convert('RGB').save(path, format='JPEG', quality=self.jpeg_quality, optimize=True)
+        except Exception as e:
+            # Senza Pillow (o con un formato non riconosciuto) si salva l'immagine originale
+            logger.warning(f'Screenshot salvato senza conversione ({path.name}): {e}')
+            path.write_bytes(image_bytes)
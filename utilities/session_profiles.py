@@ -0,0 +1,131 @@
+"""
+Session Profiles - Snapshot delle sessioni autenticate per i test web
+Il test "producer" di un profilo salva lo storage state del browser (cookie, localStorage)
+dopo essere passato; i test "consumer" dello stesso profilo partono da quello snapshot
+e possono saltare i passaggi di login.
+"""
+import json
+import logging
+import os
+import re
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+PRODUCER = 'producer'
+CONSUMER = 'consumer'
+
+DEFAULT_TTL_MINUTES = 60
+
+# Messaggi che indicano un fallimento dovuto alla sessione (snapshot scaduto o revocato).
+# I codici 401/403 valgono solo come status HTTP: un id o un conteggio "403" non invalida lo snapshot
+AUTH_ERROR_PATTERNS = [
+    r'\b(?:http|status(?: code)?|error|errore|code|codice|response|risposta)\s*[:=]?\s*40[13]\b',
+    r'\b40[13]\s*[-:]?\s*(?:unauthori[sz]ed|forbidden)\b',
+    r'\bunauthori[sz]ed\b', r'\bforbidden\b', r'\bnot logged in\b', r'\blogin required\b',
+    r'\blog in again\b', r'\bsign in again\b', r'\bsession (?:has )?expired\b', r'\baccess denied\b',
+    r'\bauthentication required\b', r'\bredirected to (?:the )?login\b',
+    r'\bnon autorizzato\b', r'\bsessione scaduta\b', r'\baccesso negato\b',
+    r'\beffettua(?:re)? (?:di nuovo )?il login\b', r'\breindirizzat[oa] alla pagina di login\b',
+]
+AUTH_ERROR_RE = re.compile('|'.join(AUTH_ERROR_PATTERNS), re.IGNORECASE)
+
+
+def resolve_session_role(role) -> str:
+    """
+    Normalizza il valore della colonna SessionRole; vuoto o sconosciuto equivale a 'consumer'.
+    """
+    value = str(role or CONSUMER).strip().lower()
+    if value not in (PRODUCER, CONSUMER):
+        logger.warning(f"SessionRole sconosciuto '{role}', uso '{CONSUMER}'. Valori validi: {PRODUCER}, {CONSUMER}")
+        return CONSUMER
+    return value
+
+
+def is_auth_error(messages) -> bool:
+    """
+    Verifica se i messaggi di errore/risultato dell'agente indicano un problema di autenticazione.
+    """
+    text = ' '.join(str(m) for m in messages if m)
+    return AUTH_ERROR_RE.search(text) is not None
+
+
+class SessionProfileStore:
+    """
+    Archivio su disco degli snapshot di sessione, un file JSON per profilo.
+    La scadenza si basa sulla data di modifica del file (TTL in minuti).
+    """
+
+    def __init__(self, base_dir, ttl_minutes: float = DEFAULT_TTL_MINUTES):
+        """
+        Args:
+            base_dir: Cartella degli snapshot
+            ttl_minutes: Validità di uno snapshot in minuti (0 = nessuna scadenza)
+        """
+        self.base_dir = Path(base_dir)
+        self.ttl_seconds = max(0.0, float(ttl_minutes)) * 60
+
+    @classmethod
+    def from_env(cls, project_root) -> 'SessionProfileStore':
+        """
+        Crea l'archivio da .env (SESSION_PROFILE_DIR, SESSION_PROFILE_TTL).
+        """
+        base_dir = os.getenv('SESSION_PROFILE_DIR') or Path(project_root) / 'session_profiles'
+        try:
+            ttl = float(os.getenv('SESSION_PROFILE_TTL', DEFAULT_TTL_MINUTES))
+        except ValueError:
+            logger.warning(f'SESSION_PROFILE_TTL non valido, uso {DEFAULT_TTL_MINUTES} minuti')
+            ttl = DEFAULT_TTL_MINUTES
+        return cls(base_dir, ttl)
+
+    def path_for(self, profile: str) -> Path:
+        """Percorso dello snapshot; il nome del profilo viene reso sicuro per il filesystem."""
+        safe_name = re.sub(r'[^A-Za-z0-9_.-]+', '_', profile.strip()) or 'default'
+        return self.base_dir / f'{safe_name}.json'
+
+    def age_seconds(self, profile: str) -> float | None:
+        """Età dello snapshot in secondi, None se non esiste."""
+        path = self.path_for(profile)
+        if not path.exists():
+            return None
+        return time.time() - path.stat().st_mtime
+
+    def get_valid(self, profile: str) -> Path | None:
+        """
+        Restituisce lo snapshot se esiste e non è scaduto; quelli scaduti vengono eliminati.
+        """
+        age = self.age_seconds(profile)
+        if age is None:
+            return None
+        if self.ttl_seconds and age > self.ttl_seconds:
+            logger.info(f"Snapshot del profilo '{profile}' scaduto ({age / 60:.0f} min)")
+            self.invalidate(profile)
+            return None
+        return self.path_for(profile)
+
+    def prepare_save(self, profile: str) -> Path:
+        """
+        Prepara il percorso per un nuovo snapshot. Il file precedente viene rimosso perché
+        browser-use unisce il nuovo storage state con quello già presente su disco.
+        """
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.invalidate(profile)
+        return self.path_for(profile)
+
+    def origins(self, profile: str) -> set:
+        """Origini con localStorage nello snapshot del profilo (formato storage state di browser-use)."""
+        try:
+            data = json.loads(self.path_for(profile).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return set()
+        return {entry['origin'] for entry in data.get('origins', []) if entry.get('origin')}
+
+    def invalidate(self, profile: str):
+        """Elimina lo snapshot del profilo (e l'eventuale backup creato da browser-use)."""
+        path = self.path_for(profile)
+        for candidate in (path, path.with_suffix('.json.bak'), path.with_suffix('.json.tmp')):
+            try:
+                candidate.unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f'Impossibile eliminare {candidate}: {e}')
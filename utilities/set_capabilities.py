@@ -1,4 +1,4 @@
-def set_appium_caps(platform, device_name, udid, app_package, app_activity):
+def set_appium_caps(platform, device_name, udid, app_package, app_activity, ports=None):
     if platform.lower() == 'ios':
         custom_caps = {     
             #'automationName': 'XCUITest',
@@ -14,18 +14,22 @@ def set_appium_caps(platform, device_name, udid, app_package, app_activity):
     custom_caps['device_name'] = device_name
     custom_caps['udid'] = udid
     custom_caps['noReset'] = True
+    # Porte locali distinte per device (systemPort, chromedriverPort, ...): sessioni in parallelo
+    if ports:
+        custom_caps.update(ports)
 
     return custom_caps
 
-def set_mobile_cloud_caps(platformName, deviceName, app_id, test_id, descrizione):
+def set_mobile_cloud_caps(platformName, deviceName, app_id, test_id, descrizione, build_name=None):
+    # Un'unica build per esecuzione (build_name): il test è identificato dal nome della sessione
     custom_caps = {
         'platform_name': platformName,
         'device_name': deviceName,
         'app': app_id,
         'noReset': True,
         'isRealMobile': True,
-        'build': f'{test_id} - {descrizione}',
-        'name': descrizione,
+        'build': build_name or f'{test_id} - {descrizione}',
+        'name': f'{test_id} - {descrizione}' if build_name else descrizione,
         'project': 'iCorner TA',
     }
 
@@ -18,6 +18,21 @@ def base64_to_image(base64_string: str, output_filename: str):
             f.write(img_data)
         return output_filename
 
+def get_row_value(data: dict, key: str, default=''):
+    """
+    Legge un valore opzionale da una riga Excel.
+    Le celle vuote arrivano da pandas come NaN: in quel caso (o se la colonna
+    non esiste) viene restituito il default.
+    """
+    value = data.get(key, default)
+    if value is None:
+        return default
+    if isinstance(value, float) and value != value:  # NaN
+        return default
+    if isinstance(value, str) and not value.strip():
+        return default
+    return value.strip() if isinstance(value, str) else value
+
 def clean_img_folder(dir):
     for file in glob.glob(f"{dir}/*.*"):
         os.remove(file)
@@ -0,0 +1,110 @@
+"""
+Vision Settings - Ridimensionamento delle immagini inviate all'LLM
+Limita il lato lungo degli screenshot usati dal modello, indipendentemente dalla risoluzione degli screenshot archiviati nei report.
+"""
+import base64
+import logging
+import os
+from io import BytesIO
+
+from utilities import utils
+
+logger = logging.getLogger(__name__)
+
+# Viewport usato per calcolare le proporzioni quando il browser non ne espone uno
+DEFAULT_VIEWPORT = (1280, 720)
+# browser-use rifiuta dimensioni inferiori a 100px
+MIN_SIDE = 100
+
+
+class VisionSettings:
+    """
+    Impostazioni di downscaling per le immagini inviate al modello.
+    max_side=0 lascia la risoluzione originale. Le immagini restano PNG: app_use e
+    browser-use le inviano al modello come data:image/png.
+    """
+
+    def __init__(self, max_side: int = 0):
+        self.max_side = max(0, int(max_side or 0))
+        if self.max_side and self.max_side < MIN_SIDE:
+            logger.warning(f'VisionMaxSide {self.max_side} troppo piccolo, uso {MIN_SIDE}px')
+            self.max_side = MIN_SIDE
+
+    @classmethod
+    def from_row(cls, data: dict) -> 'VisionSettings':
+        """
+        Valore globale da .env (VISION_MAX_SIDE) con override per riga dalla colonna VisionMaxSide.
+        """
+        max_side = utils.get_row_value(data, 'VisionMaxSide', os.getenv('VISION_MAX_SIDE', '0'))
+        try:
+            return cls(int(float(max_side)))
+        except (TypeError, ValueError):
+            logger.warning(f'Impostazione vision non valida ({max_side}), uso la risoluzione originale')
+            return cls()
+
+    @classmethod
+    def parse(cls, spec: str) -> 'VisionSettings':
+        """
+        Converte una stringa con il lato massimo (es. '768', '1024', 'full') in VisionSettings.
+
+        Raises:
+            ValueError: Se il lato non è un numero intero, con il valore non valido
+        """
+        spec = str(spec).strip().lower()
+        if spec in ('', 'full', 'off', '0'):
+            return cls()
+        try:
+            return cls(int(spec))
+        except ValueError:
+            raise ValueError(
+                f"Impostazione vision non valida '{spec}': atteso il lato massimo in pixel (es. 768, 1024, full)"
+            ) from None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.max_side)
+
+    @property
+    def label(self) -> str:
+        return f'{self.max_side}px' if self.enabled else 'full'
+
+    def target_size(self, width: int, height: int) -> tuple[int, int]:
+        """Dimensione finale mantenendo le proporzioni; non ingrandisce mai l'immagine."""
+        longest = max(width, height)
+        if not self.max_side or longest <= self.max_side:
+            return width, height
+        scale = self.max_side / longest
+        return max(MIN_SIDE, round(width * scale)), max(MIN_SIDE, round(height * scale))
+
+    def llm_screenshot_size(self, viewport: tuple[int, int] | None) -> tuple[int, int] | None:
+        """
+        Valore per il parametro llm_screenshot_size di browser-use (None = nessun resize).
+        """
+        if not self.max_side:
+            return None
+        width, height = viewport or DEFAULT_VIEWPORT
+        size = self.target_size(int(width), int(height))
+        return None if size == (int(width), int(height)) else size
+
+    def downscale_base64(self, image_base64: str) -> str:
+        """
+        Ridimensiona uno screenshot PNG base64.
+        In caso di errore restituisce l'immagine originale.
+        """
+        if not self.enabled or not image_base64:
+            return image_base64
+        try:
+            from PIL import Image
+
+            with Image.open(BytesIO(base64.b64decode(image_base64))) as img:
+                size = self.target_size(*img.size)
+                if size == img.size:
+                    return image_base64
+                resized = img.resize(size, Image.Resampling.LANCZOS)
+
+            buffer = BytesIO()
+            resized.save(buffer, format='PNG', optimize=True)
+            return base64.b64encode(buffer.getvalue()).decode('utf-8')
+        except Exception as e:
+            logger.warning(f'Impossibile ridimensionare lo screenshot per il modello: {e}')
+            return image_base64
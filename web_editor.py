@@ -15,6 +15,8 @@ import json
 # Importa le funzioni per leggere/scrivere .env
 from dotenv import load_dotenv, set_key, find_dotenv 
 
+from utilities.report_utils import build_single_file
+
 # Importa il TestGenerator
 try:
     from tests.test_generator import TestGenerator
@@ -37,6 +39,8 @@ ALL_COLUMNS = [
     'TestID', 'Descrizione', 'Task', 'Active', 'Execution', 'Device',
     'Platform', 'DeviceName', 'UDID', 'AppID', 'AppPackage', 'AppActivity'
 ]
+# Colonne facoltative: non obbligatorie nei file esistenti, ma mostrate e salvate dall'editor
+OPTIONAL_COLUMNS = ['BlockProfile', 'VisionMaxSide', 'SessionProfile', 'SessionRole', 'AppReset', 'AppiumProfile']
 test_process = None
 generation_process = None
 
@@ -94,6 +98,19 @@ def serve_report(filepath):
         return send_from_directory(directory, filename)
     except Exception: abort(404, "Report non trovato.")
 
+@app.route('/reports/export/<path:filepath>')
+def export_report(filepath):
+    """Scarica il report come file HTML singolo con gli screenshot incorporati (es. per email)."""
+    try:
+        safe_path = REPORTS_DIR.joinpath(filepath).resolve()
+        if not safe_path.is_file() or REPORTS_DIR not in safe_path.parents:
+            abort(404, "Report non trovato.")
+        return Response(
+            build_single_file(safe_path), mimetype='text/html',
+            headers={'Content-Disposition': f'attachment; filename=single_{safe_path.name}'}
+        )
+    except Exception: abort(404, "Report non trovato.")
+
 # --- API (Dati JSON) ---
 
 # --- NUOVE API PER CONFIGURAZIONE LLM ---
@@ -295,9 +312,9 @@ def get_tests():
         extra_cols = [col for col in df.columns if col not in ALL_COLUMNS]
         df = df[current_columns_ordered + extra_cols]
         df['Active'] = df['Active'].apply(lambda x: str(x).lower() in ['true', '1', 'yes', 'si', 'vero'])
-        for col in ALL_COLUMNS:
+        for col in ALL_COLUMNS + OPTIONAL_COLUMNS:
              if col not in df.columns: df[col] = ''
-        df_display = df[ALL_COLUMNS]
+        df_display = df[ALL_COLUMNS + OPTIONAL_COLUMNS]
         tests = df_display.to_dict('records')
         return jsonify(tests)
     except pd.errors.EmptyDataError:
@@ -312,7 +329,8 @@ def save_tests():
     file_path = get_excel_file_path(filename)
     try:
         data = request.json
-        df = pd.DataFrame(data, columns=ALL_COLUMNS) if data else pd.DataFrame(columns=ALL_COLUMNS)
+        columns = ALL_COLUMNS + OPTIONAL_COLUMNS
+        df = pd.DataFrame(data, columns=columns) if data else pd.DataFrame(columns=columns)
         df.to_excel(file_path, sheet_name=SHEET_NAME, index=False)
         print(f"✅ File {file_path.name} salvato localmente.")
         return jsonify({"success": True})